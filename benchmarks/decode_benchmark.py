@@ -0,0 +1,80 @@
+"""
+Compare response decoding with and without fast_decode.
+
+Run from the repository root with: python -m benchmarks.decode_benchmark
+"""
+
+import json
+import timeit
+
+import httpx
+
+from fronius_solarweb.api import Fronius_Solarweb
+from fronius_solarweb.schema.hist import HistoricalValues
+from fronius_solarweb.schema.pvsystem import PvSystemFlowData
+
+FLOW_DATA = {
+    "pvSystemId": "20bb600e-019b-4e03-9df3-a0a900cda689",
+    "status": {"isOnline": True, "battMode": "1"},
+    "data": {
+        "logDateTime": "2023-01-01T00:00:00Z",
+        "channels": [
+            {
+                "channelName": f"Channel{i}",
+                "channelType": "Power",
+                "unit": "W",
+                "value": 1.5 * i,
+            }
+            for i in range(12)
+        ],
+    },
+}
+
+# one day of 5 minute data with five channels
+HIST_DATA = {
+    "pvSystemId": "20bb600e-019b-4e03-9df3-a0a900cda689",
+    "data": [
+        {
+            "logDateTime": f"2023-01-01T{i // 12:02d}:{i % 12 * 5:02d}:00Z",
+            "logDuration": 300,
+            "channels": [
+                {
+                    "channelName": name,
+                    "channelType": "Power",
+                    "unit": "W",
+                    "value": float(i),
+                    "isActive": True,
+                    "isDamaged": False,
+                }
+                for name in ("PowerPV", "PowerFeedIn", "PowerLoad", "PowerBat", "SOC")
+            ],
+        }
+        for i in range(288)
+    ],
+    "links": {"totalItemsCount": 288},
+}
+
+
+def run(name: str, payload: dict, model, number: int):
+    response = httpx.Response(
+        200,
+        content=json.dumps(payload).encode(),
+        request=httpx.Request("GET", "https://api.solarweb.com/swqapi"),
+    )
+    results = []
+    for fast_decode in (False, True):
+        client = Fronius_Solarweb(fast_decode=fast_decode)
+        seconds = timeit.timeit(
+            lambda: client._decode(response, model),  # pylint: disable=protected-access
+            number=number,
+        )
+        results.append(seconds / number * 1e6)
+    print(
+        f"{name:<10} dict+validate {results[0]:10.1f} us"
+        f"   fast_decode {results[1]:10.1f} us   speedup {results[0] / results[1]:.2f}x"
+    )
+
+
+if __name__ == "__main__":
+    run("flowdata", FLOW_DATA, PvSystemFlowData, 5000)
+    run("histdata", HIST_DATA, HistoricalValues, 100)
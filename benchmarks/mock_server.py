@@ -0,0 +1,217 @@
+"""In process stand-in for the Solar.web API served through httpx.MockTransport."""
+
+import asyncio
+import base64
+from datetime import datetime, timedelta
+import itertools
+import json
+import random
+import time
+
+import httpx
+
+PV_SYSTEM_ID = "20bb600e-019b-4e03-9df3-a0a900cda689"
+CHANNELS = ("PowerPV", "PowerFeedIn", "PowerLoad", "PowerBattCharge", "BattSOC")
+
+
+def _channels(value: float, hist: bool = False) -> list:
+    channels = []
+    for i, name in enumerate(CHANNELS):
+        channel = {
+            "channelName": name,
+            "channelType": "Power" if i < 4 else "Percent",
+            "unit": "W" if i < 4 else "%",
+            "value": value + i,
+        }
+        if hist:
+            channel.update({"isActive": True, "isDamaged": False})
+        channels.append(channel)
+    return channels
+
+
+class MockSolarweb:
+    def __init__(
+        self,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        pv_systems: int = 10,
+        hist_page_size: int = 288,
+        seed: int = 1,
+        pv_system_page_size: int | None = None,
+        token_lifetime: float = 3600,
+    ):
+        """
+        Serve Solar.web API responses with configurable latency and failures.
+
+        :param latency: seconds each response is delayed
+        :param error_rate: share of requests answered with HTTP 500
+        :param rate_limit_rate: share of requests answered with HTTP 429
+        :param pv_systems: number of PV systems listed by /pvsystems
+        :param hist_page_size: number of histdata records per page
+        :param seed: seed of the random failure injection
+        :param pv_system_page_size (optional): number of PV systems per
+            /pvsystems page, all on one page by default
+        :param token_lifetime: seconds the JSON web tokens from /iam/jwt are valid
+        """
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.pv_systems = pv_systems
+        self.hist_page_size = hist_page_size
+        self.pv_system_page_size = pv_system_page_size
+        self.requests = 0
+        # ETag of the metadata responses, change it to simulate an update
+        self.metadata_version = 1
+        self.not_modified = 0
+        self.token_lifetime = token_lifetime
+        self.logins = 0
+        self.refreshes = 0
+        # JSON web tokens and refresh tokens accepted
+        self.tokens: set[str] = set()
+        self.refresh_tokens: set[str] = set()
+        self._token_ids = itertools.count()
+        self._random = random.Random(seed)
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    def client(self, **kwargs) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=self.transport(), **kwargs)
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        roll = self._random.random()
+        if roll < self.rate_limit_rate:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        if roll < self.rate_limit_rate + self.error_rate:
+            return httpx.Response(500)
+        path = request.url.path.removeprefix("/swqapi")
+        if path.startswith("/iam/jwt"):
+            return self._jwt(request, path)
+        authorization = request.headers.get("Authorization", "")
+        if authorization and authorization.removeprefix("Bearer ") not in self.tokens:
+            return httpx.Response(401)
+        parts = path.strip("/").split("/")
+        if len(parts) == 5 and parts[2] == "devices":
+            # device scoped data is served like the PV system's
+            parts = parts[:2] + parts[4:]
+        if path == "/info/release" or parts[2:] in ([], ["devices"]):
+            etag = f'"{self.metadata_version}"'
+            if request.headers.get("If-None-Match") == etag:
+                self.not_modified += 1
+                return httpx.Response(304, headers={"ETag": etag})
+            headers = {"ETag": etag}
+        else:
+            headers = {}
+        if path == "/info/release":
+            body = {"releaseVersion": "1.9.0", "releaseDate": "2023-01-01"}
+        elif path == "/pvsystems":
+            body = self._pv_systems_page(request)
+        elif len(parts) == 2:
+            body = self._pv_system(parts[1])
+        elif parts[2] == "devices":
+            body = {
+                "devices": [
+                    {
+                        "deviceId": f"device-{i}",
+                        "deviceType": "Inverter",
+                        "isActive": True,
+                    }
+                    for i in range(3)
+                ],
+                "links": {"totalItemsCount": 3},
+            }
+        elif parts[2] == "flowdata":
+            body = {
+                "pvSystemId": parts[1],
+                "status": {"isOnline": True, "battMode": "1"},
+                "data": {
+                    "logDateTime": "2023-01-01T12:00:00Z",
+                    "channels": _channels(1000.0),
+                },
+            }
+        elif parts[2] == "aggrdata":
+            body = {
+                "pvSystemId": parts[1],
+                "data": [
+                    {"logDateTime": f"2023-{month:02d}", "channels": _channels(month)}
+                    for month in range(1, 13)
+                ],
+            }
+        elif parts[2] == "histdata":
+            body = self._hist_page(request)
+        else:
+            return httpx.Response(404)
+        return httpx.Response(200, json=body, headers=headers)
+
+    def revoke_tokens(self, refresh_tokens: bool = False):
+        """Reject the JSON web tokens issued so far, optionally their refresh tokens too."""
+        self.tokens.clear()
+        if refresh_tokens:
+            self.refresh_tokens.clear()
+
+    def _jwt(self, request: httpx.Request, path: str) -> httpx.Response:
+        if request.method == "POST":
+            self.logins += 1
+        elif path.removeprefix("/iam/jwt/") in self.refresh_tokens:
+            self.refreshes += 1
+        else:
+            return httpx.Response(401)
+        token_id = next(self._token_ids)
+        payload = json.dumps({"exp": time.time() + self.token_lifetime}).encode()
+        token = f"e30.{base64.urlsafe_b64encode(payload).decode()}.{token_id}"
+        refresh = f"refresh-{token_id}"
+        self.tokens.add(token)
+        self.refresh_tokens.add(refresh)
+        return httpx.Response(200, json={"jwtToken": token, "refreshToken": refresh})
+
+    @staticmethod
+    def _pv_system(pv_system_id: str) -> dict:
+        return {"pvSystemId": pv_system_id, "name": "Benchmark", "peakPower": 10000}
+
+    def _pv_systems_page(self, request: httpx.Request) -> dict:
+        offset = int(request.url.params.get("offset", 0))
+        size = min(
+            self.pv_system_page_size or self.pv_systems, self.pv_systems - offset
+        )
+        links = {"totalItemsCount": self.pv_systems}
+        if offset + size < self.pv_systems:
+            links["next"] = request.url.copy_set_param(
+                "offset", offset + size
+            ).raw_path.decode()
+        return {
+            "pvSystems": [
+                self._pv_system(f"pv-{i}") for i in range(offset, offset + size)
+            ],
+            "links": links,
+        }
+
+    def _hist_page(self, request: httpx.Request) -> dict:
+        start = datetime.fromisoformat(request.url.params["from"].rstrip("Z"))
+        end = datetime.fromisoformat(request.url.params["to"].rstrip("Z"))
+        interval = timedelta(minutes=5)
+        # records are logged on a fixed grid, whatever window they're asked for in
+        first = start + (datetime.min - start) % interval
+        total = max(-((first - end) // interval), 0)
+        offset = int(request.url.params.get("offset", 0))
+        size = min(self.hist_page_size, total - offset)
+        links = {"totalItemsCount": total}
+        if offset + size < total:
+            links["next"] = request.url.copy_set_param(
+                "offset", offset + size
+            ).raw_path.decode()
+        return {
+            "pvSystemId": request.url.path.split("/")[3],
+            "data": [
+                {
+                    "logDateTime": (first + i * interval).isoformat() + "Z",
+                    "logDuration": 300,
+                    "channels": _channels(float(i), hist=True),
+                }
+                for i in range(offset, offset + size)
+            ],
+            "links": links,
+        }
@@ -0,0 +1,156 @@
+"""
+Benchmark the Fronius_Solarweb getters against the in process mock Solar.web API.
+
+Run from the repository root with:
+
+    python -m benchmarks.run                     # compare with baseline.json
+    python -m benchmarks.run --save-baseline     # update baseline.json
+    python -m benchmarks.run --latency 0.02 --error-rate 0.05 --rate-limit-rate 0.05
+"""
+
+import argparse
+import asyncio
+from datetime import datetime
+import json
+import logging
+import math
+from pathlib import Path
+import statistics
+import time
+import tracemalloc
+
+from tenacity import wait_none
+
+from fronius_solarweb.api import Fronius_Solarweb
+
+from .mock_server import PV_SYSTEM_ID, MockSolarweb
+
+BASELINE = Path(__file__).with_name("baseline.json")
+HIST_START = datetime(2023, 1, 1)
+HIST_END = datetime(2023, 1, 8)
+
+SCENARIOS = {
+    "get_api_release_info": lambda c: c.get_api_release_info(),
+    "get_pvsystems_meta_data": lambda c: c.get_pvsystems_meta_data(),
+    "get_pvsystem_meta_data": lambda c: c.get_pvsystem_meta_data(),
+    "get_devices_meta_data": lambda c: c.get_devices_meta_data(),
+    "get_system_flow_data": lambda c: c.get_system_flow_data(),
+    "get_system_aggr_data_v2": lambda c: c.get_system_aggr_data_v2(period="months"),
+    "get_hist_data": lambda c: c.get_hist_data(HIST_START, HIST_END),
+    "iter_hist_data (7 days, paged)": lambda c: _drain(
+        c.iter_hist_data(HIST_START, HIST_END)
+    ),
+}
+
+
+async def _drain(iterator):
+    return [item async for item in iterator]
+
+
+class BenchmarkClient(Fronius_Solarweb):
+    """Client recording the CPU time spent decoding and validating responses."""
+
+    decode_seconds = 0.0
+
+    def _decode(self, response, model):
+        start = time.process_time()
+        try:
+            return super()._decode(response, model)
+        finally:
+            self.decode_seconds += time.process_time() - start
+
+
+async def run_scenario(name, scenario, args) -> dict:
+    server = MockSolarweb(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+    )
+    client = BenchmarkClient(
+        "FKIA-benchmark",
+        "benchmark",
+        PV_SYSTEM_ID,
+        httpx_client=server.client(),
+        fast_decode=args.fast_decode,
+    )
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies = []
+
+    async def timed_call():
+        async with semaphore:
+            start = time.perf_counter()
+            await scenario(client)
+            latencies.append(time.perf_counter() - start)
+
+    calls = args.calls if "hist" not in name else max(args.calls // 20, 5)
+    start = time.perf_counter()
+    await asyncio.gather(*(timed_call() for _ in range(calls)))
+    elapsed = time.perf_counter() - start
+    requests = server.requests
+    # peak memory of a single call, measured apart as tracing slows the runs down
+    tracemalloc.start()
+    await scenario(client)
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    await client.httpx_client.aclose()
+    latencies.sort()
+    return {
+        "calls": calls,
+        "requests": requests,
+        "requests_per_second": round(requests / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p99_ms": round(latencies[math.ceil(len(latencies) * 0.99) - 1] * 1000, 3),
+        "decode_cpu_ms": round(client.decode_seconds * 1000, 3),
+        "peak_memory_kb": round(peak_memory / 1024, 1),
+    }
+
+
+def _disable_backoff():
+    # injected errors are retried straight away to keep the runs short
+    for name in dir(Fronius_Solarweb):
+        retrying = getattr(getattr(Fronius_Solarweb, name), "retry", None)
+        if retrying is not None and hasattr(retrying, "wait"):
+            retrying.wait = wait_none()
+
+
+def report(results: dict, baseline: dict | None):
+    print(
+        f"{'scenario':<32}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}"
+        f"{'decode ms':>11}{'peak KB':>10}{'vs base':>9}"
+    )
+    for name, result in results.items():
+        change = ""
+        if baseline and name in baseline:
+            base = baseline[name]["requests_per_second"]
+            change = f"{(result['requests_per_second'] / base - 1) * 100:+.0f}%"
+        print(
+            f"{name:<32}{result['requests_per_second']:>10}{result['p50_ms']:>10}"
+            f"{result['p99_ms']:>10}{result['decode_cpu_ms']:>11}"
+            f"{result['peak_memory_kb']:>10}{change:>9}"
+        )
+
+
+async def main(args):
+    # injected failures are expected, keep the report readable
+    logging.getLogger("fronius_solarweb").setLevel(logging.ERROR)
+    _disable_backoff()
+    results = {}
+    for name, scenario in SCENARIOS.items():
+        results[name] = await run_scenario(name, scenario, args)
+    baseline = json.loads(BASELINE.read_text()) if BASELINE.exists() else None
+    report(results, baseline)
+    if args.save_baseline:
+        BASELINE.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Saved baseline to {BASELINE}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--fast-decode", action="store_true")
+    parser.add_argument("--save-baseline", action="store_true")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,78 @@
+"""
+Measure import time and the latency of a cold client's first request.
+
+Every sample runs in a fresh interpreter so nothing is cached between runs.
+Run from the repository root with: python -m benchmarks.startup_benchmark
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+IMPORTS = ("fronius_solarweb", "fronius_solarweb.schema.hist", "fronius_solarweb.api")
+
+_IMPORT_SCRIPT = """
+import time
+started = time.perf_counter()
+import {module}
+print((time.perf_counter() - started) * 1000)
+"""
+
+_FIRST_REQUEST_SCRIPT = """
+import asyncio, json, time
+started = time.perf_counter()
+from fronius_solarweb import Fronius_Solarweb
+imported = time.perf_counter()
+from benchmarks.mock_server import PV_SYSTEM_ID, MockSolarweb
+
+async def main():
+    httpx_client = MockSolarweb().client()
+    request_started = time.perf_counter()
+    client = Fronius_Solarweb("id", "value", PV_SYSTEM_ID, httpx_client=httpx_client)
+    await client.get_system_flow_data()
+    first = time.perf_counter()
+    await client.get_system_flow_data()
+    second = time.perf_counter()
+    print(json.dumps({
+        "import_ms": (imported - started) * 1000,
+        "first_request_ms": (first - request_started) * 1000,
+        "second_request_ms": (second - first) * 1000,
+    }))
+
+asyncio.run(main())
+"""
+
+
+def _run(script: str) -> str:
+    return subprocess.run(
+        [sys.executable, "-c", script], check=True, capture_output=True, text=True
+    ).stdout
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    for module in IMPORTS:
+        samples = [
+            float(_run(_IMPORT_SCRIPT.format(module=module))) for _ in range(args.runs)
+        ]
+        print(
+            f"import {module:<30} median {statistics.median(samples):7.1f} ms"
+            f"   min {min(samples):7.1f} ms"
+        )
+
+    samples = [json.loads(_run(_FIRST_REQUEST_SCRIPT)) for _ in range(args.runs)]
+    for name in ("import_ms", "first_request_ms", "second_request_ms"):
+        values = [sample[name] for sample in samples]
+        print(
+            f"{name:<37} median {statistics.median(values):7.1f} ms"
+            f"   min {min(values):7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
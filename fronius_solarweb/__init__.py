@@ -1 +1,28 @@
-from .api import Fronius_Solarweb
+import importlib
+from typing import TYPE_CHECKING
+
+# the clients are imported on first use, so importing the package (or just
+# its schema) doesn't load httpx and the API client
+_EXPORTS = {
+    "Fronius_Solarweb": ".api",
+    "Fronius_Solarweb_Fleet": ".fleet",
+    "Fronius_Solarweb_Pool": ".pool",
+}
+__all__ = list(_EXPORTS)
+
+if TYPE_CHECKING:
+    from .api import Fronius_Solarweb
+    from .fleet import Fronius_Solarweb_Fleet
+    from .pool import Fronius_Solarweb_Pool
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
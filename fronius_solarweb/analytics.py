@@ -0,0 +1,246 @@
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .columnar import ChannelColumn, ColumnarSeries, _require_numpy, np
+
+# unit -> (base unit, factor converting to the base unit)
+UNIT_SCALES: Dict[str, Tuple[str, float]] = {
+    "W": ("W", 1.0),
+    "kW": ("W", 1e3),
+    "MW": ("W", 1e6),
+    "Wh": ("Wh", 1.0),
+    "kWh": ("Wh", 1e3),
+    "MWh": ("Wh", 1e6),
+}
+FREQUENCIES = {"minute": "m", "hour": "h", "day": "D", "month": "M", "year": "Y"}
+_REDUCTIONS = ("sum", "mean", "max", "min")
+
+
+def _valid_values(column: ChannelColumn) -> "np.ndarray":
+    """Return the channel values with the damaged points set to NaN."""
+    if not column.damaged.any():
+        return column.values
+    return np.where(column.damaged, np.nan, column.values)
+
+
+def to_base_unit(column: ChannelColumn) -> ChannelColumn:
+    """Convert a channel in kW, MW, kWh or MWh to W or Wh, other units are returned as is."""
+    base_unit, factor = UNIT_SCALES.get(column.unit, (column.unit, 1.0))
+    if factor == 1.0:
+        return column
+    return ChannelColumn(
+        channelName=column.channelName,
+        channelType=column.channelType,
+        unit=base_unit,
+        values=column.values * factor,
+        damaged=column.damaged,
+    )
+
+
+def _default_reduction(column: ChannelColumn) -> str:
+    # energy is additive, power and other readings are averaged
+    if UNIT_SCALES.get(column.unit, (None,))[0] == "Wh":
+        return "sum"
+    return "mean"
+
+
+def _reduce(
+    values: "np.ndarray", groups: "np.ndarray", size: int, how: str
+) -> "np.ndarray":
+    present = ~np.isnan(values)
+    groups, values = groups[present], values[present]
+    counts = np.bincount(groups, minlength=size)
+    if how in ("sum", "mean"):
+        result = np.bincount(groups, weights=values, minlength=size)
+        if how == "mean":
+            result = np.divide(result, counts, where=counts > 0, out=result)
+    elif how == "max":
+        result = np.full(size, -np.inf)
+        np.maximum.at(result, groups, values)
+    elif how == "min":
+        result = np.full(size, np.inf)
+        np.minimum.at(result, groups, values)
+    else:
+        raise ValueError(f"how must be one of {_REDUCTIONS}, not {how}")
+    result[counts == 0] = np.nan
+    return result
+
+
+def resample(
+    series: ColumnarSeries,
+    freq: str = "day",
+    how: str | Dict[str, str] | None = None,
+    utc_offset: timedelta = timedelta(0),
+) -> ColumnarSeries:
+    """
+    Aggregate a series into minute, hour, day, month or year periods.
+
+    Damaged points are skipped, a period without any valid value is NaN.
+    Timestamps of the result are the start of each period in UTC.
+
+    :param series: historical or aggregated data
+    :param freq: one of minute, hour, day, month or year
+    :param how (optional): sum, mean, max or min, for all channels or per
+        channel name. Defaults to sum for energy and mean for other units.
+    :param utc_offset: offset of the local time periods are aligned to, e.g.
+        timedelta(hours=12) for days starting at midnight in New Zealand
+    """
+    _require_numpy()
+    if freq not in FREQUENCIES:
+        raise ValueError(f"freq must be one of {list(FREQUENCIES)}, not {freq}")
+    offset = np.timedelta64(int(utc_offset.total_seconds()), "s")
+    valid = ~np.isnat(series.timestamps)
+    periods = (series.timestamps[valid] + offset).astype(
+        f"datetime64[{FREQUENCIES[freq]}]"
+    )
+    keys, groups = np.unique(periods, return_inverse=True)
+    groups = groups.ravel()
+    size = len(keys)
+    channels = {}
+    for name, column in series.channels.items():
+        reduction = how.get(name) if isinstance(how, dict) else how
+        channels[name] = ChannelColumn(
+            channelName=column.channelName,
+            channelType=column.channelType,
+            unit=column.unit,
+            values=_reduce(
+                _valid_values(column)[valid],
+                groups,
+                size,
+                reduction or _default_reduction(column),
+            ),
+            damaged=np.zeros(size, dtype=bool),
+        )
+    return ColumnarSeries(
+        pvSystemId=series.pvSystemId,
+        deviceId=series.deviceId,
+        timestamps=keys.astype("datetime64[s]") - offset,
+        durations=np.bincount(
+            groups, weights=series.durations[valid], minlength=size
+        ).astype(np.int64),
+        channels=channels,
+    )
+
+
+def _spacing(series: ColumnarSeries) -> "np.ndarray":
+    """Return each point's logDuration, or the seconds to the next point when missing."""
+    durations = series.durations.astype(np.float64)
+    missing = durations <= 0
+    if missing.any() and len(series) > 1:
+        steps = np.diff(series.timestamps).astype("timedelta64[s]").astype(np.float64)
+        steps = np.append(steps, np.nanmedian(steps))
+        durations = np.where(missing, steps, durations)
+    return durations
+
+
+def integrate(
+    series: ColumnarSeries, channel: str, name: str | None = None
+) -> ChannelColumn:
+    """
+    Integrate a power channel into energy in Wh per data point.
+
+    Each power value is taken as the average over its logDuration, damaged
+    points are NaN. Resample the result with how="sum" for energy totals.
+
+    :param series: historical data
+    :param channel: name of a channel in W, kW or MW
+    :param name (optional): name of the energy channel, defaults to the
+        power channel's name with an Energy prefix
+    """
+    _require_numpy()
+    column = series.channels[channel]
+    if UNIT_SCALES.get(column.unit, (None,))[0] != "W":
+        raise ValueError(f"{channel} is in {column.unit}, not a unit of power")
+    power = to_base_unit(column)
+    return ChannelColumn(
+        channelName=name or f"Energy{channel}",
+        channelType="Energy",
+        unit="Wh",
+        values=_valid_values(power) * _spacing(series) / 3600,
+        damaged=column.damaged,
+    )
+
+
+def find_gaps(
+    series: ColumnarSeries, tolerance: float = 0.0
+) -> List[Tuple["np.datetime64", "np.datetime64"]]:
+    """
+    Return the (start, end) periods not covered by any data point.
+
+    A point covers logDuration seconds from its logDateTime, so a gap is
+    found where the next point starts more than tolerance seconds after the
+    previous one ended.
+    """
+    _require_numpy()
+    valid = ~np.isnat(series.timestamps)
+    timestamps = series.timestamps[valid]
+    order = np.argsort(timestamps, kind="stable")
+    timestamps = timestamps[order]
+    ends = timestamps + series.durations[valid][order].astype("timedelta64[s]")
+    # the furthest any earlier point reaches, as points may overlap
+    covered = np.maximum.accumulate(ends.astype(np.int64)).astype("datetime64[s]")
+    starts = timestamps[1:]
+    gaps = (starts - covered[:-1]).astype(np.float64) > tolerance
+    return list(zip(covered[:-1][gaps], starts[gaps]))
+
+
+def rollup(
+    series: Iterable[ColumnarSeries],
+    freq: str = "day",
+    channels: List[str] | None = None,
+    utc_offset: timedelta = timedelta(0),
+) -> ColumnarSeries:
+    """
+    Sum the channels of several PV systems per period.
+
+    Each series is resampled with the default reductions and converted to
+    base units (W, Wh) before the sites are added up, a period is NaN only
+    when no site has a value for it.
+
+    :param series: historical or aggregated data of each PV system
+    :param freq: one of minute, hour, day, month or year
+    :param channels (optional): channel names to roll up, defaults to all
+    :param utc_offset: offset of the local time periods are aligned to
+    """
+    _require_numpy()
+    resampled = [resample(s, freq, utc_offset=utc_offset) for s in series]
+    if not resampled:
+        return ColumnarSeries(
+            None, None, np.array([], dtype="datetime64[s]"), np.array([], np.int64)
+        )
+    keys = np.unique(np.concatenate([s.timestamps for s in resampled]))
+    size = len(keys)
+    totals: Dict[str, ChannelColumn] = {}
+    durations = np.zeros(size, dtype=np.int64)
+    for site in resampled:
+        positions = np.searchsorted(keys, site.timestamps)
+        np.maximum.at(durations, positions, site.durations)
+        for name, column in site.channels.items():
+            if channels is not None and name not in channels:
+                continue
+            column = to_base_unit(column)
+            total: Optional[ChannelColumn] = totals.get(name)
+            if total is None:
+                total = totals[name] = ChannelColumn(
+                    channelName=column.channelName,
+                    channelType=column.channelType,
+                    unit=column.unit,
+                    values=np.full(size, np.nan),
+                    damaged=np.zeros(size, dtype=bool),
+                )
+            elif total.unit != column.unit:
+                raise ValueError(
+                    f"{name} is in {total.unit} and {column.unit}, can't add them"
+                )
+            present = ~np.isnan(column.values)
+            target = positions[present]
+            total.values[target] = np.nan_to_num(total.values[target]) + (
+                column.values[present]
+            )
+    return ColumnarSeries(
+        pvSystemId=None,
+        deviceId=None,
+        timestamps=keys,
+        durations=durations,
+        channels=totals,
+    )
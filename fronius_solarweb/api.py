@@ -1,31 +1,163 @@
+import asyncio
+import copy
+import importlib.util
+import weakref
+from functools import lru_cache
 from datetime import datetime
 import logging
+import time
 
-from httpx import AsyncClient
 from pydantic import ValidationError
 from tenacity import (
+    RetryCallState,
     retry,
     retry_if_not_exception_type,
     wait_random_exponential,
     stop_after_attempt,
 )
-from typing import List
-
-from .errors import NotAuthorizedException, NotFoundException
+from typing import (
+    TYPE_CHECKING,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Type,
+    TypeVar,
+)
 
-from .schema.pvsystem import (
-    PvSystemMetaData,
-    PvSystemsMetaData,
-    PvSystemFlowData,
-    PvSystemAggrDataV2,
+from . import schema
+from .auth import DEFAULT_REFRESH_MARGIN, TokenManager
+from .errors import (
+    CircuitOpenException,
+    DeadlineExceededException,
+    NotAuthorizedException,
+    NotFoundException,
+    TooManyRequestsException,
 )
-from .schema.device import DeviceMetaData, DevicesMetaData
-from .schema.hist import HistoricalValues
-from .schema.service import ReleaseInfo
+from .ratelimit import parse_retry_after, wait_retry_after
+from .resilience import bounded_timeout, remaining_time, stop_resilient
+
+# httpx, the models and the optional features are imported on first use, so
+# importing the client stays cheap
+if TYPE_CHECKING:
+    from httpx import AsyncClient, Response
+    from pydantic import BaseModel, TypeAdapter
+
+    from .cache import CacheEntry, ResponseCache
+    from .columnar import ColumnarSeries
+    from .instrumentation import Instrumentation, RequestEvent
+    from .ratelimit import RateLimiter
+    from .resilience import CircuitBreaker, ResiliencePolicy
+    from .schema.device import DeviceMetaData
+    from .schema.hist import HistoricalData, HistoricalValues
+    from .schema.pvsystem import (
+        AggrData,
+        DeviceAggrDataV2,
+        PvSystemAggrDataV2,
+        PvSystemFlowData,
+        PvSystemMetaData,
+    )
+    from .schema.service import ReleaseInfo
 
 _LOGGER = logging.getLogger(__name__)
 SW_BASE_URL = "https://api.solarweb.com/swqapi"
 MAX_ATTEMPTS = 5
+DEFAULT_DEVICE_CONCURRENCY = 8
+SHARED_MAX_CONNECTIONS = 100
+SHARED_MAX_KEEPALIVE = 20
+SHARED_KEEPALIVE_EXPIRY = 60
+
+PageModel = TypeVar("PageModel", bound="BaseModel")
+_EVENT_EXTENSION = "fronius_solarweb.event"
+
+
+def _on_retry(retry_state: RetryCallState):
+    client = retry_state.args[0]
+    if client.instrumentation is not None:
+        client.instrumentation.on_retry(
+            retry_state.fn.__name__,
+            retry_state.attempt_number,
+            retry_state.outcome.exception(),
+        )
+
+
+# raises tenacity.RetryError if max attempts reached, every decorated method
+# gets its own Retrying
+_retry = retry(
+    wait=wait_retry_after(wait_random_exponential(multiplier=2, max=60)),
+    retry=retry_if_not_exception_type(
+        (
+            ValidationError,
+            NotAuthorizedException,
+            NotFoundException,
+            CircuitOpenException,
+            DeadlineExceededException,
+            asyncio.CancelledError,
+        )
+    ),
+    stop=stop_resilient(stop_after_attempt(MAX_ATTEMPTS)),
+    before_sleep=_on_retry,
+)
+
+
+_shared_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def shared_client() -> "AsyncClient":
+    """
+    Return the httpx client shared by the clients of the running event loop.
+
+    It is created on first use with a keep-alive connection pool, and HTTP/2
+    when h2 is installed (pip install fronius_solarweb[http2]).
+    """
+    from httpx import AsyncClient, Limits  # pylint: disable=import-outside-toplevel
+
+    loop = asyncio.get_running_loop()
+    client = _shared_clients.get(loop)
+    if client is None or client.is_closed:
+        client = _shared_clients[loop] = AsyncClient(
+            http2=importlib.util.find_spec("h2") is not None,
+            limits=Limits(
+                max_connections=SHARED_MAX_CONNECTIONS,
+                max_keepalive_connections=SHARED_MAX_KEEPALIVE,
+                keepalive_expiry=SHARED_KEEPALIVE_EXPIRY,
+            ),
+        )
+    return client
+
+
+async def aclose_shared_clients():
+    """
+    Close the httpx client shared on the running event loop.
+
+    Call it before the event loop ends, e.g. last in the coroutine passed to
+    asyncio.run, the next shared_client() call creates a new one. Clients of
+    event loops already closed are dropped.
+    """
+    loop = asyncio.get_running_loop()
+    for other in [other for other in _shared_clients if other.is_closed()]:
+        del _shared_clients[other]
+    client = _shared_clients.pop(loop, None)
+    if client is not None and not client.is_closed:
+        await client.aclose()
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Future):
+        self.task = task
+        self.waiters = 0
+
+
+@lru_cache(maxsize=None)
+def _type_adapter(model) -> "TypeAdapter":
+    from pydantic import TypeAdapter  # pylint: disable=import-outside-toplevel
+
+    return TypeAdapter(model)
 
 
 class Fronius_Solarweb:
@@ -34,9 +166,18 @@ class Fronius_Solarweb:
         access_key_id: str = None,
         access_key_value: str = None,
         pv_system_id: str = None,
-        httpx_client: AsyncClient = None,
+        httpx_client: "AsyncClient" = None,
         login_name: str = None,
         login_password: str = None,
+        fast_decode: bool = False,
+        cache: "ResponseCache | None" = None,
+        cache_ttls: Dict[str, float] | None = None,
+        rate_limiter: "RateLimiter | None" = None,
+        coalesce_requests: bool = False,
+        aggr_batch_window: float = 0.0,
+        token_refresh_margin: float = DEFAULT_REFRESH_MARGIN,
+        instrumentation: "Instrumentation | None" = None,
+        resilience: "ResiliencePolicy | None" = None,
     ):
         """
         Create an Fronius Solarweb API client from either key/id or login/password.
@@ -50,16 +191,54 @@ class Fronius_Solarweb:
         :param pv_system_id (optional): Unique PV system ID,
             this can be provided or determined from a call to
             get_pvsystems_meta_data()
-        :param httpx_client (optional)
+        :param httpx_client (optional): defaults to the client shared by every
+            Fronius_Solarweb on the event loop, see shared_client(), close it
+            with aclose_shared_clients()
         :param login_name (optional): Solar.web app email / login name.
         :param login_password (optional): Solar.web app password.
+        :param fast_decode (optional): validate responses directly from the
+            JSON bytes instead of decoding to a dict first.
+        :param cache (optional): cache for the metadata and release info
+            responses, e.g. MemoryCache(). Cached models are shared between
+            callers and must not be modified.
+        :param cache_ttls (optional): seconds each getter's response stays
+            fresh, overriding DEFAULT_TTLS.
+        :param rate_limiter (optional): throttles every request of the client,
+            share one instance to throttle several clients together.
+        :param coalesce_requests (optional): identical concurrent GET requests
+            share one response, and aggregated v2 requests for the same period
+            are merged into one request for all channels asked for. Returned
+            models are shared between callers and must not be modified.
+        :param aggr_batch_window (optional): seconds aggregated v2 requests
+            wait for other channels to be asked for before being sent.
+        :param token_refresh_margin (optional): seconds before expiry a JSON
+            web token obtained by login() is refreshed, call
+            token_manager.start() to refresh in the background.
+        :param instrumentation (optional): receives timings, sizes and retries
+            of every request, e.g. PrometheusInstrumentation().
+        :param resilience (optional): circuit breakers and retry budget, e.g.
+            ResiliencePolicy(). Calls made inside a resilience.deadline() block
+            are bounded by it with or without a policy.
         """
         self.access_key_id = access_key_id
         self.access_key_value = access_key_value
         self.login_name = login_name
         self.login_password = login_password
         self.pv_system_id = pv_system_id
-        self.httpx_client = httpx_client or AsyncClient()
+        self.fast_decode = fast_decode
+        self.cache = cache
+        from .cache import DEFAULT_TTLS  # pylint: disable=import-outside-toplevel
+
+        self.cache_ttls = {**DEFAULT_TTLS, **(cache_ttls or {})}
+        self.coalesce_requests = coalesce_requests
+        self.aggr_batch_window = aggr_batch_window
+        self._in_flight: Dict[str, _Flight] = {}
+        self._aggr_batches: Dict[str, tuple[set, asyncio.Future]] = {}
+        self.rate_limiter = rate_limiter
+        self.token_manager = TokenManager(self, token_refresh_margin)
+        self.instrumentation = instrumentation
+        self.resilience = resilience
+        self._httpx_client = httpx_client
         self.jwt_data: dict = {}
         self._jwt_base_header = {
             "Content-Type": "application/json-patch+json",
@@ -70,10 +249,42 @@ class Fronius_Solarweb:
             "User-Agent": "Solar.web/921 CFNetwork/1410.0.3 Darwin/22.6.0",
         }
 
+    @property
+    def httpx_client(self) -> "AsyncClient":
+        if self._httpx_client is not None:
+            return self._httpx_client
+        try:
+            return shared_client()
+        except RuntimeError:
+            # no running event loop to share a client on
+            from httpx import AsyncClient  # pylint: disable=import-outside-toplevel
+
+            self._httpx_client = AsyncClient()
+            return self._httpx_client
+
+    @httpx_client.setter
+    def httpx_client(self, httpx_client: "AsyncClient"):
+        self._httpx_client = httpx_client
+
+    def for_pv_system(self, pv_system_id: str) -> "Fronius_Solarweb":
+        """
+        Return a client bound to another PV system sharing this client's state.
+
+        The returned client reuses the httpx client (and its connection pool)
+        together with the authentication headers and JWT data, so a login or
+        token refresh on either client applies to both.
+
+        :param pv_system_id: Unique PV system ID the new client is bound to.
+        """
+        client = copy.copy(self)
+        client.pv_system_id = pv_system_id
+        return client
+
     @property
     def _common_headers(self):
         if self._jwt_headers.get("Authorization"):
-            return self._jwt_headers
+            # a copy, so a request's headers can't be changed by a later refresh
+            return dict(self._jwt_headers)
         else:
             return {
                 "Accept": "application/json",
@@ -92,7 +303,145 @@ class Fronius_Solarweb:
     def _jwt_del_header(self, key: str):
         self._jwt_base_header.pop(key, None)
 
-    async def _check_api_response(self, response):
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        authenticate: bool = True,
+        stream: bool = False,
+        **kwargs,
+    ) -> "Response":
+        """
+        Send a request, refreshing the JSON web token and replaying it on a 401.
+
+        With stream the body isn't read, close the response with
+        _aclose_response() once done with it.
+        """
+        if authenticate:
+            await self.token_manager.ensure_valid()
+        r = await self._send(method, url, stream, **kwargs)
+        if r.status_code == 401 and authenticate and self.token_manager.active:
+            # the token expired or was revoked, refresh it once and replay
+            _LOGGER.debug("Request unauthorised, refreshing JSON web token")
+            await self._aclose_response(r)
+            await self.token_manager.refresh()
+            kwargs["headers"] = {
+                **kwargs.get("headers", {}),
+                "Authorization": self._jwt_headers["Authorization"],
+            }
+            r = await self._send(method, url, stream, **kwargs)
+        return r
+
+    def _transport_failure(
+        self,
+        error: Exception,
+        url: str,
+        remaining: float | None,
+        breaker: "CircuitBreaker | None",
+    ):
+        from httpx import TimeoutException  # pylint: disable=import-outside-toplevel
+
+        if (
+            isinstance(error, TimeoutException)
+            and remaining is not None
+            and remaining_time() <= 0
+        ):
+            # the caller's deadline, not Solar.web, cut the request short
+            raise DeadlineExceededException(f"Deadline exceeded for {url}") from error
+        if breaker is not None:
+            breaker.record_failure()
+
+    async def _send(
+        self, method: str, url: str, stream: bool = False, **kwargs
+    ) -> "Response":
+        # pylint: disable-next=import-outside-toplevel
+        from httpx import TimeoutException, TransportError
+
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire()
+        remaining = remaining_time()
+        if remaining is not None:
+            if remaining <= 0:
+                raise DeadlineExceededException(f"No time left for {method} {url}")
+            kwargs["timeout"] = bounded_timeout(self.httpx_client.timeout, remaining)
+        if self.resilience is None:
+            try:
+                return await self._dispatch(method, url, stream, **kwargs)
+            except TimeoutException as e:
+                self._transport_failure(e, url, remaining, None)
+                raise
+        # pylint: disable-next=import-outside-toplevel
+        from .instrumentation import endpoint_name
+
+        breaker = self.resilience.breaker(endpoint_name(method, url))
+        breaker.before_request()
+        if self.resilience.retry_budget is not None:
+            self.resilience.retry_budget.deposit()
+        try:
+            r = await self._dispatch(method, url, stream, **kwargs)
+        except TransportError as e:
+            self._transport_failure(e, url, remaining, breaker)
+            raise
+        breaker.record_status(r.status_code)
+        return r
+
+    async def _dispatch(
+        self, method: str, url: str, stream: bool = False, **kwargs
+    ) -> "Response":
+        if self.instrumentation is not None:
+            return await self._send_instrumented(method, url, stream, **kwargs)
+        r = await self._send_request(method, url, stream, **kwargs)
+        if self.rate_limiter is not None:
+            self.rate_limiter.update(r.headers, r.status_code)
+        return r
+
+    async def _send_request(
+        self, method: str, url: str, stream: bool, **kwargs
+    ) -> "Response":
+        client = self.httpx_client
+        return await client.send(
+            client.build_request(method, url, **kwargs), stream=stream
+        )
+
+    async def _send_instrumented(
+        self, method: str, url: str, stream: bool = False, **kwargs
+    ) -> "Response":
+        # pylint: disable-next=import-outside-toplevel
+        from .instrumentation import RequestEvent, endpoint_name
+
+        event = RequestEvent(endpoint_name(method, url), method, url)
+        kwargs["extensions"] = {**kwargs.get("extensions", {}), "trace": event.trace}
+        self.instrumentation.on_request(event)
+        try:
+            r = await self._send_request(method, url, stream, **kwargs)
+        except Exception as e:
+            event.error = e
+            self._end_event(event)
+            raise
+        event.status_code = r.status_code
+        event.request_bytes = len(r.request.content)
+        r.extensions[_EVENT_EXTENSION] = event
+        if self.rate_limiter is not None:
+            self.rate_limiter.update(r.headers, r.status_code)
+        if not stream:
+            event.response_bytes = len(r.content)
+            self._end_event(event)
+        # a streamed response's event ends when it is closed
+        return r
+
+    def _end_event(self, event: "RequestEvent"):
+        event.timings["total"] = time.perf_counter() - event.started
+        self.instrumentation.on_response(event)
+
+    async def _aclose_response(self, response: "Response"):
+        await response.aclose()
+        event = response.extensions.get(_EVENT_EXTENSION)
+        if event is not None and "total" not in event.timings:
+            # streamed, the body has been read now
+            event.response_bytes = response.num_bytes_downloaded
+            self._end_event(event)
+
+    def _check_api_status(self, response):
         if response.status_code == 401:
             _LOGGER.warning(
                 "Access unauthorised check solar.web access key values or login password"
@@ -101,204 +450,593 @@ class Fronius_Solarweb:
         if response.status_code == 404:
             _LOGGER.warning("Item not found check your PV system ID")
             raise NotFoundException()
+        if response.status_code == 429:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            _LOGGER.warning(f"Rate limited by Solar.web, retry after {retry_after}s")
+            raise TooManyRequestsException(retry_after)
 
         response.raise_for_status()
+
+    async def _check_api_response(self, response):
+        self._check_api_status(response)
         # returns dict type not string
         return response.json()
 
+    def _decode(self, response, model: Type[PageModel]) -> PageModel:
+        self._check_api_status(response)
+        event = response.extensions.get(_EVENT_EXTENSION)
+        try:
+            if event is not None:
+                return self._decode_instrumented(response, model, event)
+            if self.fast_decode:
+                # validate straight from the body bytes, skipping the dict tree
+                return _type_adapter(model).validate_json(response.content)
+            return model.model_validate(response.json())
+        except ValidationError as e:
+            _LOGGER.error(
+                f"Unable to validate data receieved from SolarWeb api: {response.text}"
+            )
+            _LOGGER.error(e)
+            raise
+
+    def _decode_instrumented(
+        self, response, model: Type[PageModel], event: "RequestEvent"
+    ) -> PageModel:
+        started = time.perf_counter()
+        try:
+            if self.fast_decode:
+                return _type_adapter(model).validate_json(response.content)
+            json_data = response.json()
+            decoded = time.perf_counter()
+            event.timings["decode"] = decoded - started
+            started = decoded
+            return model.model_validate(json_data)
+        finally:
+            event.timings["validate"] = time.perf_counter() - started
+            self.instrumentation.on_decode(event)
+
+    @property
+    def identity(self) -> str:
+        """Login name, or access key id, the token and cached responses belong to."""
+        return self.login_name or self.access_key_id or ""
+
+    async def _single_flight(self, key: str, factory: Callable[[], Awaitable]):
+        # concurrent callers for the same key share a single request, run in a
+        # task of its own so a caller being cancelled only stops its own wait
+        flight = self._in_flight.get(key)
+        if flight is None:
+            flight = self._in_flight[key] = _Flight(asyncio.ensure_future(factory()))
+            flight.task.add_done_callback(lambda _: self._end_flight(key, flight))
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if not flight.waiters and not flight.task.done():
+                # every caller has given up, later callers start a new request
+                flight.task.cancel()
+                self._end_flight(key, flight)
+
+    def _end_flight(self, key: str, flight: "_Flight"):
+        if self._in_flight.get(key) is flight:
+            del self._in_flight[key]
+        if flight.task.done() and not flight.task.cancelled():
+            # mark retrieved, the exception is raised to the waiting callers
+            flight.task.exception()
+
+    async def _fetch(self, url: str, model: Type[PageModel]) -> PageModel:
+        r = await self._request("GET", url, headers=self._common_headers)
+        return self._decode(r, model)
+
+    async def _coalesced_get(self, url: str, model: Type[PageModel]) -> PageModel:
+        if not self.coalesce_requests:
+            return await self._fetch(url, model)
+        return await self._single_flight(
+            f"{self.identity}|{url}", lambda: self._fetch(url, model)
+        )
+
+    async def _cached_get(self, endpoint: str, url: str, model: Type[PageModel]):
+        if self.cache is None:
+            return await self._coalesced_get(url, model)
+        key = f"{self.identity}|{url}"
+        entry = await self._cache_call(self.cache.get, key)
+        if entry is not None and entry.fresh:
+            return entry.value
+        return await self._single_flight(
+            key, lambda: self._revalidate(endpoint, key, url, model, entry)
+        )
+
+    async def _cache_call(self, method: Callable, *args):
+        if self.cache.blocking:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    async def _revalidate(
+        self,
+        endpoint: str,
+        key: str,
+        url: str,
+        model: Type[PageModel],
+        entry: "CacheEntry | None",
+    ):
+        from .cache import CacheEntry  # pylint: disable=import-outside-toplevel
+
+        headers = dict(self._common_headers)
+        if entry is not None and entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry is not None and entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        r = await self._request("GET", url, headers=headers)
+        if r.status_code == 304 and entry is not None:
+            _LOGGER.debug(f"Cached response for {endpoint} not modified")
+            value = entry.value
+        else:
+            value = self._decode(r, model)
+        await self._cache_call(
+            self.cache.set,
+            key,
+            CacheEntry(
+                value=value,
+                expires=time.time() + self.cache_ttls.get(endpoint, 0),
+                etag=r.headers.get("ETag"),
+                last_modified=r.headers.get("Last-Modified"),
+            ),
+        )
+        return value
+
+    async def _batched_aggr_data_v2(
+        self, period: str, channels: List[str]
+    ) -> "PvSystemAggrDataV2":
+        # calls differing only in channels within the batch window share one request
+        key = f"{self.identity}|{self.pv_system_id}|{period}"
+        batch = self._aggr_batches.get(key)
+        if batch is None:
+            batch = self._aggr_batches[key] = (
+                set(),
+                asyncio.ensure_future(self._flush_aggr_batch(key, period)),
+            )
+        batch[0].update(channels)
+        model_data = await asyncio.shield(batch[1])
+        wanted = set(channels)
+        return model_data.model_copy(
+            update={
+                "data": [
+                    aggr.model_copy(
+                        update={
+                            "channels": [
+                                channel
+                                for channel in aggr.channels or []
+                                if channel.channelName in wanted
+                            ]
+                        }
+                    )
+                    for aggr in model_data.data or []
+                ]
+            }
+        )
+
+    async def _flush_aggr_batch(self, key: str, period: str) -> "PvSystemAggrDataV2":
+        await asyncio.sleep(self.aggr_batch_window)
+        channels, _ = self._aggr_batches.pop(key)
+        _LOGGER.debug(f"Requesting batched aggregated v2 channels {channels}")
+        return await self._fetch(
+            self._aggr_url(period, sorted(channels)), schema.PvSystemAggrDataV2
+        )
+
+    def set_jwt_data(self, jwt_data: dict):
+        """Use a JSON web token obtained elsewhere, e.g. by another replica."""
+        # update in place so clients from for_pv_system() see the new token
+        self.jwt_data.clear()
+        self.jwt_data.update(jwt_data)
+        _LOGGER.debug("JWT data returned: %s", self.jwt_data)
+        self._jwt_headers = {"Authorization": "Bearer " + self.jwt_data.get("jwtToken")}
+
     async def login(self):
         self._jwt_del_header("Authorization")
         _LOGGER.debug("Obtaining JSON web token")
-        r = await self.httpx_client.post(
+        r = await self._request(
+            "POST",
             f"{SW_BASE_URL}/iam/jwt",
+            authenticate=False,
             headers=self._jwt_headers,
             json={
                 "userId": self.login_name,
                 "password": self.login_password,
             },
         )
-        self.jwt_data = await self._check_api_response(r)
-        _LOGGER.debug(f"JWT data returned: {self.jwt_data}")
-        self._jwt_headers = {"Authorization": "Bearer " + self.jwt_data.get("jwtToken")}
+        self.set_jwt_data(await self._check_api_response(r))
 
     async def refresh_token(self, token: str = None):
         refresh = self.jwt_data.get("refreshToken", token)
         self._jwt_del_header("Authorization")
-        _LOGGER.debug(f"Obtaining JSON web token using refresh token: {refresh}")
-        r = await self.httpx_client.patch(
-            f"{SW_BASE_URL}/iam/jwt/{refresh}", headers=self._common_headers
+        _LOGGER.debug("Obtaining JSON web token using refresh token: %s", refresh)
+        r = await self._request(
+            "PATCH",
+            f"{SW_BASE_URL}/iam/jwt/{refresh}",
+            authenticate=False,
+            headers=self._common_headers,
         )
-        self.jwt_data = await self._check_api_response(r)
-        _LOGGER.debug(f"JWT data returned: {self.jwt_data}")
-        self._jwt_headers = {"Authorization": "Bearer " + self.jwt_data.get("jwtToken")}
+        self.set_jwt_data(await self._check_api_response(r))
 
-    @retry(
-        wait=wait_random_exponential(multiplier=2, max=60),
-        retry=retry_if_not_exception_type(
-            (ValidationError, NotAuthorizedException, NotFoundException)
-        ),
-        stop=stop_after_attempt(MAX_ATTEMPTS),
-    )  # raises tenacity.RetryError if max attempts reached
-    async def get_api_release_info(self) -> ReleaseInfo:
+    @_retry
+    async def get_api_release_info(self) -> "ReleaseInfo":
         _LOGGER.debug("Listing SolarWeb api release info")
-        r = await self.httpx_client.get(
-            f"{SW_BASE_URL}/info/release",
-            headers=self._common_headers,
+        return await self._cached_get(
+            "get_api_release_info", f"{SW_BASE_URL}/info/release", schema.ReleaseInfo
         )
-        json_data = await self._check_api_response(r)
-        try:
-            model_data = ReleaseInfo.model_validate(json_data)
-        except ValidationError as e:
-            _LOGGER.error(
-                f"Unable to validate data receieved from SolarWeb api: {json_data}"
-            )
-            _LOGGER.error(e)
-        return model_data
-
-    @retry(
-        wait=wait_random_exponential(multiplier=2, max=60),
-        retry=retry_if_not_exception_type(
-            (ValidationError, NotAuthorizedException, NotFoundException)
-        ),
-        stop=stop_after_attempt(MAX_ATTEMPTS),
-    )  # raises tenacity.RetryError if max attempts reached
-    async def get_pvsystems_meta_data(self) -> list[PvSystemMetaData]:
+
+    @_retry
+    async def get_pvsystems_meta_data(self) -> "list[PvSystemMetaData]":
         _LOGGER.debug("Listing PV systems meta data")
-        r = await self.httpx_client.get(
-            f"{SW_BASE_URL}/pvsystems",
-            headers=self._common_headers,
-        )
-        json_data = await self._check_api_response(r)
-        try:
-            model_data = PvSystemsMetaData.model_validate(json_data).pvSystems
-        except ValidationError as e:
-            _LOGGER.error(
-                f"Unable to validate data receieved from SolarWeb api: {json_data}"
+        return (
+            await self._cached_get(
+                "get_pvsystems_meta_data",
+                f"{SW_BASE_URL}/pvsystems",
+                schema.PvSystemsMetaData,
             )
-            _LOGGER.error(e)
-        return model_data
-
-    @retry(
-        wait=wait_random_exponential(multiplier=2, max=60),
-        retry=retry_if_not_exception_type(
-            (ValidationError, NotAuthorizedException, NotFoundException)
-        ),
-        stop=stop_after_attempt(MAX_ATTEMPTS),
-    )  # raises tenacity.RetryError if max attempts reached
-    async def get_pvsystem_meta_data(self) -> PvSystemMetaData:
+        ).pvSystems
+
+    @_retry
+    async def get_pvsystem_meta_data(self) -> "PvSystemMetaData":
         _LOGGER.debug("Listing PV system meta data")
-        r = await self.httpx_client.get(
+        return await self._cached_get(
+            "get_pvsystem_meta_data",
             f"{SW_BASE_URL}/pvsystems/{self.pv_system_id}",
-            headers=self._common_headers,
+            schema.PvSystemMetaData,
         )
-        json_data = await self._check_api_response(r)
-        try:
-            model_data = PvSystemMetaData.model_validate(json_data)
-        except ValidationError as e:
-            _LOGGER.error(
-                f"Unable to validate data receieved from SolarWeb api: {json_data}"
-            )
-            _LOGGER.error(e)
-        return model_data
-
-    @retry(
-        wait=wait_random_exponential(multiplier=2, max=60),
-        retry=retry_if_not_exception_type(
-            (ValidationError, NotAuthorizedException, NotFoundException)
-        ),
-        stop=stop_after_attempt(MAX_ATTEMPTS),
-    )
-    async def get_devices_meta_data(self) -> list[DeviceMetaData]:
+
+    @_retry
+    async def get_devices_meta_data(self) -> "list[DeviceMetaData]":
         _LOGGER.debug("Listing Devices meta data")
-        r = await self.httpx_client.get(
-            f"{SW_BASE_URL}/pvsystems/{self.pv_system_id}/devices",
-            headers=self._common_headers,
-        )
-        json_data = await self._check_api_response(r)
-        try:
-            model_data = DevicesMetaData.model_validate(json_data).devices
-        except ValidationError as e:
-            _LOGGER.error(
-                f"Unable to validate data receieved from SolarWeb api: {json_data}"
+        return (
+            await self._cached_get(
+                "get_devices_meta_data",
+                f"{SW_BASE_URL}/pvsystems/{self.pv_system_id}/devices",
+                schema.DevicesMetaData,
             )
-            _LOGGER.error(e)
-        return model_data
-
-    @retry(
-        wait=wait_random_exponential(multiplier=2, max=60),
-        retry=retry_if_not_exception_type(
-            (ValidationError, NotAuthorizedException, NotFoundException)
-        ),
-        stop=stop_after_attempt(MAX_ATTEMPTS),
-    )
-    async def get_system_flow_data(self, tz: str = "zulu") -> PvSystemFlowData:
+        ).devices
+
+    @_retry
+    async def get_system_flow_data(self, tz: str = "zulu") -> "PvSystemFlowData":
         _LOGGER.debug("Listing PV system flow data")
-        r = await self.httpx_client.get(
+        return await self._coalesced_get(
             f"{SW_BASE_URL}/pvsystems/{self.pv_system_id}/flowdata?timezone={tz}",
-            headers=self._common_headers,
+            schema.PvSystemFlowData,
         )
-        json_data = await self._check_api_response(r)
-        try:
-            model_data = PvSystemFlowData.model_validate(json_data)
-        except ValidationError as e:
-            _LOGGER.error(
-                f"Unable to validate data receieved from SolarWeb api: {json_data}"
-            )
-            _LOGGER.error(e)
-        return model_data
-
-    @retry(
-        wait=wait_random_exponential(multiplier=2, max=60),
-        retry=retry_if_not_exception_type(
-            (ValidationError, NotAuthorizedException, NotFoundException)
-        ),
-        stop=stop_after_attempt(MAX_ATTEMPTS),
-    )
+
+    @_retry
     async def get_system_aggr_data_v2(
-        self, period: str = "total", channels: List[str] | None = None
-    ) -> PvSystemAggrDataV2:
+        self,
+        period: str = "total",
+        channels: List[str] | None = None,
+        start: str | None = None,
+        end: str | None = None,
+    ) -> "PvSystemAggrDataV2":
+        """
+        Get aggregated v2 data per period.
+
+        :param period: total, years, months or days
+        :param channels (optional): channel names, defaults to all
+        :param start (optional): first period, e.g. 2023, 2023-01 or 2023-01-31
+        :param end (optional): last period, in the same format as start
+        """
         _LOGGER.debug("Listing PV system aggregated v2 data")
-        _url = f"{SW_BASE_URL}/pvsystems/{self.pv_system_id}/aggrdata?period={period}"
-        if channels is not None:
-            _url += f"&channel={','.join(channels)}"
-        r = await self.httpx_client.get(
-            _url,
-            headers=self._common_headers,
+        if self.coalesce_requests and channels and start is None and end is None:
+            return await self._batched_aggr_data_v2(period, channels)
+        return await self._coalesced_get(
+            self._aggr_url(period, channels, start=start, end=end),
+            schema.PvSystemAggrDataV2,
         )
-        json_data = await self._check_api_response(r)
-        try:
-            model_data = PvSystemAggrDataV2.model_validate(json_data)
-        except ValidationError as e:
-            _LOGGER.error(
-                f"Unable to validate data receieved from SolarWeb api: {json_data}"
-            )
-            _LOGGER.error(e)
-        return model_data
-
-    @retry(
-        wait=wait_random_exponential(multiplier=2, max=60),
-        retry=retry_if_not_exception_type(
-            (ValidationError, NotAuthorizedException, NotFoundException)
-        ),
-        stop=stop_after_attempt(MAX_ATTEMPTS),
-    )  # raises tenacity.RetryError if max attempts reached
+
+    @_retry
     async def get_hist_data(
         self, start: datetime, end: datetime, channel: str | None = None
-    ) -> HistoricalValues:
+    ) -> "HistoricalValues":
         _LOGGER.debug("Listing historical data")
-        _url = f"{SW_BASE_URL}/pvsystems/{self.pv_system_id}/histdata?from={start.isoformat(timespec='seconds')}Z&to={end.isoformat(timespec='seconds')}Z"
+        return await self._coalesced_get(
+            self._hist_url(start, end, channel), schema.HistoricalValues
+        )
+
+    @_retry
+    async def get_device_hist_data(
+        self,
+        device_id: str,
+        start: datetime,
+        end: datetime,
+        channel: str | None = None,
+    ) -> "HistoricalValues":
+        _LOGGER.debug(f"Listing historical data of device {device_id}")
+        return await self._coalesced_get(
+            self._hist_url(start, end, channel, device_id), schema.HistoricalValues
+        )
+
+    @_retry
+    async def get_device_aggr_data_v2(
+        self,
+        device_id: str,
+        period: str = "total",
+        channels: List[str] | None = None,
+    ) -> "DeviceAggrDataV2":
+        _LOGGER.debug(f"Listing aggregated v2 data of device {device_id}")
+        return await self._coalesced_get(
+            self._aggr_url(period, channels, device_id), schema.DeviceAggrDataV2
+        )
+
+    async def get_devices_hist_data(
+        self,
+        start: datetime,
+        end: datetime,
+        channels: List[str] | None = None,
+        device_ids: List[str] | None = None,
+        max_concurrency: int = DEFAULT_DEVICE_CONCURRENCY,
+    ) -> "HistoricalValues":
+        """
+        Get historical data of several devices concurrently, merged by logDateTime.
+
+        Every page of each device is fetched. The channels of all devices
+        logged at the same time are combined into one record, each channel
+        carrying the deviceId it belongs to, and records are ordered by time.
+
+        :param start: start of the period
+        :param end: end of the period
+        :param channels (optional): channel names to request, defaults to all
+        :param device_ids (optional): devices to request, defaults to the
+            active devices of the PV system
+        :param max_concurrency: maximum number of devices requested at once
+        """
+        if device_ids is None:
+            device_ids = [
+                device.deviceId
+                for device in await self.get_devices_meta_data() or []
+                if device.isActive is not False
+            ]
+        channel = ",".join(channels) if channels else None
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def fetch(device_id: str) -> "HistoricalValues":
+            async with semaphore:
+                json_data = await self._get_all_json(
+                    self._hist_url(start, end, channel, device_id), "data"
+                )
+            return schema.HistoricalValues.model_validate(json_data)
+
+        _LOGGER.debug(f"Listing historical data of {len(device_ids)} devices")
+        merged: Dict[str, HistoricalData] = {}
+        for device_id, values in zip(
+            device_ids, await asyncio.gather(*map(fetch, device_ids))
+        ):
+            for record in values.data or []:
+                for hist_channel in record.channels or []:
+                    hist_channel.deviceId = device_id
+                target = merged.get(record.logDateTime)
+                if target is None:
+                    merged[record.logDateTime] = record
+                else:
+                    target.channels = (target.channels or []) + (record.channels or [])
+        data = sorted(merged.values(), key=lambda record: record.logDateTime or "")
+        return schema.HistoricalValues(
+            pvSystemId=self.pv_system_id,
+            data=data,
+            links=schema.PagingLinks(totalItemsCount=len(data)),
+            totalDataCount=len(data),
+        )
+
+    def _base_url(self, device_id: str | None = None) -> str:
+        _url = f"{SW_BASE_URL}/pvsystems/{self.pv_system_id}"
+        if device_id is not None:
+            _url += f"/devices/{device_id}"
+        return _url
+
+    def _hist_url(
+        self,
+        start: datetime,
+        end: datetime,
+        channel: str | None,
+        device_id: str | None = None,
+    ) -> str:
+        _url = f"{self._base_url(device_id)}/histdata?from={start.isoformat(timespec='seconds')}Z&to={end.isoformat(timespec='seconds')}Z"
         if channel is not None:
             _url += f"&channel={channel}"
-        r = await self.httpx_client.get(
-            _url,
-            headers=self._common_headers,
+        return _url
+
+    def _aggr_url(
+        self,
+        period: str,
+        channels: List[str] | None,
+        device_id: str | None = None,
+        start: str | None = None,
+        end: str | None = None,
+    ) -> str:
+        _url = f"{self._base_url(device_id)}/aggrdata?period={period}"
+        if start is not None:
+            _url += f"&from={start}"
+        if end is not None:
+            _url += f"&to={end}"
+        if channels is not None:
+            _url += f"&channel={','.join(channels)}"
+        return _url
+
+    @staticmethod
+    def _resolve_link(link: str) -> str:
+        # paging links may be returned relative to the api host
+        from httpx import URL  # pylint: disable=import-outside-toplevel
+
+        return str(URL(SW_BASE_URL).join(link))
+
+    @_retry
+    async def _get_response(self, url: str) -> "Response":
+        _LOGGER.debug("Listing page %s", url)
+        r = await self._request("GET", url, headers=self._common_headers)
+        self._check_api_status(r)
+        return r
+
+    async def _get_json(self, url: str) -> dict:
+        return (await self._get_response(url)).json()
+
+    async def _get_page(self, url: str, model: Type[PageModel]) -> PageModel:
+        return self._decode(await self._get_response(url), model)
+
+    async def _get_all_json(self, url: str, items: str) -> dict:
+        # follow the paging links merging the items of every page into the first
+        json_data = await self._get_json(url)
+        page = json_data
+        while (page.get("links") or {}).get("next"):
+            page = await self._get_json(self._resolve_link(page["links"]["next"]))
+            json_data[items] = (json_data.get(items) or []) + (page.get(items) or [])
+        return json_data
+
+    async def _iter_pages(
+        self, url: str, model: Type[PageModel], items: str
+    ) -> AsyncIterator[PageModel]:
+        """
+        Yield every page of a paged endpoint by following the next links.
+
+        While the reported total item count exceeds the items fetched so far
+        the next page is requested in the background as the caller processes
+        the current one.
+        """
+        next_page = asyncio.ensure_future(self._get_page(url, model))
+        fetched = 0
+        try:
+            while next_page is not None:
+                page = await next_page
+                next_page = None
+                links = page.links
+                fetched += len(getattr(page, items) or [])
+                next_url = (
+                    self._resolve_link(links.next) if links and links.next else None
+                )
+                if next_url and fetched < links.totalItemsCount:
+                    next_page = asyncio.ensure_future(self._get_page(next_url, model))
+                yield page
+                if next_url and next_page is None:
+                    next_page = asyncio.ensure_future(self._get_page(next_url, model))
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+
+    async def iter_hist_data(
+        self, start: datetime, end: datetime, channel: str | None = None
+    ) -> "AsyncIterator[HistoricalData]":
+        """Yield historical data records from all pages between start and end."""
+        async for page in self._iter_pages(
+            self._hist_url(start, end, channel), schema.HistoricalValues, "data"
+        ):
+            for record in page.data or []:
+                yield record
+
+    async def iter_pvsystems_meta_data(self) -> "AsyncIterator[PvSystemMetaData]":
+        """Yield PV systems meta data from all pages."""
+        async for page in self._iter_pages(
+            f"{SW_BASE_URL}/pvsystems", schema.PvSystemsMetaData, "pvSystems"
+        ):
+            for pv_system in page.pvSystems or []:
+                yield pv_system
+
+    async def iter_devices_meta_data(self) -> "AsyncIterator[DeviceMetaData]":
+        """Yield devices meta data from all pages."""
+        async for page in self._iter_pages(
+            f"{SW_BASE_URL}/pvsystems/{self.pv_system_id}/devices",
+            schema.DevicesMetaData,
+            "devices",
+        ):
+            for device in page.devices or []:
+                yield device
+
+    async def get_hist_data_columns(
+        self, start: datetime, end: datetime, channel: str | None = None
+    ) -> "ColumnarSeries":
+        """
+        Get historical data from all pages as NumPy columns, requires numpy.
+
+        The columns are built from the response without creating a model per
+        data point.
+        """
+        _LOGGER.debug("Listing historical data as columns")
+        json_data = await self._get_all_json(
+            self._hist_url(start, end, channel), "data"
+        )
+        from .columnar import (  # pylint: disable=import-outside-toplevel
+            ColumnarSeries,
+        )
+
+        return ColumnarSeries.from_json(json_data)
+
+    async def get_system_aggr_data_v2_columns(
+        self, period: str = "total", channels: List[str] | None = None
+    ) -> "ColumnarSeries":
+        """Get aggregated v2 data from all pages as NumPy columns, requires numpy."""
+        _LOGGER.debug("Listing PV system aggregated v2 data as columns")
+        json_data = await self._get_all_json(self._aggr_url(period, channels), "data")
+        from .columnar import (  # pylint: disable=import-outside-toplevel
+            ColumnarSeries,
         )
-        json_data = await self._check_api_response(r)
+
+        return ColumnarSeries.from_json(json_data)
+
+    @_retry
+    async def _open_stream(self, url: str) -> "Response":
+        _LOGGER.debug("Streaming page %s", url)
+        r = await self._request("GET", url, stream=True, headers=self._common_headers)
         try:
-            model_data = HistoricalValues.model_validate(json_data)
-        except ValidationError as e:
-            _LOGGER.error(
-                f"Unable to validate data receieved from SolarWeb api: {json_data}"
+            self._check_api_status(r)
+        except BaseException:
+            await self._aclose_response(r)
+            raise
+        return r
+
+    async def _stream_items(
+        self, url: str, array_key: str, model: Type[PageModel]
+    ) -> AsyncIterator[PageModel]:
+        # pylint: disable=import-outside-toplevel
+        from httpx import TransportError
+
+        from .instrumentation import endpoint_name
+        from .streaming import StreamedObject
+
+        # parse each page while it downloads, following the paging links
+        while url is not None:
+            r = await self._open_stream(url)
+            breaker = (
+                self.resilience.breaker(endpoint_name("GET", url))
+                if self.resilience is not None
+                else None
             )
-            _LOGGER.error(e)
-        return model_data
+            remaining = remaining_time()
+            try:
+                page = StreamedObject(r.aiter_text(), array_key)
+                async for item in page:
+                    yield model.model_validate(item)
+                    if remaining is not None and remaining_time() <= 0:
+                        raise DeadlineExceededException(
+                            f"Deadline exceeded streaming {url}"
+                        )
+            except TransportError as e:
+                self._transport_failure(e, url, remaining, breaker)
+                raise
+            finally:
+                await self._aclose_response(r)
+            links = page.fields.get("links") or {}
+            url = self._resolve_link(links["next"]) if links.get("next") else None
+
+    def stream_hist_data(
+        self, start: datetime, end: datetime, channel: str | None = None
+    ) -> "AsyncIterator[HistoricalData]":
+        """
+        Yield historical data records while the response downloads.
+
+        Memory use is bounded by a single record rather than the response.
+        Opening each page is retried like the other getters, a failure while
+        its body downloads is raised as records may already be yielded.
+        """
+        return self._stream_items(
+            self._hist_url(start, end, channel), "data", schema.HistoricalData
+        )
+
+    def stream_system_aggr_data_v2(
+        self, period: str = "total", channels: List[str] | None = None
+    ) -> "AsyncIterator[AggrData]":
+        """Yield aggregated v2 data records while the response downloads."""
+        return self._stream_items(
+            self._aggr_url(period, channels), "data", schema.AggrData
+        )
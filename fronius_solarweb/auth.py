@@ -0,0 +1,160 @@
+from abc import ABC, abstractmethod
+import asyncio
+import base64
+import json
+import logging
+import time
+from typing import TYPE_CHECKING, AsyncContextManager, Optional
+
+from .errors import NotAuthorizedException
+
+if TYPE_CHECKING:
+    from .api import Fronius_Solarweb
+
+_LOGGER = logging.getLogger(__name__)
+# seconds before expiry a JSON web token is refreshed
+DEFAULT_REFRESH_MARGIN = 120
+
+
+def jwt_expiry(token: Optional[str]) -> Optional[float]:
+    """Return the expiry of a JSON web token as a unix timestamp, None if unknown."""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+class TokenStore(ABC):
+    """
+    Interface for sharing the JSON web tokens of an identity between clients.
+
+    Used by TokenManager so that one client logs in or refreshes at a time,
+    and the others adopt its token instead of obtaining their own.
+    """
+
+    @abstractmethod
+    def lock(self, identity: str) -> AsyncContextManager:
+        """Return an async context manager held while a token is obtained."""
+
+    @abstractmethod
+    async def load(self, identity: str) -> Optional[dict]:
+        """Return the shared JWT data of the identity, None if there is none."""
+
+    @abstractmethod
+    async def save(self, identity: str, jwt_data: dict):
+        pass
+
+
+class TokenManager:
+    def __init__(
+        self,
+        client: "Fronius_Solarweb",
+        refresh_margin: float = DEFAULT_REFRESH_MARGIN,
+        store: TokenStore | None = None,
+    ):
+        """
+        Keep the JSON web token of a client logged in with login() valid.
+
+        Tokens are refreshed refresh_margin seconds before they expire, either
+        on demand before a request or by the background task started with
+        start(). Concurrent callers wait on the same refresh. With a store
+        a token shared by another client is adopted while it is valid, and
+        every token obtained is saved to it.
+
+        :param client: Fronius_Solarweb client the token belongs to
+        :param refresh_margin: seconds before expiry the token is refreshed
+        :param store (optional): TokenStore shared with other clients
+        """
+        self.client = client
+        self.refresh_margin = refresh_margin
+        self.store = store
+        self._refreshing: Optional[asyncio.Future] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def active(self) -> bool:
+        return bool(self.client.jwt_data.get("jwtToken"))
+
+    @property
+    def expires(self) -> Optional[float]:
+        return jwt_expiry(self.client.jwt_data.get("jwtToken"))
+
+    def needs_refresh(self) -> bool:
+        expires = self.expires
+        return expires is not None and expires - self.refresh_margin <= time.time()
+
+    def _usable(self, jwt_data: dict) -> bool:
+        expires = jwt_expiry(jwt_data.get("jwtToken"))
+        return expires is None or expires - self.refresh_margin > time.time()
+
+    async def ensure_valid(self):
+        if self.active and self.needs_refresh():
+            await self.refresh()
+
+    async def refresh(self):
+        """Refresh the token, logging in again if the refresh token is rejected."""
+        if self._refreshing is None:
+            self._refreshing = asyncio.ensure_future(self._refresh())
+            self._refreshing.add_done_callback(self._refresh_done)
+        await asyncio.shield(self._refreshing)
+
+    def _refresh_done(self, _):
+        self._refreshing = None
+
+    async def _refresh(self):
+        if self.store is None:
+            await self._renew()
+            return
+        identity = self.client.identity
+        async with self.store.lock(identity):
+            shared = await self.store.load(identity)
+            if (
+                shared
+                and shared.get("jwtToken") != self.client.jwt_data.get("jwtToken")
+                and self._usable(shared)
+            ):
+                _LOGGER.debug("Using the shared JSON web token")
+                self.client.set_jwt_data(shared)
+                return
+            await self._renew()
+            await self.store.save(identity, dict(self.client.jwt_data))
+
+    async def _renew(self):
+        from httpx import HTTPError  # pylint: disable=import-outside-toplevel
+
+        if self.client.jwt_data.get("refreshToken"):
+            try:
+                await self.client.refresh_token()
+                return
+            except (NotAuthorizedException, HTTPError) as e:
+                _LOGGER.debug(f"Refreshing JSON web token failed: {e}")
+        if not self.client.login_name:
+            raise NotAuthorizedException()
+        await self.client.login()
+
+    def start(self):
+        """Start refreshing the token in the background ahead of expiry."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            expires = self.expires
+            if expires is None:
+                # nothing to refresh until logged in
+                await asyncio.sleep(self.refresh_margin)
+                continue
+            await asyncio.sleep(max(expires - self.refresh_margin - time.time(), 0))
+            try:
+                await self.refresh()
+            except Exception as e:  # pylint: disable=broad-except
+                _LOGGER.warning(f"Background JSON web token refresh failed: {e}")
+                await asyncio.sleep(self.refresh_margin / 4)
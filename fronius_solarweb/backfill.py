@@ -0,0 +1,133 @@
+import asyncio
+from datetime import datetime, timedelta
+import logging
+import time
+from typing import AsyncIterator, Callable, List
+
+from .api import Fronius_Solarweb
+from .schema.hist import HistoricalData
+
+_LOGGER = logging.getLogger(__name__)
+# longest period a single histdata request may cover
+HIST_MAX_WINDOW = timedelta(days=1)
+# time dataloggers may take to upload their records, periods that ended more
+# recently may still receive data
+DEFAULT_SETTLE_LAG = timedelta(hours=2)
+DEFAULT_CONCURRENCY = 4
+
+
+class HistoricalBackfill:
+    def __init__(
+        self,
+        client: Fronius_Solarweb,
+        start: datetime,
+        end: datetime,
+        channel: str | None = None,
+        window: timedelta = HIST_MAX_WINDOW,
+        max_concurrency: int = DEFAULT_CONCURRENCY,
+        max_requests_per_second: float | None = None,
+        checkpoint: datetime | None = None,
+        on_checkpoint: Callable[[datetime], None] | None = None,
+    ):
+        """
+        Backfill historical data over a long period in API sized windows.
+
+        Windows are fetched concurrently and the records are yielded in time
+        order. After every window the checkpoint is advanced to the end of that
+        window, passing it back in resumes the backfill after a failure. The
+        record logged at the checkpoint itself may be yielded again on resume.
+
+        :param client: Fronius_Solarweb client bound to the PV system
+        :param start: start of the period to backfill
+        :param end: end of the period to backfill
+        :param channel (optional): channel name passed to the histdata call
+        :param window: period covered by each histdata request
+        :param max_concurrency: maximum number of windows fetched at once
+        :param max_requests_per_second (optional): rate at which windows are started
+        :param checkpoint (optional): checkpoint of a previous run to resume from
+        :param on_checkpoint (optional): called with each new checkpoint
+        """
+        if window <= timedelta(0) or window > HIST_MAX_WINDOW:
+            raise ValueError(f"window must be positive and at most {HIST_MAX_WINDOW}")
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.client = client
+        self.start = max(start, checkpoint) if checkpoint else start
+        self.end = end
+        self.channel = channel
+        self.window = window
+        self.max_concurrency = max_concurrency
+        self._interval = 1 / max_requests_per_second if max_requests_per_second else 0
+        self._next_start = 0.0
+        self._pace_lock = asyncio.Lock()
+        self.checkpoint = checkpoint
+        self.on_checkpoint = on_checkpoint
+
+    def windows(self) -> List[tuple[datetime, datetime]]:
+        windows = []
+        window_start = self.start
+        while window_start < self.end:
+            window_end = min(window_start + self.window, self.end)
+            windows.append((window_start, window_end))
+            window_start = window_end
+        return windows
+
+    async def _pace(self):
+        if not self._interval:
+            return
+        async with self._pace_lock:
+            delay = self._next_start - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_start = time.monotonic() + self._interval
+
+    async def _fetch_window(
+        self, window_start: datetime, window_end: datetime
+    ) -> List[HistoricalData]:
+        await self._pace()
+        _LOGGER.debug(f"Backfilling historical data {window_start} - {window_end}")
+        records = [
+            record
+            async for record in self.client.iter_hist_data(
+                window_start, window_end, self.channel
+            )
+        ]
+        records.sort(key=lambda record: record.logDateTime or "")
+        return records
+
+    async def __aiter__(self) -> AsyncIterator[HistoricalData]:
+        windows = iter(self.windows())
+        in_flight: List[tuple[datetime, asyncio.Task]] = []
+        last_logged = None
+
+        def schedule():
+            for window_start, window_end in windows:
+                task = asyncio.ensure_future(
+                    self._fetch_window(window_start, window_end)
+                )
+                in_flight.append((window_end, task))
+                if len(in_flight) >= self.max_concurrency:
+                    return
+
+        try:
+            schedule()
+            while in_flight:
+                window_end, task = in_flight.pop(0)
+                records = await task
+                schedule()
+                for record in records:
+                    # adjacent windows share their boundary timestamp
+                    if record.logDateTime is not None:
+                        if (
+                            last_logged is not None
+                            and record.logDateTime <= last_logged
+                        ):
+                            continue
+                        last_logged = record.logDateTime
+                    yield record
+                self.checkpoint = window_end
+                if self.on_checkpoint is not None:
+                    self.on_checkpoint(window_end)
+        finally:
+            for _, task in in_flight:
+                task.cancel()
@@ -0,0 +1,86 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+import time
+from typing import Any, Optional
+
+DEFAULT_MAX_ENTRIES = 1024
+# seconds cached responses of the metadata endpoints stay fresh
+DEFAULT_TTLS = {
+    "get_api_release_info": 3600,
+    "get_pvsystems_meta_data": 900,
+    "get_pvsystem_meta_data": 900,
+    "get_devices_meta_data": 900,
+}
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    expires: float  # time.time() after which the entry must be revalidated
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires
+
+
+class ResponseCache(ABC):
+    """
+    Interface for the response cache used by Fronius_Solarweb.
+
+    Stale entries are returned as well so they can be revalidated with
+    If-None-Match / If-Modified-Since, implementations only decide storage
+    and eviction. Implementations doing I/O set blocking, their methods are
+    then called in a worker thread.
+    """
+
+    blocking = False
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Return the entry stored for the key, fresh or stale, None if missing."""
+
+    @abstractmethod
+    def set(self, key: str, entry: CacheEntry):
+        pass
+
+    @abstractmethod
+    def delete(self, key: str):
+        pass
+
+    @abstractmethod
+    def clear(self):
+        pass
+
+
+class MemoryCache(ResponseCache):
+    """In process cache evicting the least recently used entry once max_entries is reached."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, entry: CacheEntry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
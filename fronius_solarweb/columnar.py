@@ -0,0 +1,136 @@
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # numpy is an optional dependency
+    np = None
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError(
+            "numpy is required for columnar data, install fronius_solarweb[columnar]"
+        )
+
+
+def _parse_log_datetime(value: str | None) -> Optional[datetime]:
+    """Parse a logDateTime to a naive UTC datetime, aggrdata may return just a date, month or year."""
+    if not value:
+        return None
+    if len(value) == 4:
+        return datetime(int(value), 1, 1)
+    if len(value) == 7:
+        return datetime(int(value[:4]), int(value[5:7]), 1)
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+@dataclass
+class ChannelColumn:
+    channelName: str
+    channelType: Optional[str]
+    unit: Optional[str]
+    values: "np.ndarray"  # float64, NaN where the channel has no value
+    damaged: "np.ndarray"  # bool, True where the data point is flagged isDamaged
+
+
+@dataclass
+class ColumnarSeries:
+    """Historical or aggregated data stored as one NumPy array per channel."""
+
+    pvSystemId: Optional[str]
+    deviceId: Optional[str]
+    timestamps: "np.ndarray"  # datetime64[s] in UTC, NaT when not provided
+    durations: "np.ndarray"  # int64 logDuration in seconds, 0 when not provided
+    channels: Dict[str, ChannelColumn] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @classmethod
+    def from_json(cls, json_data: dict) -> "ColumnarSeries":
+        """Build the columns from a histdata or aggrdata response dict."""
+        _require_numpy()
+        records: List[dict] = json_data.get("data") or []
+        size = len(records)
+        timestamps = np.array(
+            [_parse_log_datetime(record.get("logDateTime")) for record in records],
+            dtype="datetime64[s]",
+        )
+        durations = np.fromiter(
+            (record.get("logDuration") or 0 for record in records),
+            dtype=np.int64,
+            count=size,
+        )
+        channels: Dict[str, ChannelColumn] = {}
+        for i, record in enumerate(records):
+            for channel in record.get("channels") or []:
+                name = channel.get("channelName")
+                column = channels.get(name)
+                if column is None:
+                    column = channels[name] = ChannelColumn(
+                        channelName=name,
+                        channelType=channel.get("channelType"),
+                        unit=channel.get("unit"),
+                        values=np.full(size, np.nan),
+                        damaged=np.zeros(size, dtype=bool),
+                    )
+                column.values[i] = _to_float(channel.get("value"))
+                if channel.get("isDamaged"):
+                    column.damaged[i] = True
+        return cls(
+            pvSystemId=json_data.get("pvSystemId"),
+            deviceId=json_data.get("deviceId"),
+            timestamps=timestamps,
+            durations=durations,
+            channels=channels,
+        )
+
+    def to_dict(self) -> Dict[str, "np.ndarray"]:
+        columns = {"logDateTime": self.timestamps, "logDuration": self.durations}
+        for name, column in self.channels.items():
+            columns[name] = column.values
+        return columns
+
+    def to_pandas(self):
+        """Return a pandas DataFrame indexed by logDateTime sharing the channel arrays."""
+        import pandas as pd  # pylint: disable=import-outside-toplevel
+
+        columns = self.to_dict()
+        index = pd.DatetimeIndex(columns.pop("logDateTime"), name="logDateTime")
+        return pd.DataFrame(columns, index=index, copy=False)
+
+    def to_arrow(self):
+        """Return a pyarrow Table, float64 channel arrays are wrapped without copying."""
+        import pyarrow as pa  # pylint: disable=import-outside-toplevel
+
+        columns = self.to_dict()
+        fields = []
+        for name in columns:
+            metadata = None
+            column = self.channels.get(name)
+            if column is not None:
+                metadata = {
+                    "channelType": column.channelType or "",
+                    "unit": column.unit or "",
+                }
+            fields.append(
+                pa.field(
+                    name, pa.from_numpy_dtype(columns[name].dtype), metadata=metadata
+                )
+            )
+        return pa.Table.from_arrays(
+            [pa.array(array) for array in columns.values()],
+            schema=pa.schema(fields),
+        )
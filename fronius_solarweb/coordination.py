@@ -0,0 +1,428 @@
+from abc import ABC, abstractmethod
+import asyncio
+from bisect import bisect
+from contextlib import asynccontextmanager
+import hashlib
+import json
+import logging
+import os
+import pickle
+import socket
+import sqlite3
+import threading
+import time
+from typing import AsyncIterator, Iterable, List, Optional
+import uuid
+
+from .api import Fronius_Solarweb
+from .auth import TokenStore, jwt_expiry
+from .cache import CacheEntry, ResponseCache
+
+_LOGGER = logging.getLogger(__name__)
+DEFAULT_LEASE_TTL = 30.0
+DEFAULT_VNODES = 64
+# seconds a stale cache entry is kept for revalidation
+DEFAULT_MAX_STALE = 86400
+# seconds a shared JSON web token is kept when its expiry is unknown
+DEFAULT_TOKEN_TTL = 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS members (
+    replica TEXT PRIMARY KEY,
+    expires REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS kv (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires REAL
+);
+"""
+
+
+class CoordinationBackend(ABC):
+    """
+    Interface for the storage shared by the replicas.
+
+    Holds the replica leases and a key value store with expiry used for the
+    shared response cache, JSON web tokens and locks. The methods block,
+    the coordination classes call them in a worker thread.
+    """
+
+    @abstractmethod
+    def register(self, replica_id: str, ttl: float):
+        """Add or renew the lease of a replica for ttl seconds."""
+
+    @abstractmethod
+    def unregister(self, replica_id: str):
+        pass
+
+    @abstractmethod
+    def members(self) -> List[str]:
+        """Return the replicas holding a lease."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the value of the key, None if missing or expired."""
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: float | None = None):
+        pass
+
+    @abstractmethod
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        """Set the key unless it exists, returns whether it was set."""
+
+    @abstractmethod
+    def delete(self, key: str):
+        pass
+
+    @abstractmethod
+    def delete_prefix(self, prefix: str):
+        pass
+
+
+class SQLiteBackend(CoordinationBackend):
+    def __init__(self, path: str):
+        """
+        Coordination backend in a SQLite file, for replicas on one host or a shared filesystem.
+
+        :param path: SQLite database file, created when it doesn't exist
+        """
+        self.path = path
+        # the connection is shared by the worker threads, one call at a time
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _execute(self, sql: str, parameters: tuple = ()) -> List[tuple]:
+        with self._lock:
+            return self._db.execute(sql, parameters).fetchall()
+
+    def register(self, replica_id: str, ttl: float):
+        self._execute(
+            "INSERT OR REPLACE INTO members VALUES (?, ?)",
+            (replica_id, time.time() + ttl),
+        )
+
+    def unregister(self, replica_id: str):
+        self._execute("DELETE FROM members WHERE replica = ?", (replica_id,))
+
+    def members(self) -> List[str]:
+        self._execute("DELETE FROM members WHERE expires <= ?", (time.time(),))
+        return [
+            row[0]
+            for row in self._execute("SELECT replica FROM members ORDER BY replica")
+        ]
+
+    def get(self, key: str) -> Optional[bytes]:
+        rows = self._execute(
+            "SELECT value FROM kv WHERE key = ? AND (expires IS NULL OR expires > ?)",
+            (key, time.time()),
+        )
+        return rows[0][0] if rows else None
+
+    def set(self, key: str, value: bytes, ttl: float | None = None):
+        self._execute(
+            "INSERT OR REPLACE INTO kv VALUES (?, ?, ?)",
+            (key, value, time.time() + ttl if ttl is not None else None),
+        )
+
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute("BEGIN IMMEDIATE")
+            self._db.execute(
+                "DELETE FROM kv WHERE key = ? AND expires <= ?", (key, now)
+            )
+            cursor = self._db.execute(
+                "INSERT OR IGNORE INTO kv VALUES (?, ?, ?)", (key, value, now + ttl)
+            )
+            return cursor.rowcount == 1
+
+    def delete(self, key: str):
+        self._execute("DELETE FROM kv WHERE key = ?", (key,))
+
+    def delete_prefix(self, prefix: str):
+        self._execute(
+            "DELETE FROM kv WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)
+        )
+
+
+class RedisBackend(CoordinationBackend):
+    def __init__(
+        self,
+        client=None,
+        url: str = "redis://localhost:6379/0",
+        prefix: str = "fronius_solarweb:",
+    ):
+        """
+        Coordination backend in Redis or a Redis compatible server, requires redis.
+
+        :param client (optional): redis.Redis client, created from url when not provided
+        :param url: used to create the client
+        :param prefix: prepended to every key
+        """
+        if client is None:
+            import redis  # pylint: disable=import-outside-toplevel
+
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        self._members = f"{prefix}members"
+
+    def register(self, replica_id: str, ttl: float):
+        self.client.zadd(self._members, {replica_id: time.time() + ttl})
+
+    def unregister(self, replica_id: str):
+        self.client.zrem(self._members, replica_id)
+
+    def members(self) -> List[str]:
+        self.client.zremrangebyscore(self._members, "-inf", time.time())
+        return sorted(
+            member.decode() if isinstance(member, bytes) else member
+            for member in self.client.zrange(self._members, 0, -1)
+        )
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes, ttl: float | None = None):
+        self.client.set(
+            self.prefix + key, value, px=int(ttl * 1000) if ttl is not None else None
+        )
+
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        return bool(
+            self.client.set(self.prefix + key, value, px=int(ttl * 1000), nx=True)
+        )
+
+    def delete(self, key: str):
+        self.client.delete(self.prefix + key)
+
+    def delete_prefix(self, prefix: str):
+        for key in self.client.scan_iter(match=f"{self.prefix}{prefix}*"):
+            self.client.delete(key)
+
+
+class HashRing:
+    def __init__(self, nodes: Iterable[str], vnodes: int = DEFAULT_VNODES):
+        """
+        Consistent hash ring, a node leaving or joining only moves the keys it owns.
+
+        :param nodes: ids of the nodes sharing the keys
+        :param vnodes: points on the ring per node, more spread keys more evenly
+        """
+        self.nodes = sorted(set(nodes))
+        points = sorted(
+            (self._hash(f"{node}#{i}"), node)
+            for node in self.nodes
+            for i in range(vnodes)
+        )
+        self._hashes = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+    def owner(self, key: str) -> Optional[str]:
+        if not self._hashes:
+            return None
+        index = bisect(self._hashes, self._hash(key)) % len(self._hashes)
+        return self._owners[index]
+
+
+class SharedCache(ResponseCache):
+    blocking = True
+
+    def __init__(
+        self,
+        backend: CoordinationBackend,
+        prefix: str = "cache:",
+        max_stale: float = DEFAULT_MAX_STALE,
+    ):
+        """
+        Response cache kept in a coordination backend and shared by the replicas.
+
+        Entries are pickled, only share a backend with trusted replicas.
+
+        :param backend: coordination backend storing the entries
+        :param prefix: prepended to the cache keys
+        :param max_stale: seconds an expired entry is kept for revalidation
+        """
+        self.backend = backend
+        self.prefix = prefix
+        self.max_stale = max_stale
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        value = self.backend.get(self.prefix + key)
+        return pickle.loads(value) if value is not None else None
+
+    def set(self, key: str, entry: CacheEntry):
+        ttl = max(entry.expires - time.time(), 0) + self.max_stale
+        self.backend.set(self.prefix + key, pickle.dumps(entry), ttl)
+
+    def delete(self, key: str):
+        self.backend.delete(self.prefix + key)
+
+    def clear(self):
+        self.backend.delete_prefix(self.prefix)
+
+
+class SharedTokenStore(TokenStore):
+    def __init__(
+        self,
+        backend: CoordinationBackend,
+        owner: str,
+        timeout: float = 30.0,
+        prefix: str = "jwt:",
+    ):
+        """
+        JSON web tokens kept in a coordination backend and shared by the replicas.
+
+        :param backend: coordination backend storing the tokens
+        :param owner: id of the replica, stored in the locks it holds
+        :param timeout: seconds a lock is held at most and waited for, after
+            which the token is obtained without it
+        :param prefix: prepended to the identities
+        """
+        self.backend = backend
+        self.owner = owner
+        self.timeout = timeout
+        self.prefix = prefix
+
+    @asynccontextmanager
+    async def lock(self, identity: str) -> AsyncIterator[None]:
+        key = f"{self.prefix}{identity}:lock"
+        deadline = time.monotonic() + self.timeout
+        while not (
+            locked := await asyncio.to_thread(
+                self.backend.add, key, self.owner.encode(), self.timeout
+            )
+        ):
+            if time.monotonic() > deadline:
+                break
+            # another replica is obtaining a token
+            await asyncio.sleep(0.5)
+        try:
+            yield
+        finally:
+            if locked:
+                await asyncio.to_thread(self.backend.delete, key)
+
+    async def load(self, identity: str) -> Optional[dict]:
+        value = await asyncio.to_thread(self.backend.get, self.prefix + identity)
+        return json.loads(value) if value is not None else None
+
+    async def save(self, identity: str, jwt_data: dict):
+        expires = jwt_expiry(jwt_data.get("jwtToken"))
+        ttl = expires - time.time() if expires is not None else DEFAULT_TOKEN_TTL
+        if ttl > 0:
+            await asyncio.to_thread(
+                self.backend.set,
+                self.prefix + identity,
+                json.dumps(jwt_data).encode(),
+                ttl,
+            )
+
+
+class Coordinator:
+    def __init__(
+        self,
+        backend: CoordinationBackend,
+        replica_id: str | None = None,
+        lease_ttl: float = DEFAULT_LEASE_TTL,
+        vnodes: int = DEFAULT_VNODES,
+    ):
+        """
+        Share the PV systems to poll between replicas.
+
+        Every replica holds a lease renewed every lease_ttl / 3 seconds, the PV
+        systems are assigned to the live replicas by consistent hashing so a
+        replica joining or leaving only moves its share. A replica that stops
+        renewing loses its PV systems once its lease expires.
+
+        :param backend: coordination backend shared by the replicas
+        :param replica_id (optional): unique id, defaults to host, process and a random suffix
+        :param lease_ttl: seconds a lease lasts without renewal
+        :param vnodes: points on the hash ring per replica
+        """
+        self.backend = backend
+        self.replica_id = (
+            replica_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        )
+        self.lease_ttl = lease_ttl
+        self.vnodes = vnodes
+        self.ring = HashRing([self.replica_id], vnodes)
+        self._task: Optional[asyncio.Task] = None
+
+    def _renew(self) -> List[str]:
+        self.backend.register(self.replica_id, self.lease_ttl)
+        return self.backend.members()
+
+    async def renew(self):
+        """Renew this replica's lease and update the ring from the live replicas."""
+        members = await asyncio.to_thread(self._renew)
+        if members != self.ring.nodes:
+            _LOGGER.info(f"Replicas changed to {members}")
+            self.ring = HashRing(members, self.vnodes)
+
+    def owns(self, pv_system_id: str) -> bool:
+        return self.ring.owner(pv_system_id) == self.replica_id
+
+    def assigned(self, pv_system_ids: Iterable[str]) -> List[str]:
+        """Return the PV systems this replica should poll."""
+        return [
+            pv_system_id for pv_system_id in pv_system_ids if self.owns(pv_system_id)
+        ]
+
+    async def start(self):
+        """Renew the lease in the background."""
+        await self.renew()
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.lease_ttl / 3)
+            try:
+                await self.renew()
+            except Exception as e:  # pylint: disable=broad-except
+                _LOGGER.warning(f"Renewing the lease of {self.replica_id} failed: {e}")
+
+    async def stop(self):
+        """Stop renewing and give up the lease, the other replicas take over its share."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await asyncio.to_thread(self.backend.unregister, self.replica_id)
+
+    def shared_cache(self, prefix: str = "cache:") -> SharedCache:
+        return SharedCache(self.backend, prefix)
+
+    def token_store(self, timeout: float = 30.0) -> SharedTokenStore:
+        return SharedTokenStore(self.backend, self.replica_id, timeout)
+
+    async def login(self, client: Fronius_Solarweb, timeout: float = 30.0):
+        """
+        Log a client in with the JSON web token shared by the replicas.
+
+        The client's token manager is given the shared token store, so only
+        one replica logs in or refreshes the token of an identity at a time
+        and the others reuse the token it publishes, now and on every later
+        refresh. Tokens without a known expiry are shared for
+        DEFAULT_TOKEN_TTL seconds.
+
+        :param client: Fronius_Solarweb client with a login name and password
+        :param timeout: seconds waited for another replica obtaining the token
+        """
+        client.token_manager.store = self.token_store(timeout)
+        await client.token_manager.refresh()
@@ -6,6 +6,31 @@ class NotFoundException(ValueError):
     pass
 
 
+class TooManyRequestsException(ValueError):
+    def __init__(self, retry_after: float | None = None):
+        super().__init__(f"Rate limited by Solar.web, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class CircuitOpenException(ValueError):
+    def __init__(self, retry_after: float | None = None):
+        super().__init__(f"Solar.web circuit open, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class DeadlineExceededException(TimeoutError):
+    pass
+
+
+class ExportError(Exception):
+    def __init__(self, errors: dict[str, Exception]):
+        super().__init__(
+            f"Export failed for {len(errors)} PV systems: "
+            + ", ".join(f"{key} ({error!r})" for key, error in errors.items())
+        )
+        self.errors = errors
+
+
 HTML_ERROR_CODES = {
     200: "OK",  # Successful
     204: "No content",  # Successful request but no data
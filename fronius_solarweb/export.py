@@ -0,0 +1,371 @@
+import asyncio
+import csv
+from datetime import date, datetime, time, timedelta, timezone
+import json
+import logging
+import os
+from pathlib import Path
+from typing import AsyncIterator, Iterable, List, Optional, Sequence
+
+from .api import Fronius_Solarweb
+from .backfill import DEFAULT_SETTLE_LAG
+from .errors import ExportError
+from .planner import TOTAL, period_key
+from .schema.hist import HistoricalData
+from .schema.pvsystem import AggrData
+
+_LOGGER = logging.getLogger(__name__)
+DEFAULT_BATCH_SIZE = 10000
+DEFAULT_CONCURRENCY = 4
+# suffix of a partition covering part of a day, rewritten by every run
+PARTIAL_SUFFIX = ".partial"
+
+HIST_COLUMNS = (
+    "pvSystemId",
+    "logDateTime",
+    "logDuration",
+    "channelName",
+    "channelType",
+    "unit",
+    "value",
+    "isActive",
+    "isDamaged",
+)
+AGGR_COLUMNS = (
+    "pvSystemId",
+    "logDateTime",
+    "channelName",
+    "channelType",
+    "unit",
+    "value",
+)
+
+
+class _NdjsonWriter:
+    def __init__(self, path: Path, columns: Sequence[str]):
+        self.columns = columns
+        self._file = open(path, "w", encoding="utf-8")
+
+    def write(self, rows: List[tuple]):
+        self._file.writelines(
+            json.dumps(dict(zip(self.columns, row))) + "\n" for row in rows
+        )
+
+    def close(self):
+        self._file.close()
+
+
+class _CsvWriter:
+    def __init__(self, path: Path, columns: Sequence[str]):
+        self._file = open(path, "w", encoding="utf-8", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(columns)
+
+    def write(self, rows: List[tuple]):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+
+class _ParquetWriter:
+    def __init__(self, path: Path, columns: Sequence[str]):
+        # pylint: disable=import-outside-toplevel
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        types = {
+            "logDuration": pa.int64(),
+            "value": pa.float64(),
+            "isActive": pa.bool_(),
+            "isDamaged": pa.bool_(),
+        }
+        self._pa = pa
+        self.columns = columns
+        self.schema = pa.schema(
+            [(name, types.get(name, pa.string())) for name in columns]
+        )
+        self._writer = pq.ParquetWriter(path, self.schema)
+
+    def write(self, rows: List[tuple]):
+        # every batch is written as one row group
+        arrays = [
+            self._pa.array(list(values), type=field.type)
+            for values, field in zip(zip(*rows), self.schema)
+        ]
+        self._writer.write_table(self._pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self._writer.close()
+
+
+_WRITERS = {"ndjson": _NdjsonWriter, "csv": _CsvWriter, "parquet": _ParquetWriter}
+
+
+def _utc(value: datetime) -> datetime:
+    """Return a datetime as naive UTC like the partition dates, naive values are taken as UTC."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _period_end(key: str) -> Optional[datetime]:
+    """Return when the year, month or day of a period key ends, None for the total."""
+    if len(key) == 4:
+        return datetime(int(key) + 1, 1, 1)
+    if len(key) == 7:
+        year, month = int(key[:4]), int(key[5:7])
+        return datetime(year + month // 12, month % 12 + 1, 1)
+    if len(key) == 10:
+        return datetime.combine(date.fromisoformat(key) + timedelta(days=1), time())
+    return None
+
+
+async def _iterate(rows: List[tuple]) -> AsyncIterator[tuple]:
+    for row in rows:
+        yield row
+
+
+def _hist_rows(pv_system_id: str, record: HistoricalData) -> Iterable[tuple]:
+    for channel in record.channels or []:
+        yield (
+            pv_system_id,
+            record.logDateTime,
+            record.logDuration,
+            channel.channelName,
+            channel.channelType,
+            channel.unit,
+            channel.value,
+            channel.isActive,
+            channel.isDamaged,
+        )
+
+
+def _aggr_rows(pv_system_id: str, record: AggrData) -> Iterable[tuple]:
+    for channel in record.channels or []:
+        value = channel.value
+        try:
+            value = float(value) if value is not None else None
+        except ValueError:
+            value = None
+        yield (
+            pv_system_id,
+            record.logDateTime,
+            channel.channelName,
+            channel.channelType,
+            channel.unit,
+            value,
+        )
+
+
+class Exporter:
+    def __init__(
+        self,
+        client: Fronius_Solarweb,
+        directory: str | os.PathLike,
+        format: str = "ndjson",  # pylint: disable=redefined-builtin
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_concurrency: int = DEFAULT_CONCURRENCY,
+        settle_lag: timedelta = DEFAULT_SETTLE_LAG,
+    ):
+        """
+        Export historical and aggregated data to partitioned files.
+
+        Records are streamed from the responses and written in batches of
+        batch_size rows, so memory use doesn't grow with the export. Files
+        are laid out as <directory>/pvSystemId=<id>/date=<yyyy-mm-dd>/data.<format>
+        with one row per channel value. A partition is written to a temporary
+        file and renamed once complete, so a rerun skips the partitions
+        already exported and resumes from the first missing one. Days only
+        partly exported, because the range starts or ends within them or they
+        ended less than settle_lag ago, are written to data.<format>.partial
+        instead and rewritten by every run until a run covers the whole day.
+        A PV system failing doesn't stop the others, once they have finished
+        ExportError is raised with the exception of each PV system that failed.
+        Aggregated data is partitioned by the year, month or day of each
+        record, e.g. date=2023-05, the total under date=total.
+
+        :param client: Fronius_Solarweb client, used for every PV system
+        :param directory: root directory of the export
+        :param format: ndjson, csv or parquet (requires pyarrow)
+        :param batch_size: rows buffered before they are written, each batch is
+            one Parquet row group
+        :param max_concurrency: maximum number of PV systems exported at once
+        :param settle_lag: time dataloggers may take to upload records, a day
+            is only finalised once it ended this long ago
+        """
+        if format not in _WRITERS:
+            raise ValueError(f"format must be one of {list(_WRITERS)}, not {format}")
+        if batch_size < 1 or max_concurrency < 1:
+            raise ValueError("batch_size and max_concurrency must be at least 1")
+        self.client = client
+        self.directory = Path(directory)
+        self.format = format
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.settle_lag = settle_lag
+
+    def partition_path(
+        self, pv_system_id: str, partition: str, partial: bool = False
+    ) -> Path:
+        return (
+            self.directory
+            / f"pvSystemId={pv_system_id}"
+            / f"date={partition}"
+            / f"data.{self.format}{PARTIAL_SUFFIX if partial else ''}"
+        )
+
+    async def _write_partition(
+        self, path: Path, columns: Sequence[str], rows: AsyncIterator[tuple]
+    ) -> int:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_name(f".{path.name}.tmp")
+        writer = None
+        written = 0
+        batch: List[tuple] = []
+        try:
+            async for row in rows:
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    writer = writer or _WRITERS[self.format](temporary, columns)
+                    # write in a thread so the next page downloads meanwhile
+                    await asyncio.to_thread(writer.write, batch)
+                    written += len(batch)
+                    batch = []
+            writer = writer or _WRITERS[self.format](temporary, columns)
+            if batch:
+                await asyncio.to_thread(writer.write, batch)
+                written += len(batch)
+        finally:
+            if writer is not None:
+                writer.close()
+        os.replace(temporary, path)
+        return written
+
+    async def _export_hist_system(
+        self, pv_system_id: str, start: datetime, end: datetime, channel: str | None
+    ) -> int:
+        client = self.client.for_pv_system(pv_system_id)
+        start, end = _utc(start), _utc(end)
+        settled = datetime.now(timezone.utc).replace(tzinfo=None) - self.settle_lag
+        written = 0
+        day: date = start.date()
+        while datetime.combine(day, time()) < end:
+            day_start = datetime.combine(day, time())
+            day_end = day_start + timedelta(days=1)
+            path = self.partition_path(pv_system_id, day.isoformat())
+            partial = self.partition_path(pv_system_id, day.isoformat(), True)
+            window_start = max(start, day_start)
+            window_end = min(end, day_end)
+            day += timedelta(days=1)
+            if path.exists():
+                continue
+            whole = window_start == day_start and window_end == day_end <= settled
+
+            async def rows(window_start=window_start, window_end=window_end):
+                async for record in client.stream_hist_data(
+                    window_start, window_end, channel
+                ):
+                    for row in _hist_rows(pv_system_id, record):
+                        yield row
+
+            if whole:
+                written += await self._write_partition(path, HIST_COLUMNS, rows())
+                partial.unlink(missing_ok=True)
+                _LOGGER.debug(f"Exported {path}")
+            else:
+                written += await self._write_partition(partial, HIST_COLUMNS, rows())
+                _LOGGER.debug(f"Exported part of the day to {partial}")
+        return written
+
+    async def _gather(self, pv_system_ids: Iterable[str], export) -> int:
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(pv_system_id: str) -> int:
+            async with semaphore:
+                return await export(pv_system_id)
+
+        pv_system_ids = list(pv_system_ids)
+        # every PV system runs to completion, so the partitions of the others
+        # are kept when one fails, and cancelling the export cancels them all
+        results = await asyncio.gather(*map(run, pv_system_ids), return_exceptions=True)
+        errors = {
+            pv_system_id: result
+            for pv_system_id, result in zip(pv_system_ids, results)
+            if isinstance(result, BaseException)
+        }
+        for error in errors.values():
+            if not isinstance(error, Exception):
+                raise error
+        if errors:
+            raise ExportError(errors) from next(iter(errors.values()))
+        return sum(results)
+
+    async def export_hist_data(
+        self,
+        pv_system_ids: Iterable[str],
+        start: datetime,
+        end: datetime,
+        channel: str | None = None,
+    ) -> int:
+        """
+        Export historical data partitioned by PV system and UTC date.
+
+        Returns the number of rows written, whole days exported by an earlier
+        run are skipped. Days covered only in part are written with the
+        .partial suffix and exported again by the next run.
+        """
+        return await self._gather(
+            pv_system_ids,
+            lambda pv_system_id: self._export_hist_system(
+                pv_system_id, start, end, channel
+            ),
+        )
+
+    async def export_aggr_data_v2(
+        self,
+        pv_system_ids: Iterable[str],
+        period: str = TOTAL,
+        channels: List[str] | None = None,
+    ) -> int:
+        """
+        Export aggregated v2 data partitioned by PV system and period.
+
+        Each year, month or day is written to the partition of its key, e.g.
+        date=2023-05. Periods that ended settle_lag ago are finalised and
+        skipped by later runs, the total and periods still in progress are
+        written with the .partial suffix and exported again by the next run.
+        """
+        settled = datetime.now(timezone.utc).replace(tzinfo=None) - self.settle_lag
+
+        async def write(pv_system_id: str, key: str, rows: List[tuple]) -> int:
+            path = self.partition_path(pv_system_id, key)
+            if path.exists():
+                return 0
+            partial = self.partition_path(pv_system_id, key, True)
+            end = _period_end(key)
+            if end is None or end > settled:
+                return await self._write_partition(
+                    partial, AGGR_COLUMNS, _iterate(rows)
+                )
+            written = await self._write_partition(path, AGGR_COLUMNS, _iterate(rows))
+            partial.unlink(missing_ok=True)
+            return written
+
+        async def export(pv_system_id: str) -> int:
+            client = self.client.for_pv_system(pv_system_id)
+            written = 0
+            key, rows = None, []
+            # the records of a period are written together, one period at a time
+            async for record in client.stream_system_aggr_data_v2(period, channels):
+                record_key = period_key(record.logDateTime, period)
+                if record_key != key and rows:
+                    written += await write(pv_system_id, key, rows)
+                    rows = []
+                key = record_key
+                rows.extend(_aggr_rows(pv_system_id, record))
+            if rows:
+                written += await write(pv_system_id, key, rows)
+            return written
+
+        return await self._gather(pv_system_ids, export)
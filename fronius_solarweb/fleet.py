@@ -0,0 +1,187 @@
+import asyncio
+from contextlib import aclosing
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, List
+
+from httpx import AsyncClient, Limits
+
+from .api import Fronius_Solarweb
+from .ratelimit import RateLimiter
+from .schema.device import DeviceMetaData
+from .schema.pvsystem import PvSystemAggrDataV2, PvSystemFlowData
+
+_LOGGER = logging.getLogger(__name__)
+DEFAULT_CONCURRENCY = 50
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE = 20
+
+
+async def iter_completed(
+    pv_system_ids: Iterable[str],
+    call: Callable[[str], Awaitable[Any]],
+    max_concurrency: int,
+    return_exceptions: bool = True,
+) -> AsyncIterator[tuple[str, Any]]:
+    """
+    Call a coroutine function for every PV system and yield results as they complete.
+
+    PV systems are taken in order by max_concurrency workers. Yields
+    (pv_system_id, result) tuples in completion order. With
+    return_exceptions the exception raised for a PV system is yielded as its
+    result, otherwise it is raised and the remaining calls are cancelled.
+    """
+    pending = iter(pv_system_ids)
+    results: asyncio.Queue = asyncio.Queue()
+
+    async def worker():
+        for pv_system_id in pending:
+            try:
+                result = await call(pv_system_id)
+            except Exception as e:  # pylint: disable=broad-except
+                result = e
+            await results.put((pv_system_id, result))
+
+    workers = [asyncio.create_task(worker()) for _ in range(max_concurrency)]
+    remaining = len(workers)
+    done_marker = object()
+    for task in workers:
+        task.add_done_callback(lambda _: results.put_nowait(done_marker))
+    try:
+        while remaining:
+            item = await results.get()
+            if item is done_marker:
+                remaining -= 1
+                continue
+            if isinstance(item[1], Exception) and not return_exceptions:
+                raise item[1]
+            yield item
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+
+class Fronius_Solarweb_Fleet:
+    def __init__(
+        self,
+        access_key_id: str = None,
+        access_key_value: str = None,
+        httpx_client: AsyncClient = None,
+        login_name: str = None,
+        login_password: str = None,
+        max_concurrency: int = DEFAULT_CONCURRENCY,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE,
+        rate_limiter: RateLimiter | None = None,
+    ):
+        """
+        Create a Fronius Solarweb API client polling many PV systems concurrently.
+
+        All requests share one httpx client, so connections to the Solar.web
+        host are pooled and reused across PV systems.
+
+        :param access_key_id: see Fronius_Solarweb
+        :param access_key_value: see Fronius_Solarweb
+        :param httpx_client (optional): shared client, when not provided one is
+            created with the connection pool sized by max_connections and
+            max_keepalive_connections
+        :param login_name (optional): Solar.web app email / login name.
+        :param login_password (optional): Solar.web app password.
+        :param max_concurrency: maximum number of requests in flight at once.
+        :param max_connections: maximum number of connections to the Solar.web host.
+        :param max_keepalive_connections: number of idle connections kept open.
+        :param rate_limiter (optional): throttles the requests of all PV systems.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self.httpx_client = httpx_client or AsyncClient(
+            limits=Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+            )
+        )
+        self.client = Fronius_Solarweb(
+            access_key_id=access_key_id,
+            access_key_value=access_key_value,
+            httpx_client=self.httpx_client,
+            login_name=login_name,
+            login_password=login_password,
+            rate_limiter=rate_limiter,
+        )
+        self.pv_system_ids: List[str] = []
+
+    async def login(self):
+        await self.client.login()
+
+    async def discover(self) -> List[str]:
+        """Load the PV system ids available to the account, from every page."""
+        self.pv_system_ids = [
+            pv_system.pvSystemId
+            async for pv_system in self.client.iter_pvsystems_meta_data()
+        ]
+        _LOGGER.debug("Discovered %s PV systems", len(self.pv_system_ids))
+        return self.pv_system_ids
+
+    async def iter_results(
+        self,
+        method: str,
+        *args,
+        pv_system_ids: Iterable[str] | None = None,
+        return_exceptions: bool = True,
+        **kwargs,
+    ) -> AsyncIterator[tuple[str, Any]]:
+        """
+        Call a Fronius_Solarweb getter for every PV system and yield results as they complete.
+
+        Yields (pv_system_id, result) tuples in completion order. With
+        return_exceptions the exception raised for a PV system is yielded as its
+        result, otherwise it is raised and the remaining calls are cancelled.
+
+        :param method: name of the Fronius_Solarweb getter, e.g. "get_system_flow_data"
+        :param args: positional arguments passed to the getter
+        :param pv_system_ids (optional): PV systems to poll, defaults to the
+            systems found by discover()
+        :param return_exceptions: yield exceptions instead of raising them
+        :param kwargs: keyword arguments passed to the getter
+        """
+        if pv_system_ids is None:
+            pv_system_ids = self.pv_system_ids or await self.discover()
+
+        def call(pv_system_id: str) -> Awaitable[Any]:
+            getter = getattr(self.client.for_pv_system(pv_system_id), method)
+            return getter(*args, **kwargs)
+
+        async with aclosing(
+            iter_completed(pv_system_ids, call, self.max_concurrency, return_exceptions)
+        ) as results:
+            async for item in results:
+                yield item
+
+    def iter_flow_data(
+        self, tz: str = "zulu", pv_system_ids: Iterable[str] | None = None
+    ) -> AsyncIterator[tuple[str, PvSystemFlowData | Exception]]:
+        return self.iter_results(
+            "get_system_flow_data", tz=tz, pv_system_ids=pv_system_ids
+        )
+
+    def iter_aggr_data_v2(
+        self,
+        period: str = "total",
+        channels: List[str] | None = None,
+        pv_system_ids: Iterable[str] | None = None,
+    ) -> AsyncIterator[tuple[str, PvSystemAggrDataV2 | Exception]]:
+        return self.iter_results(
+            "get_system_aggr_data_v2",
+            period=period,
+            channels=channels,
+            pv_system_ids=pv_system_ids,
+        )
+
+    def iter_devices_meta_data(
+        self, pv_system_ids: Iterable[str] | None = None
+    ) -> AsyncIterator[tuple[str, list[DeviceMetaData] | Exception]]:
+        return self.iter_results("get_devices_meta_data", pv_system_ids=pv_system_ids)
+
+    async def aclose(self):
+        await self.httpx_client.aclose()
@@ -0,0 +1,172 @@
+from dataclasses import dataclass, field
+import re
+import time
+from typing import Dict, Optional
+
+_ID_SEGMENT = re.compile(r"/(pvsystems|devices)/[^/?]+")
+_ID_PLACEHOLDER = r"/\1/{id}"
+_TRACE_EVENTS = {
+    # httpcore trace event -> timing it starts or completes
+    "connection.connect_tcp.started": ("connect", True),
+    "connection.start_tls.complete": ("connect", False),
+    "connection.connect_tcp.complete": ("connect", False),
+    "http11.send_request_headers.started": ("ttfb", True),
+    "http2.send_request_headers.started": ("ttfb", True),
+    "http11.receive_response_headers.complete": ("ttfb", False),
+    "http2.receive_response_headers.complete": ("ttfb", False),
+    "http11.receive_response_body.started": ("body", True),
+    "http2.receive_response_body.started": ("body", True),
+    "http11.receive_response_body.complete": ("body", False),
+    "http2.receive_response_body.complete": ("body", False),
+}
+
+
+def endpoint_name(method: str, url: str) -> str:
+    """Return the endpoint of a url with the PV system and device ids replaced, e.g. GET /pvsystems/{id}/flowdata."""
+    path = url.split("/swqapi", 1)[-1].split("?", 1)[0]
+    return f"{method} {_ID_SEGMENT.sub(_ID_PLACEHOLDER, path)}"
+
+
+@dataclass
+class RequestEvent:
+    endpoint: str
+    method: str
+    url: str
+    started: float = field(default_factory=time.perf_counter)
+    status_code: Optional[int] = None
+    error: Optional[BaseException] = None
+    request_bytes: int = 0
+    response_bytes: int = 0
+    # seconds spent in each phase: connect (including DNS), ttfb, body, total,
+    # decode and validate
+    timings: Dict[str, float] = field(default_factory=dict)
+    _marks: Dict[str, float] = field(default_factory=dict, repr=False)
+
+    async def trace(self, event_name: str, _info: dict):
+        """httpcore trace extension callback recording the network timings."""
+        phase = _TRACE_EVENTS.get(event_name)
+        if phase is None:
+            return
+        name, started = phase
+        if started:
+            self._marks[name] = time.perf_counter()
+        elif name in self._marks:
+            self.timings[name] = time.perf_counter() - self._marks[name]
+
+
+class Instrumentation:
+    """
+    Hooks called by Fronius_Solarweb, subclass and override the ones needed.
+
+    Without an instrumentation passed to the client none of the timings are
+    collected.
+    """
+
+    def on_request(self, event: RequestEvent):
+        pass
+
+    def on_response(self, event: RequestEvent):
+        pass
+
+    def on_decode(self, event: RequestEvent):
+        pass
+
+    def on_retry(self, method: str, attempt: int, error: Optional[BaseException]):
+        pass
+
+
+class OpenTelemetryInstrumentation(Instrumentation):
+    def __init__(self, tracer=None):
+        """Record a span per request, requires opentelemetry-api."""
+        from opentelemetry import trace  # pylint: disable=import-outside-toplevel
+
+        self.tracer = tracer or trace.get_tracer("fronius_solarweb")
+        self._spans: Dict[int, object] = {}
+
+    def on_request(self, event: RequestEvent):
+        span = self.tracer.start_span(
+            event.endpoint,
+            attributes={"http.request.method": event.method, "url.full": event.url},
+        )
+        self._spans[id(event)] = span
+
+    def on_response(self, event: RequestEvent):
+        span = self._spans.pop(id(event), None)
+        if span is None:
+            return
+        if event.status_code is not None:
+            span.set_attribute("http.response.status_code", event.status_code)
+            span.set_attribute("http.response.body.size", event.response_bytes)
+        if event.error is not None:
+            span.record_exception(event.error)
+        for name, seconds in event.timings.items():
+            span.set_attribute(f"fronius_solarweb.{name}_ms", seconds * 1000)
+        span.end()
+
+    def on_decode(self, event: RequestEvent):
+        span = self.tracer.start_span(f"decode {event.endpoint}")
+        for name in ("decode", "validate"):
+            if name in event.timings:
+                span.set_attribute(
+                    f"fronius_solarweb.{name}_ms", event.timings[name] * 1000
+                )
+        span.end()
+
+    def on_retry(self, method: str, attempt: int, error: Optional[BaseException]):
+        from opentelemetry import trace  # pylint: disable=import-outside-toplevel
+
+        trace.get_current_span().add_event(
+            "retry", {"method": method, "attempt": attempt, "error": repr(error)}
+        )
+
+
+class PrometheusInstrumentation(Instrumentation):
+    def __init__(self, registry=None, prefix: str = "fronius_solarweb"):
+        """Export request histograms and counters, requires prometheus-client."""
+        # pylint: disable=import-outside-toplevel
+        from prometheus_client import REGISTRY, Counter, Histogram
+
+        registry = registry or REGISTRY
+        self.phase_seconds = Histogram(
+            f"{prefix}_request_phase_seconds",
+            "Seconds spent per request phase",
+            ["endpoint", "phase"],
+            registry=registry,
+        )
+        self.response_bytes = Histogram(
+            f"{prefix}_response_bytes",
+            "Size of the response bodies",
+            ["endpoint"],
+            buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+            registry=registry,
+        )
+        self.responses = Counter(
+            f"{prefix}_responses",
+            "Responses received by status code",
+            ["endpoint", "status_code"],
+            registry=registry,
+        )
+        self.retries = Counter(
+            f"{prefix}_retries",
+            "Retried getter calls",
+            ["method"],
+            registry=registry,
+        )
+
+    def _observe(self, event: RequestEvent, *phases: str):
+        for phase in phases:
+            if phase in event.timings:
+                self.phase_seconds.labels(event.endpoint, phase).observe(
+                    event.timings[phase]
+                )
+
+    def on_response(self, event: RequestEvent):
+        self._observe(event, "connect", "ttfb", "body", "total")
+        self.responses.labels(event.endpoint, str(event.status_code)).inc()
+        self.response_bytes.labels(event.endpoint).observe(event.response_bytes)
+
+    def on_decode(self, event: RequestEvent):
+        self._observe(event, "decode", "validate")
+
+    def on_retry(self, method: str, attempt: int, error: Optional[BaseException]):
+        self.retries.labels(method).inc()
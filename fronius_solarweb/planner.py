@@ -0,0 +1,292 @@
+import asyncio
+import calendar
+from datetime import date, datetime, timedelta, timezone
+import logging
+import math
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .api import Fronius_Solarweb
+from .schema.pvsystem import AggrData, Channel, PvSystemAggrDataV2
+
+_LOGGER = logging.getLogger(__name__)
+# seconds the values of a period still in progress are reused
+DEFAULT_CURRENT_TTL = 300.0
+TOTAL = "total"
+# length of the logDateTime prefix identifying a period
+KEY_LENGTHS = {"years": 4, "months": 7, "days": 10}
+ENERGY_UNITS = ("Wh", "kWh", "MWh")
+
+
+def is_additive(channel: Channel) -> bool:
+    """Energy channels add up over periods, power, ratios and readings don't."""
+    return channel.unit in ENERGY_UNITS or channel.channelType == "Energy"
+
+
+def period_key(log_datetime: Optional[str], period: str) -> str:
+    """Return the key of the period an aggregated record was logged for, e.g. 2023-05."""
+    if period == TOTAL or not log_datetime:
+        return TOTAL
+    return log_datetime[: KEY_LENGTHS[period]]
+
+
+def _bounds(key: str) -> Tuple[date, date]:
+    """Return the first and last day of a year, month or day key."""
+    if len(key) == 4:
+        return date(int(key), 1, 1), date(int(key), 12, 31)
+    if len(key) == 7:
+        year, month = int(key[:4]), int(key[5:7])
+        return date(year, month, 1), date(
+            year, month, calendar.monthrange(year, month)[1]
+        )
+    day = date.fromisoformat(key)
+    return day, day
+
+
+def _format(value: str | date | None, period: str) -> Optional[str]:
+    if isinstance(value, date) and period in KEY_LENGTHS:
+        return value.isoformat()[: KEY_LENGTHS[period]]
+    return value
+
+
+def period_keys(period: str, start: date, end: date) -> List[str]:
+    """Return the keys of the years, months or days overlapping start to end."""
+    if period == "years":
+        return [f"{year:04d}" for year in range(start.year, end.year + 1)]
+    if period == "months":
+        return [
+            f"{month // 12:04d}-{month % 12 + 1:02d}"
+            for month in range(
+                start.year * 12 + start.month - 1, end.year * 12 + end.month
+            )
+        ]
+    if period == "days":
+        return [
+            (start + timedelta(days=days)).isoformat()
+            for days in range((end - start).days + 1)
+        ]
+    raise ValueError(f"period must be one of {[TOTAL, *KEY_LENGTHS]}, not {period}")
+
+
+class AggrPlanner:
+    def __init__(
+        self,
+        client: Fronius_Solarweb,
+        since: date | None = None,
+        additive: Callable[[Channel], bool] = is_additive,
+        current_ttl: float = DEFAULT_CURRENT_TTL,
+    ):
+        """
+        Answer aggregated v2 queries from finer periods already fetched.
+
+        Periods nest days in months, months in years and years in the total.
+        A coarse value of an additive channel is summed from the finer values
+        held when they cover the whole period, only the periods that can't be
+        answered locally are requested, in one request per contiguous run.
+        Values of ended periods are kept, those of a period still in progress
+        for current_ttl seconds.
+
+        :param client: Fronius_Solarweb client of the PV system
+        :param since (optional): first day with data, defaults to the PV
+            system's installationDate when a total or open range is queried
+        :param additive: returns whether a channel's values add up over periods
+        :param current_ttl: seconds the values of a period in progress are reused
+        """
+        self.client = client
+        self.since = since
+        self.additive = additive
+        self.current_ttl = current_ttl
+        self.requests = 0
+        # (period key, channel name) -> (channel, expires)
+        self._values: Dict[Tuple[str, str], Tuple[Channel, float]] = {}
+
+    @staticmethod
+    def _today() -> date:
+        return datetime.now(timezone.utc).date()
+
+    def _ended(self, key: str) -> bool:
+        # a day of margin for PV systems in time zones ahead of UTC
+        return key != TOTAL and _bounds(key)[1] < self._today() - timedelta(days=1)
+
+    def _children(self, key: str) -> Optional[List[str]]:
+        """Return the finer periods making up a period, None when it can't be split."""
+        if key == TOTAL:
+            if self.since is None:
+                return None
+            return period_keys("years", self.since, self._today())
+        if len(key) == 10:
+            return None
+        first, last = _bounds(key)
+        # only the part of the period with data
+        first = max(first, self.since) if self.since is not None else first
+        last = min(last, self._today())
+        if first > last:
+            return None
+        return period_keys("months" if len(key) == 4 else "days", first, last)
+
+    def add(self, aggr_data: PvSystemAggrDataV2, period: str):
+        """Keep the channel values of an aggregated v2 response for later queries."""
+        now = time.time()
+        for record in aggr_data.data or []:
+            key = period_key(record.logDateTime, period)
+            expires = math.inf if self._ended(key) else now + self.current_ttl
+            for channel in record.channels or []:
+                if channel.channelName is not None and channel.value is not None:
+                    self._values[(key, channel.channelName)] = (channel, expires)
+
+    def clear(self):
+        self._values.clear()
+
+    def _lookup(self, key: str, channel_name: str) -> Optional[Tuple[Channel, float]]:
+        entry = self._values.get((key, channel_name))
+        if entry is not None and entry[1] > time.time():
+            return entry
+        children = self._children(key)
+        if not children:
+            return None
+        parts = []
+        for child in children:
+            part = self._lookup(child, channel_name)
+            if part is None or not self.additive(part[0]):
+                return None
+            parts.append(part)
+        first = parts[0][0]
+        if any(part.unit != first.unit for part, _ in parts):
+            return None
+        try:
+            value = sum(float(part.value) for part, _ in parts)
+        except ValueError:
+            return None
+        entry = (
+            Channel(
+                channelName=first.channelName,
+                channelType=first.channelType,
+                unit=first.unit,
+                value=value,
+            ),
+            min(expires for _, expires in parts),
+        )
+        self._values[(key, channel_name)] = entry
+        return entry
+
+    async def _fetch(
+        self, period: str, keys: List[str], channels: List[str]
+    ) -> PvSystemAggrDataV2:
+        self.requests += 1
+        if period == TOTAL:
+            aggr_data = await self.client.get_system_aggr_data_v2(period, channels)
+        else:
+            _LOGGER.debug(f"Requesting {period} {keys[0]} to {keys[-1]} of {channels}")
+            aggr_data = await self.client.get_system_aggr_data_v2(
+                period, channels, start=keys[0], end=keys[-1]
+            )
+        self.add(aggr_data, period)
+        return aggr_data
+
+    async def _since(self) -> date:
+        if self.since is None:
+            meta_data = await self.client.get_pvsystem_meta_data()
+            if meta_data.installationDate is None:
+                raise ValueError(
+                    f"PV system {self.client.pv_system_id} has no installationDate, "
+                    "pass since or a start"
+                )
+            self.since = meta_data.installationDate.date()
+        return self.since
+
+    async def get_system_aggr_data_v2(
+        self,
+        period: str = TOTAL,
+        channels: List[str] | None = None,
+        start: str | date | None = None,
+        end: str | date | None = None,
+    ) -> PvSystemAggrDataV2:
+        """
+        Get aggregated v2 data, requesting only the periods that can't be derived.
+
+        :param period: total, years, months or days
+        :param channels (optional): channel names, without them the query is
+            passed to Solar.web and its response kept
+        :param start (optional): first period as a date or key, e.g. 2023-01,
+            defaults to since
+        :param end (optional): last period as a date or key, defaults to today
+        """
+        if period != TOTAL and period not in KEY_LENGTHS:
+            raise ValueError(
+                f"period must be one of {[TOTAL, *KEY_LENGTHS]}, not {period}"
+            )
+        if not channels:
+            self.requests += 1
+            aggr_data = await self.client.get_system_aggr_data_v2(
+                period,
+                channels,
+                start=_format(start, period),
+                end=_format(end, period),
+            )
+            self.add(aggr_data, period)
+            return aggr_data
+        if period == TOTAL:
+            if self.since is None:
+                # the total only splits into years from the installation onwards
+                try:
+                    await self._since()
+                except ValueError:
+                    pass
+            keys = [TOTAL]
+        else:
+            first = (
+                _bounds(start)[0] if isinstance(start, str) else start
+            ) or await self._since()
+            last = (_bounds(end)[1] if isinstance(end, str) else end) or self._today()
+            keys = period_keys(period, first, last)
+
+        found: Dict[str, Dict[str, Channel]] = {key: {} for key in keys}
+        missing: Dict[str, set] = {}
+        for key in keys:
+            for channel_name in channels:
+                entry = self._lookup(key, channel_name)
+                if entry is None:
+                    missing.setdefault(key, set()).add(channel_name)
+                else:
+                    found[key][channel_name] = entry[0]
+
+        # contiguous runs of periods with gaps, each fetched in one request
+        runs: List[Tuple[List[str], set]] = []
+        previous = None
+        for index, key in enumerate(keys):
+            if key not in missing:
+                continue
+            if previous is not None and previous == index - 1:
+                runs[-1][0].append(key)
+                runs[-1][1].update(missing[key])
+            else:
+                runs.append(([key], set(missing[key])))
+            previous = index
+        _LOGGER.debug(
+            f"Answered {len(keys) * len(channels) - sum(map(len, missing.values()))} "
+            f"of {len(keys) * len(channels)} {period} values locally, "
+            f"requesting {len(runs)} gaps"
+        )
+        responses = await asyncio.gather(
+            *(self._fetch(period, run, sorted(names)) for run, names in runs)
+        )
+        for aggr_data in responses:
+            for record in aggr_data.data or []:
+                key = period_key(record.logDateTime, period)
+                for channel in record.channels or []:
+                    if key in missing and channel.channelName in missing[key]:
+                        found[key][channel.channelName] = channel
+
+        return PvSystemAggrDataV2(
+            pvSystemId=self.client.pv_system_id,
+            data=[
+                AggrData(
+                    logDateTime=None if key == TOTAL else key,
+                    channels=[
+                        found[key][name] for name in channels if name in found[key]
+                    ],
+                )
+                for key in keys
+                if found[key]
+            ],
+        )
@@ -0,0 +1,209 @@
+import asyncio
+from contextlib import aclosing
+from itertools import chain, zip_longest
+import logging
+from typing import Any, AsyncIterator, Dict, Iterable, List
+
+from httpx import AsyncClient, Limits
+
+from .api import Fronius_Solarweb
+from .fleet import iter_completed
+from .ratelimit import RateLimiter
+
+_LOGGER = logging.getLogger(__name__)
+DEFAULT_CONCURRENCY = 50
+DEFAULT_ACCOUNT_CONCURRENCY = 10
+DEFAULT_ACCOUNT_CONNECTIONS = 20
+_SKIP = object()
+
+
+class Fronius_Solarweb_Pool:
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_CONCURRENCY,
+        max_account_concurrency: int = DEFAULT_ACCOUNT_CONCURRENCY,
+        max_account_connections: int = DEFAULT_ACCOUNT_CONNECTIONS,
+        rate_limiter: RateLimiter | None = None,
+    ):
+        """
+        Fronius Solarweb API client routing PV systems to the account they belong to.
+
+        Every account has its own Fronius_Solarweb client, with its own
+        headers, JSON web token and token manager, and its own httpx client so
+        neither connections nor cookies are shared between identities. PV
+        systems are routed to their account by discover() or add_account().
+
+        :param max_concurrency: maximum number of requests in flight at once.
+        :param max_account_concurrency: maximum number of requests in flight
+            for a single account, so one large account can't starve the others.
+        :param max_account_connections: size of each account's connection pool.
+        :param rate_limiter (optional): throttles the requests of all accounts,
+            accounts can also be given their own.
+        """
+        if max_concurrency < 1 or max_account_concurrency < 1:
+            raise ValueError("concurrency limits must be at least 1")
+        self.max_concurrency = max_concurrency
+        self.max_account_concurrency = max_account_concurrency
+        self.max_account_connections = max_account_connections
+        self.rate_limiter = rate_limiter
+        self.accounts: Dict[str, Fronius_Solarweb] = {}
+        # pvSystemId -> account name
+        self.routes: Dict[str, str] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def add_account(
+        self,
+        name: str,
+        access_key_id: str = None,
+        access_key_value: str = None,
+        login_name: str = None,
+        login_password: str = None,
+        pv_system_ids: Iterable[str] = (),
+        **client_kwargs,
+    ) -> Fronius_Solarweb:
+        """
+        Add the credentials of an account to the pool.
+
+        :param name: unique name of the account
+        :param access_key_id: see Fronius_Solarweb
+        :param access_key_value: see Fronius_Solarweb
+        :param login_name (optional): Solar.web app email / login name.
+        :param login_password (optional): Solar.web app password.
+        :param pv_system_ids (optional): PV systems of the account, others are
+            found by discover()
+        :param client_kwargs: passed to Fronius_Solarweb, e.g. cache
+        """
+        if name in self.accounts:
+            raise ValueError(f"Account {name} is already in the pool")
+        client_kwargs.setdefault("rate_limiter", self.rate_limiter)
+        client_kwargs.setdefault(
+            "httpx_client",
+            AsyncClient(
+                limits=Limits(
+                    max_connections=self.max_account_connections,
+                    max_keepalive_connections=self.max_account_connections,
+                )
+            ),
+        )
+        client = Fronius_Solarweb(
+            access_key_id=access_key_id,
+            access_key_value=access_key_value,
+            login_name=login_name,
+            login_password=login_password,
+            **client_kwargs,
+        )
+        self.accounts[name] = client
+        self._semaphores[name] = asyncio.Semaphore(self.max_account_concurrency)
+        for pv_system_id in pv_system_ids:
+            self.routes[pv_system_id] = name
+        return client
+
+    async def login(self):
+        """Log in every account with a login name, starting its background token refresh."""
+
+        async def login(client: Fronius_Solarweb):
+            await client.login()
+            client.token_manager.start()
+
+        await asyncio.gather(
+            *(
+                login(client)
+                for client in self.accounts.values()
+                if client.login_name is not None
+            )
+        )
+
+    async def discover(self) -> Dict[str, str]:
+        """Route the PV systems available to each account, returns the routes."""
+
+        async def discover(name: str, client: Fronius_Solarweb):
+            async with self._semaphores[name]:
+                pv_systems = [
+                    pv_system async for pv_system in client.iter_pvsystems_meta_data()
+                ]
+            for pv_system in pv_systems:
+                if self.routes.setdefault(pv_system.pvSystemId, name) != name:
+                    _LOGGER.warning(
+                        f"PV system {pv_system.pvSystemId} is available to accounts "
+                        f"{self.routes[pv_system.pvSystemId]} and {name}, "
+                        f"keeping {self.routes[pv_system.pvSystemId]}"
+                    )
+
+        await asyncio.gather(
+            *(discover(name, client) for name, client in self.accounts.items())
+        )
+        _LOGGER.debug(
+            "Discovered %s PV systems in %s accounts",
+            len(self.routes),
+            len(self.accounts),
+        )
+        return self.routes
+
+    def client_for(self, pv_system_id: str) -> Fronius_Solarweb:
+        """Return a client bound to the PV system using its account's credentials."""
+        try:
+            name = self.routes[pv_system_id]
+        except KeyError:
+            raise KeyError(f"PV system {pv_system_id} is not in any account") from None
+        return self.accounts[name].for_pv_system(pv_system_id)
+
+    async def call(self, pv_system_id: str, method: str, *args, **kwargs) -> Any:
+        """Call a Fronius_Solarweb getter for a PV system with its account's credentials."""
+        getter = getattr(self.client_for(pv_system_id), method)
+        async with self._semaphores[self.routes[pv_system_id]]:
+            return await getter(*args, **kwargs)
+
+    def _interleave(self, pv_system_ids: Iterable[str]) -> List[str]:
+        # alternate between accounts so each gets a fair share of the workers
+        by_account: Dict[str, List[str]] = {}
+        for pv_system_id in pv_system_ids:
+            by_account.setdefault(self.routes.get(pv_system_id), []).append(
+                pv_system_id
+            )
+        return [
+            pv_system_id
+            for pv_system_id in chain.from_iterable(
+                zip_longest(*by_account.values(), fillvalue=_SKIP)
+            )
+            if pv_system_id is not _SKIP
+        ]
+
+    async def iter_results(
+        self,
+        method: str,
+        *args,
+        pv_system_ids: Iterable[str] | None = None,
+        return_exceptions: bool = True,
+        **kwargs,
+    ) -> AsyncIterator[tuple[str, Any]]:
+        """
+        Call a Fronius_Solarweb getter for every PV system and yield results as they complete.
+
+        Works like Fronius_Solarweb_Fleet.iter_results, with every PV system
+        polled using the credentials of its account and the accounts served
+        in turn.
+
+        :param method: name of the Fronius_Solarweb getter, e.g. "get_system_flow_data"
+        :param args: positional arguments passed to the getter
+        :param pv_system_ids (optional): PV systems to poll, defaults to all
+            routed PV systems
+        :param return_exceptions: yield exceptions instead of raising them
+        :param kwargs: keyword arguments passed to the getter
+        """
+        if pv_system_ids is None:
+            pv_system_ids = list(self.routes) or await self.discover()
+        async with aclosing(
+            iter_completed(
+                self._interleave(pv_system_ids),
+                lambda pv_system_id: self.call(pv_system_id, method, *args, **kwargs),
+                self.max_concurrency,
+                return_exceptions,
+            )
+        ) as results:
+            async for item in results:
+                yield item
+
+    async def aclose(self):
+        for client in self.accounts.values():
+            await client.token_manager.stop()
+            await client.httpx_client.aclose()
@@ -0,0 +1,129 @@
+import asyncio
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import logging
+import threading
+import time
+from typing import Dict, Mapping, Optional
+
+from tenacity import RetryCallState
+from tenacity.wait import wait_base
+
+from .errors import TooManyRequestsException
+
+_LOGGER = logging.getLogger(__name__)
+_REMAINING_HEADERS = ("RateLimit-Remaining", "X-RateLimit-Remaining")
+_RESET_HEADERS = ("RateLimit-Reset", "X-RateLimit-Reset")
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Return the seconds to wait from a Retry-After header in seconds or HTTP date form."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def _parse_reset(value: str) -> Optional[float]:
+    try:
+        reset = float(value)
+    except ValueError:
+        return None
+    # some APIs send an epoch timestamp rather than the seconds remaining
+    if reset > 1e9:
+        reset -= time.time()
+    return max(reset, 0.0)
+
+
+class RateLimiter:
+    _shared: Dict[str, "RateLimiter"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Token bucket limiting the requests sent to Solar.web.
+
+        The limiter is safe to share between clients and event loops, pass
+        the same instance to each Fronius_Solarweb or use RateLimiter.shared().
+
+        :param rate: requests per second allowed on average.
+        :param burst: number of requests that may be sent back to back.
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        self.rate = rate
+        self.burst = burst
+        self._interval = 1 / rate
+        self._tat = 0.0  # theoretical arrival time of the next request
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, name: str = "default", rate: float = 10, burst: int = 1):
+        """Return the process wide limiter with the given name, creating it on first use."""
+        with cls._shared_lock:
+            if name not in cls._shared:
+                cls._shared[name] = cls(rate, burst)
+            return cls._shared[name]
+
+    def _reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            tat = max(self._tat, now, self._blocked_until)
+            self._tat = tat + self._interval
+            send_at = max(tat - (self.burst - 1) * self._interval, self._blocked_until)
+            return max(send_at - now, 0.0)
+
+    async def acquire(self):
+        delay = self._reserve()
+        while delay > 0:
+            _LOGGER.debug(f"Rate limited, waiting {delay:.2f}s")
+            await asyncio.sleep(delay)
+            if self._blocked_until <= time.monotonic():
+                break
+            # a 429 received while waiting reschedules requests already waiting
+            delay = self._reserve()
+
+    def block(self, seconds: float):
+        """Hold back all requests for the given number of seconds."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    def update(self, headers: Mapping[str, str], status_code: int):
+        """Throttle from the rate limit headers of a response."""
+        if status_code == 429:
+            retry_after = parse_retry_after(headers.get("Retry-After"))
+            self.block(retry_after if retry_after is not None else self._interval)
+            return
+        for remaining_header in _REMAINING_HEADERS:
+            if headers.get(remaining_header) == "0":
+                for reset_header in _RESET_HEADERS:
+                    reset = headers.get(reset_header)
+                    if reset is not None and (seconds := _parse_reset(reset)):
+                        self.block(seconds)
+                        return
+
+
+class wait_retry_after(wait_base):  # pylint: disable=invalid-name
+    """Wait the Retry-After of a 429 response, falling back to another wait strategy."""
+
+    def __init__(self, fallback: wait_base):
+        self.fallback = fallback
+
+    def __call__(self, retry_state: RetryCallState) -> float:
+        exception = retry_state.outcome.exception() if retry_state.outcome else None
+        if (
+            isinstance(exception, TooManyRequestsException)
+            and exception.retry_after is not None
+        ):
+            return exception.retry_after
+        return self.fallback(retry_state)
@@ -0,0 +1,250 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, Iterator, Optional
+
+from tenacity import RetryCallState
+from tenacity.stop import stop_base
+
+from .errors import CircuitOpenException, DeadlineExceededException
+
+if TYPE_CHECKING:
+    from httpx import Timeout
+
+_LOGGER = logging.getLogger(__name__)
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RECOVERY_TIME = 30.0
+
+# monotonic time the current call must complete by
+_deadline: ContextVar[Optional[float]] = ContextVar(
+    "fronius_solarweb_deadline", default=None
+)
+
+
+@contextmanager
+def deadline(timeout: float) -> Iterator[None]:
+    """
+    Bound the Solar.web calls made inside the block to timeout seconds.
+
+    Request timeouts are shortened to the time left and no retry is started
+    that can't complete in time. Nested deadlines can only shorten the
+    enclosing one.
+    """
+    expires = time.monotonic() + timeout
+    current = _deadline.get()
+    token = _deadline.set(expires if current is None else min(current, expires))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time() -> Optional[float]:
+    """Return the seconds left before the current deadline, None without one."""
+    expires = _deadline.get()
+    return None if expires is None else expires - time.monotonic()
+
+
+def bounded_timeout(timeout: "Timeout", remaining: float) -> "Timeout":
+    """Return the httpx timeout with every phase shortened to the remaining seconds."""
+    from httpx import Timeout  # pylint: disable=import-outside-toplevel
+
+    def bound(value: Optional[float]) -> float:
+        return remaining if value is None else min(value, remaining)
+
+    return Timeout(
+        connect=bound(timeout.connect),
+        read=bound(timeout.read),
+        write=bound(timeout.write),
+        pool=bound(timeout.pool),
+    )
+
+
+class RetryBudget:
+    def __init__(self, ratio: float = 0.2, min_per_second: float = 1.0):
+        """
+        Limit retries to a share of the requests sent.
+
+        Every request deposits ratio of a retry, every retry withdraws one,
+        and min_per_second retries are always allowed so rarely used clients
+        can still retry. Once spent, calls fail instead of retrying, so
+        retries can't multiply the load on Solar.web during an outage.
+
+        :param ratio: retries allowed per request sent
+        :param min_per_second: retries allowed per second regardless of requests
+        """
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self._max_balance = max(10 * min_per_second, 1.0)
+        self._balance = self._max_balance
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._balance = min(
+            self._balance + (now - self._updated) * self.min_per_second,
+            self._max_balance,
+        )
+        self._updated = now
+
+    def deposit(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            self._balance = min(self._balance + self.ratio, self._max_balance)
+
+    def withdraw(self) -> bool:
+        """Take a retry from the budget, False when it is spent."""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._balance < 1:
+                return False
+            self._balance -= 1
+            return True
+
+
+# shared by every policy not given its own budget
+PROCESS_RETRY_BUDGET = RetryBudget()
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        recovery_time: float = DEFAULT_RECOVERY_TIME,
+    ):
+        """
+        Fail fast after a run of server errors or timeouts.
+
+        After failure_threshold consecutive failures the circuit opens and
+        requests raise CircuitOpenException without being sent. Once
+        recovery_time seconds have passed a single probe request is let
+        through, closing the circuit when it succeeds.
+
+        :param failure_threshold: consecutive failures opening the circuit
+        :param recovery_time: seconds the circuit stays open before probing
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def before_request(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            now = time.monotonic()
+            retry_after = self._opened_at + self.recovery_time - now
+            if retry_after <= 0:
+                # let one probe through, others fail until it completes or
+                # another recovery_time passes without an answer
+                self.state = self.HALF_OPEN
+                self._opened_at = now
+                return
+            raise CircuitOpenException(max(retry_after, 0.0))
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                _LOGGER.info("Solar.web recovered, closing circuit")
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or (
+                self.state == self.CLOSED and self.failures >= self.failure_threshold
+            ):
+                _LOGGER.warning(
+                    f"Opening circuit after {self.failures} failures, "
+                    f"failing fast for {self.recovery_time}s"
+                )
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def record_status(self, status_code: int):
+        if status_code >= 500:
+            self.record_failure()
+        else:
+            self.record_success()
+
+
+class ResiliencePolicy:
+    def __init__(
+        self,
+        max_attempts: int | None = None,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        recovery_time: float = DEFAULT_RECOVERY_TIME,
+        retry_budget: RetryBudget | None = PROCESS_RETRY_BUDGET,
+        methods: Dict[str, "ResiliencePolicy"] | None = None,
+    ):
+        """
+        Retry, circuit breaker and retry budget settings of a client.
+
+        :param max_attempts (optional): attempts per call, defaults to the
+            getter's own stop condition
+        :param failure_threshold: consecutive 5xx responses or timeouts of an
+            endpoint opening its circuit
+        :param recovery_time: seconds an open circuit waits before probing
+        :param retry_budget (optional): budget retries are taken from, defaults
+            to the process wide budget, None retries without a budget
+        :param methods (optional): policies overriding this one for getters,
+            e.g. {"get_hist_data": ResiliencePolicy(max_attempts=2)}
+        """
+        self.max_attempts = max_attempts
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+        self.retry_budget = retry_budget
+        self.methods = methods or {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def for_method(self, name: str) -> "ResiliencePolicy":
+        return self.methods.get(name, self)
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        """Return the circuit breaker of an endpoint, e.g. GET /pvsystems/{id}/histdata."""
+        with self._lock:
+            if endpoint not in self._breakers:
+                self._breakers[endpoint] = CircuitBreaker(
+                    self.failure_threshold, self.recovery_time
+                )
+            return self._breakers[endpoint]
+
+
+class stop_resilient(stop_base):  # pylint: disable=invalid-name
+    """Stop on the client's resilience policy and deadline, otherwise on another stop condition."""
+
+    def __init__(self, fallback: stop_base):
+        self.fallback = fallback
+
+    def __call__(self, retry_state: RetryCallState) -> bool:
+        remaining = remaining_time()
+        # tenacity 8.3 and later compute the next wait before calling stop
+        if remaining is not None and remaining <= retry_state.upcoming_sleep:
+            raise DeadlineExceededException(
+                f"No time left to retry {retry_state.fn.__name__}"
+            ) from retry_state.outcome.exception()
+        policy = retry_state.args[0].resilience if retry_state.args else None
+        if policy is None:
+            return self.fallback(retry_state)
+        policy = policy.for_method(retry_state.fn.__name__)
+        if policy.max_attempts is not None:
+            if retry_state.attempt_number >= policy.max_attempts:
+                return True
+        elif self.fallback(retry_state):
+            return True
+        if policy.retry_budget is not None and not policy.retry_budget.withdraw():
+            _LOGGER.warning(
+                f"Retry budget spent, not retrying {retry_state.fn.__name__}"
+            )
+            return True
+        return False
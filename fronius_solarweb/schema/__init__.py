@@ -0,0 +1,34 @@
+import importlib
+
+# model -> module, each module is imported the first time one of its models is used
+_EXPORTS = {
+    "DeviceMetaData": ".device",
+    "DevicesMetaData": ".device",
+    "Error": ".error",
+    "HistoricalChannel": ".hist",
+    "HistoricalData": ".hist",
+    "HistoricalValues": ".hist",
+    "PagingLinks": ".hist",
+    "AggrData": ".pvsystem",
+    "Channel": ".pvsystem",
+    "DeviceAggrDataV2": ".pvsystem",
+    "PvSystemAggrDataV2": ".pvsystem",
+    "PvSystemFlowData": ".pvsystem",
+    "PvSystemMetaData": ".pvsystem",
+    "PvSystemsMetaData": ".pvsystem",
+    "ReleaseInfo": ".service",
+    "CompactSeries": ".compact",
+}
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,165 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+from .hist import HistoricalChannel, HistoricalData, HistoricalValues, PagingLinks
+from .pvsystem import AggrData, Channel, DeviceAggrDataV2, PvSystemAggrDataV2
+
+
+@dataclass(frozen=True, slots=True)
+class ChannelDescriptor:
+    channelName: Optional[str] = None
+    channelType: Optional[str] = None
+    unit: Optional[str] = None
+    # device of the channel in data merged from several devices
+    deviceId: Optional[str] = None
+
+
+@lru_cache(maxsize=None)
+def channel_descriptor(
+    channelName: Optional[str] = None,
+    channelType: Optional[str] = None,
+    unit: Optional[str] = None,
+    deviceId: Optional[str] = None,
+) -> ChannelDescriptor:
+    """Return the interned descriptor, one instance is shared by all points of a channel."""
+    return ChannelDescriptor(channelName, channelType, unit, deviceId)
+
+
+@dataclass(slots=True)
+class CompactChannel:
+    descriptor: ChannelDescriptor
+    value: Optional[float | str] = None
+    isActive: Optional[bool] = None
+    isDamaged: Optional[bool] = None
+
+    @property
+    def channelName(self) -> Optional[str]:
+        return self.descriptor.channelName
+
+    @property
+    def channelType(self) -> Optional[str]:
+        return self.descriptor.channelType
+
+    @property
+    def unit(self) -> Optional[str]:
+        return self.descriptor.unit
+
+    @property
+    def deviceId(self) -> Optional[str]:
+        return self.descriptor.deviceId
+
+    @classmethod
+    def from_model(cls, channel: HistoricalChannel | Channel) -> "CompactChannel":
+        return cls(
+            channel_descriptor(
+                channel.channelName,
+                channel.channelType,
+                channel.unit,
+                getattr(channel, "deviceId", None),
+            ),
+            channel.value,
+            getattr(channel, "isActive", None),
+            getattr(channel, "isDamaged", None),
+        )
+
+    def to_historical_channel(self) -> HistoricalChannel:
+        return HistoricalChannel.model_construct(
+            channelName=self.descriptor.channelName,
+            channelType=self.descriptor.channelType,
+            unit=self.descriptor.unit,
+            value=self.value,
+            isActive=self.isActive,
+            isDamaged=self.isDamaged,
+            deviceId=self.descriptor.deviceId,
+        )
+
+    def to_channel(self) -> Channel:
+        return Channel.model_construct(
+            channelName=self.descriptor.channelName,
+            channelType=self.descriptor.channelType,
+            unit=self.descriptor.unit,
+            value=self.value,
+        )
+
+
+@dataclass(slots=True)
+class CompactRecord:
+    logDateTime: Optional[str] = None
+    logDuration: Optional[int] = None
+    channels: Tuple[CompactChannel, ...] = ()
+
+    @classmethod
+    def from_model(cls, record: HistoricalData | AggrData) -> "CompactRecord":
+        return cls(
+            record.logDateTime,
+            getattr(record, "logDuration", None),
+            tuple(map(CompactChannel.from_model, record.channels or ())),
+        )
+
+    def to_historical_data(self) -> HistoricalData:
+        return HistoricalData.model_construct(
+            logDateTime=self.logDateTime,
+            logDuration=self.logDuration,
+            channels=[channel.to_historical_channel() for channel in self.channels],
+        )
+
+    def to_aggr_data(self) -> AggrData:
+        return AggrData.model_construct(
+            logDateTime=self.logDateTime,
+            channels=[channel.to_channel() for channel in self.channels],
+        )
+
+
+@dataclass(slots=True)
+class CompactSeries:
+    pvSystemId: Optional[str] = None
+    deviceId: Optional[str] = None
+    data: List[CompactRecord] | None = None
+
+    @classmethod
+    def from_hist_values(cls, values: HistoricalValues) -> "CompactSeries":
+        """Convert historical values, the channel descriptors are shared between records."""
+        return cls(
+            values.pvSystemId,
+            values.deviceId,
+            list(map(CompactRecord.from_model, values.data or ())),
+        )
+
+    @classmethod
+    def from_aggr_data(cls, aggr_data: PvSystemAggrDataV2) -> "CompactSeries":
+        return cls(
+            aggr_data.pvSystemId,
+            getattr(aggr_data, "deviceId", None),
+            list(map(CompactRecord.from_model, aggr_data.data or ())),
+        )
+
+    def to_hist_values(self) -> HistoricalValues:
+        data = [record.to_historical_data() for record in self.data or ()]
+        return HistoricalValues(
+            pvSystemId=self.pvSystemId,
+            deviceId=self.deviceId,
+            data=data,
+            links=PagingLinks(totalItemsCount=len(data)),
+            totalDataCount=len(data),
+        )
+
+    def to_aggr_data(self, pv_system_id: str | None = None) -> PvSystemAggrDataV2:
+        """
+        Convert to aggregated v2 data, DeviceAggrDataV2 for a device's series.
+
+        :param pv_system_id (optional): PV system id of the result, required
+            when the series has none, e.g. one converted from historical values
+        """
+        pv_system_id = pv_system_id or self.pvSystemId
+        if pv_system_id is None:
+            raise ValueError(
+                "Aggregated v2 data requires a pvSystemId, the series has none "
+                "so pass pv_system_id"
+            )
+        data = [record.to_aggr_data() for record in self.data or ()]
+        if self.deviceId is not None:
+            return DeviceAggrDataV2(
+                pvSystemId=pv_system_id, deviceId=self.deviceId, data=data
+            )
+        return PvSystemAggrDataV2(pvSystemId=pv_system_id, data=data)
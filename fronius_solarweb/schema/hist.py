@@ -19,6 +19,8 @@ class HistoricalChannel(BaseModel):
     value: Optional[float] = None
     isActive: Optional[bool] = None
     isDamaged: Optional[bool] = None
+    # device the value belongs to, only set in data merged from several devices
+    deviceId: Optional[str] = None
 
 
 class HistoricalData(BaseModel):
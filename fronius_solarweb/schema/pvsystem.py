@@ -64,3 +64,7 @@ class PvSystemAggrDataV2(BaseModel):
     pvSystemId: str
     data: Optional[list[AggrData]] = None
     links: Optional[Links] = None
+
+
+class DeviceAggrDataV2(PvSystemAggrDataV2):
+    deviceId: Optional[str] = None
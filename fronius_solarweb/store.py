@@ -0,0 +1,291 @@
+from datetime import datetime, timedelta, timezone
+import logging
+import sqlite3
+from typing import Iterable, List, Optional
+
+from .api import Fronius_Solarweb
+from .backfill import DEFAULT_SETTLE_LAG, HistoricalBackfill
+from .columnar import _parse_log_datetime, _to_float
+from .schema.hist import HistoricalChannel, HistoricalData, HistoricalValues
+from .schema.pvsystem import AggrData, Channel, PvSystemAggrDataV2
+
+_LOGGER = logging.getLogger(__name__)
+INSERT_BATCH = 5000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hist (
+    pv_system_id TEXT NOT NULL,
+    device_id TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    ts TEXT NOT NULL,
+    log_datetime TEXT,
+    log_duration INTEGER,
+    value REAL,
+    unit TEXT,
+    channel_type TEXT,
+    is_active INTEGER,
+    is_damaged INTEGER,
+    PRIMARY KEY (pv_system_id, device_id, channel, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS aggr (
+    pv_system_id TEXT NOT NULL,
+    period TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    log_datetime TEXT NOT NULL,
+    value REAL,
+    unit TEXT,
+    channel_type TEXT,
+    PRIMARY KEY (pv_system_id, period, channel, log_datetime)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS watermark (
+    pv_system_id TEXT NOT NULL,
+    device_id TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    ts TEXT NOT NULL,
+    PRIMARY KEY (pv_system_id, device_id, channel)
+) WITHOUT ROWID;
+"""
+
+
+def _ts(log_datetime: Optional[str]) -> Optional[str]:
+    parsed = _parse_log_datetime(log_datetime)
+    return parsed.isoformat(timespec="seconds") if parsed else None
+
+
+def _utc(value: datetime) -> datetime:
+    """Return a datetime as naive UTC like the stored timestamps, naive values are taken as UTC."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class HistoryStore:
+    def __init__(self, path: str = ":memory:"):
+        """
+        Local SQLite store of historical and aggregated data.
+
+        Historical data is keyed by PV system, device and channel with a high
+        water mark per series, so sync() only requests data logged since the
+        last sync. Timestamps are stored as naive UTC, timezone aware
+        datetimes passed in are converted and naive ones are taken as UTC.
+
+        :param path: SQLite database file, defaults to an in memory database
+        """
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.executescript(_SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    def add_hist(
+        self,
+        pv_system_id: str,
+        records: Iterable[HistoricalData],
+        device_id: str | None = None,
+    ) -> int:
+        """Store historical data records, returns the number of channel values written."""
+        rows = []
+        for record in records:
+            ts = _ts(record.logDateTime)
+            if ts is None:
+                continue
+            for channel in record.channels or []:
+                rows.append(
+                    (
+                        pv_system_id,
+                        device_id or "",
+                        channel.channelName or "",
+                        ts,
+                        record.logDateTime,
+                        record.logDuration,
+                        channel.value,
+                        channel.unit,
+                        channel.channelType,
+                        channel.isActive,
+                        channel.isDamaged,
+                    )
+                )
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO hist VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    def add_hist_values(self, values: HistoricalValues) -> int:
+        return self.add_hist(values.pvSystemId, values.data or [], values.deviceId)
+
+    def add_aggr(self, aggr_data: PvSystemAggrDataV2, period: str) -> int:
+        """Store aggregated v2 data requested for the given period."""
+        rows = [
+            (
+                aggr_data.pvSystemId,
+                period,
+                channel.channelName or "",
+                aggr.logDateTime or "",
+                _to_float(channel.value),
+                channel.unit,
+                channel.channelType,
+            )
+            for aggr in aggr_data.data or []
+            for channel in aggr.channels or []
+        ]
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO aggr VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+        return len(rows)
+
+    def high_water_mark(
+        self,
+        pv_system_id: str,
+        device_id: str | None = None,
+        channel: str | None = None,
+    ) -> Optional[datetime]:
+        """Return the naive UTC time a series is synced up to, None if never synced."""
+        row = self._db.execute(
+            "SELECT ts FROM watermark WHERE pv_system_id = ? AND device_id = ? AND channel = ?",
+            (pv_system_id, device_id or "", channel or ""),
+        ).fetchone()
+        return datetime.fromisoformat(row[0]) if row else None
+
+    def _set_high_water_mark(
+        self, pv_system_id: str, device_id: str | None, channel: str | None, ts: str
+    ):
+        with self._db:
+            self._db.execute(
+                "INSERT INTO watermark VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(pv_system_id, device_id, channel) DO UPDATE "
+                "SET ts = max(ts, excluded.ts)",
+                (pv_system_id, device_id or "", channel or "", ts),
+            )
+
+    def query_hist(
+        self,
+        pv_system_id: str,
+        start: datetime,
+        end: datetime,
+        channels: List[str] | None = None,
+        device_id: str | None = None,
+    ) -> List[HistoricalData]:
+        """Return the stored historical data logged from start up to and including end."""
+        sql = (
+            "SELECT ts, log_datetime, log_duration, channel, channel_type, unit, value, "
+            "is_active, is_damaged FROM hist WHERE pv_system_id = ? AND device_id = ? "
+            "AND ts >= ? AND ts <= ?"
+        )
+        params = [
+            pv_system_id,
+            device_id or "",
+            _utc(start).isoformat(timespec="seconds"),
+            _utc(end).isoformat(timespec="seconds"),
+        ]
+        if channels:
+            sql += f" AND channel IN ({', '.join('?' * len(channels))})"
+            params += channels
+        records: List[HistoricalData] = []
+        last_ts = None
+        for row in self._db.execute(sql + " ORDER BY ts, channel", params):
+            if row[0] != last_ts:
+                last_ts = row[0]
+                records.append(
+                    HistoricalData(logDateTime=row[1], logDuration=row[2], channels=[])
+                )
+            records[-1].channels.append(
+                HistoricalChannel(
+                    channelName=row[3],
+                    channelType=row[4],
+                    unit=row[5],
+                    value=row[6],
+                    isActive=None if row[7] is None else bool(row[7]),
+                    isDamaged=None if row[8] is None else bool(row[8]),
+                )
+            )
+        return records
+
+    def query_aggr(
+        self, pv_system_id: str, period: str, channels: List[str] | None = None
+    ) -> List[AggrData]:
+        """Return the stored aggregated v2 data for a period."""
+        sql = (
+            "SELECT log_datetime, channel, channel_type, unit, value FROM aggr "
+            "WHERE pv_system_id = ? AND period = ?"
+        )
+        params = [pv_system_id, period]
+        if channels:
+            sql += f" AND channel IN ({', '.join('?' * len(channels))})"
+            params += channels
+        records: List[AggrData] = []
+        for row in self._db.execute(sql + " ORDER BY log_datetime, channel", params):
+            if not records or records[-1].logDateTime != row[0]:
+                records.append(AggrData(logDateTime=row[0], channels=[]))
+            records[-1].channels.append(
+                Channel(
+                    channelName=row[1], channelType=row[2], unit=row[3], value=row[4]
+                )
+            )
+        return records
+
+    async def sync(
+        self,
+        client: Fronius_Solarweb,
+        start: datetime,
+        end: datetime | None = None,
+        channel: str | None = None,
+        settle_lag: timedelta = DEFAULT_SETTLE_LAG,
+        **backfill_kwargs,
+    ) -> int:
+        """
+        Fetch the historical data missing from the store and add it.
+
+        Only the period after the series' high water mark is requested, or
+        from start for a series never synced before. The mark advances to
+        the last record stored, and to the end of windows without data once
+        they ended settle_lag before now, so records uploaded late are still
+        fetched by the next sync.
+
+        :param client: Fronius_Solarweb client bound to the PV system
+        :param start: start of the series when it was never synced
+        :param end (optional): end of the period to sync, defaults to now (UTC)
+        :param channel (optional): channel name passed to the histdata call
+        :param settle_lag: time the datalogger may take to upload records
+        :param backfill_kwargs: passed to HistoricalBackfill, e.g. max_concurrency
+        """
+        pv_system_id = client.pv_system_id
+        start = _utc(start)
+        now = _utc(datetime.now(timezone.utc).replace(microsecond=0))
+        end = _utc(end or now)
+        high_water_mark = self.high_water_mark(pv_system_id, channel=channel)
+        if high_water_mark is not None:
+            start = max(start, high_water_mark + timedelta(seconds=1))
+        if start >= end:
+            return 0
+        _LOGGER.debug(f"Syncing historical data for {pv_system_id} {start} - {end}")
+        written = 0
+        pending: List[HistoricalData] = []
+
+        def flush(checkpoint: datetime | None = None):
+            nonlocal written
+            if not pending and checkpoint is None:
+                return
+            written += self.add_hist(pv_system_id, pending)
+            marks = [_ts(record.logDateTime) for record in pending]
+            if checkpoint is not None and checkpoint <= now - settle_lag:
+                # the whole window is fetched and settled, even if nothing was
+                # logged in it
+                marks.append(checkpoint.isoformat(timespec="seconds"))
+            latest = max(filter(None, marks), default=None)
+            if latest is not None:
+                self._set_high_water_mark(pv_system_id, None, channel, latest)
+            pending.clear()
+
+        backfill = HistoricalBackfill(
+            client, start, end, channel, on_checkpoint=flush, **backfill_kwargs
+        )
+        async for record in backfill:
+            pending.append(record)
+            if len(pending) >= INSERT_BATCH:
+                flush()
+        flush()
+        return written
@@ -0,0 +1,97 @@
+import json
+from typing import Any, AsyncIterator, Dict
+
+_WHITESPACE = " \t\n\r"
+_NUMBER_CHARS = "0123456789.eE+-"
+_decoder = json.JSONDecoder()
+
+
+class StreamedObject:
+    def __init__(self, chunks: AsyncIterator[str], array_key: str):
+        """
+        Incrementally parse a JSON object yielding the items of one of its arrays.
+
+        Only the item being decoded is held in memory. The other members of
+        the object are collected in fields, which is complete once the
+        iteration has finished.
+
+        :param chunks: decoded text of the JSON document, e.g. response.aiter_text()
+        :param array_key: key of the top level array whose items are yielded
+        """
+        self.chunks = chunks
+        self.array_key = array_key
+        self.fields: Dict[str, Any] = {}
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    async def _fill(self) -> bool:
+        """Read the next chunk into the buffer, False at the end of the document."""
+        if self._eof:
+            return False
+        try:
+            chunk = await self.chunks.__anext__()
+        except StopAsyncIteration:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    async def _next_char(self) -> str:
+        """Skip whitespace and return the next character without consuming it."""
+        while True:
+            while self._pos < len(self._buffer):
+                if self._buffer[self._pos] not in _WHITESPACE:
+                    return self._buffer[self._pos]
+                self._pos += 1
+            if not await self._fill():
+                raise ValueError("Unexpected end of JSON document")
+
+    async def _expect(self, *chars: str) -> str:
+        char = await self._next_char()
+        if char not in chars:
+            raise ValueError(f"Expected one of {chars} at {self._pos}, got {char!r}")
+        self._pos += 1
+        return char
+
+    async def _value(self) -> Any:
+        await self._next_char()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not await self._fill():
+                    raise
+                continue
+            # a number at the end of the buffer may continue in the next chunk
+            if (
+                isinstance(value, (int, float))
+                and (end == len(self._buffer) or self._buffer[end] in _NUMBER_CHARS)
+                and await self._fill()
+            ):
+                continue
+            self._pos = end
+            return value
+
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        await self._expect("{")
+        if await self._next_char() == "}":
+            return
+        while True:
+            key = await self._value()
+            await self._expect(":")
+            if key == self.array_key and await self._next_char() == "[":
+                self._pos += 1
+                if await self._next_char() == "]":
+                    self._pos += 1
+                else:
+                    while True:
+                        yield await self._value()
+                        if await self._expect(",", "]") == "]":
+                            break
+                self.fields[key] = None
+            else:
+                self.fields[key] = await self._value()
+            if await self._expect(",", "}") == "}":
+                return
@@ -0,0 +1,109 @@
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime
+import logging
+from typing import AsyncIterator, Dict, Optional
+
+from .api import Fronius_Solarweb
+from .schema.pvsystem import PvSystemFlowData
+
+_LOGGER = logging.getLogger(__name__)
+DEFAULT_MIN_INTERVAL = 10
+DEFAULT_MAX_INTERVAL = 300
+DEFAULT_OFFLINE_INTERVAL = 900
+
+
+@dataclass
+class FlowDelta:
+    pvSystemId: str
+    logDateTime: Optional[datetime]
+    isOnline: Optional[bool]
+    # channelName -> new value, for the channels changed since the last delta
+    channels: Dict[str, float | str | None] = field(default_factory=dict)
+
+
+class FlowSubscription:
+    def __init__(
+        self,
+        client: Fronius_Solarweb,
+        min_interval: float = DEFAULT_MIN_INTERVAL,
+        max_interval: float = DEFAULT_MAX_INTERVAL,
+        offline_interval: float = DEFAULT_OFFLINE_INTERVAL,
+        backoff: float = 2.0,
+        tolerance: float = 0.0,
+        tz: str = "zulu",
+    ):
+        """
+        Poll the flow data of a PV system and yield only the channels that changed.
+
+        While values change the system is polled every min_interval seconds,
+        each poll without changes multiplies the interval by backoff up to
+        max_interval, so quiet periods such as the night are polled rarely. An
+        offline system is polled every offline_interval seconds.
+
+        :param client: Fronius_Solarweb client bound to the PV system
+        :param min_interval: seconds between polls while values change
+        :param max_interval: longest seconds between polls while online
+        :param offline_interval: seconds between polls while offline
+        :param backoff: factor the interval grows by after a poll without changes
+        :param tolerance: numeric changes up to this size are ignored
+        :param tz: timezone passed to get_system_flow_data
+        """
+        if not 0 < min_interval <= max_interval:
+            raise ValueError("intervals must satisfy 0 < min_interval <= max_interval")
+        self.client = client
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.offline_interval = offline_interval
+        self.backoff = backoff
+        self.tolerance = tolerance
+        self.tz = tz
+        self.interval = min_interval
+        self._values: Dict[str, float | str | None] = {}
+        self._online: Optional[bool] = None
+
+    def _changed(self, old, new) -> bool:
+        if isinstance(old, float) and isinstance(new, float):
+            return abs(new - old) > self.tolerance
+        return old != new
+
+    def diff(self, flow_data: PvSystemFlowData) -> Optional[FlowDelta]:
+        """Return the delta to the previous flow data, None if nothing changed."""
+        is_online = flow_data.status.isOnline if flow_data.status else None
+        data = flow_data.data
+        delta = FlowDelta(
+            pvSystemId=flow_data.pvSystemId,
+            logDateTime=data.logDateTime if data else None,
+            isOnline=is_online,
+        )
+        for channel in (data.channels if data else None) or []:
+            name = channel.channelName
+            if name not in self._values or self._changed(
+                self._values[name], channel.value
+            ):
+                self._values[name] = channel.value
+                delta.channels[name] = channel.value
+        status_changed = is_online != self._online
+        self._online = is_online
+        if not delta.channels and not status_changed:
+            return None
+        return delta
+
+    def _next_interval(self, delta: Optional[FlowDelta]) -> float:
+        if self._online is False:
+            return self.offline_interval
+        if delta is not None and delta.channels:
+            return self.min_interval
+        return min(self.interval * self.backoff, self.max_interval)
+
+    async def __aiter__(self) -> AsyncIterator[FlowDelta]:
+        while True:
+            flow_data = await self.client.get_system_flow_data(self.tz)
+            delta = self.diff(flow_data)
+            self.interval = self._next_interval(delta)
+            if delta is not None:
+                yield delta
+            _LOGGER.debug(
+                f"Next flow data poll for {self.client.pv_system_id} in {self.interval}s"
+            )
+            await asyncio.sleep(self.interval)
@@ -0,0 +1,182 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import functools
+import inspect
+import pickle
+import threading
+from typing import Any, AsyncIterator, Iterable, Iterator, List
+
+from .api import Fronius_Solarweb
+from .fleet import Fronius_Solarweb_Fleet
+
+DEFAULT_SHARD_SIZE = 100
+
+
+class _LoopThread:
+    """Event loop running in a daemon thread, coroutines are submitted from other threads."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self.loop.run_forever, name="fronius_solarweb", daemon=True
+        )
+        self._thread.start()
+
+    def run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def iterate(self, async_iterator: AsyncIterator) -> Iterator:
+        try:
+            while True:
+                try:
+                    yield self.run(async_iterator.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            # the consumer stopped early, let the iterator release its response
+            aclose = getattr(async_iterator, "aclose", None)
+            if aclose is not None and self.loop.is_running():
+                self.run(aclose())
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+
+class Fronius_Solarweb_Sync:
+    def __init__(self, **kwargs):
+        """
+        Synchronous Fronius Solarweb API client.
+
+        The getters of Fronius_Solarweb are available as blocking methods, they
+        run on one event loop kept alive in a background thread so the
+        connection pool is reused between calls. The iter_* and stream_*
+        methods return ordinary iterators.
+
+        :param kwargs: passed to Fronius_Solarweb
+        """
+        self._loop_thread = _LoopThread()
+        self.client: Fronius_Solarweb = self._loop_thread.run(
+            self._create_client(kwargs)
+        )
+
+    @staticmethod
+    async def _create_client(kwargs: dict) -> Fronius_Solarweb:
+        # created on the background loop so the httpx client is bound to it
+        return Fronius_Solarweb(**kwargs)
+
+    def __getattr__(self, name: str):
+        attribute = getattr(self.client, name)
+        if inspect.iscoroutinefunction(attribute):
+
+            @functools.wraps(attribute)
+            def call(*args, **kwargs):
+                return self._loop_thread.run(attribute(*args, **kwargs))
+
+            return call
+        if callable(attribute):
+
+            @functools.wraps(attribute)
+            def call_or_iterate(*args, **kwargs):
+                # async generators and methods returning one, e.g. stream_hist_data
+                result = attribute(*args, **kwargs)
+                if isinstance(result, AsyncIterator):
+                    return self._loop_thread.iterate(result)
+                return result
+
+            return call_or_iterate
+        return attribute
+
+    def close(self):
+        self._loop_thread.run(self.client.httpx_client.aclose())
+        self._loop_thread.stop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# state of a bulk_run worker process
+_worker_loop: _LoopThread | None = None
+_worker_fleet: Fronius_Solarweb_Fleet | None = None
+
+
+def _init_worker(fleet_kwargs: dict):
+    global _worker_loop, _worker_fleet  # pylint: disable=global-statement
+    _worker_loop = _LoopThread()
+
+    async def create():
+        fleet = Fronius_Solarweb_Fleet(**fleet_kwargs)
+        if fleet_kwargs.get("login_name"):
+            await fleet.login()
+        return fleet
+
+    _worker_fleet = _worker_loop.run(create())
+
+
+def _picklable(result: Any) -> Any:
+    if isinstance(result, Exception):
+        try:
+            pickle.dumps(result)
+        except Exception:  # pylint: disable=broad-except
+            return RuntimeError(repr(result))
+    return result
+
+
+def _run_shard(method: str, pv_system_ids: List[str], args: tuple, kwargs: dict):
+    async def run():
+        return [
+            (pv_system_id, _picklable(result))
+            async for pv_system_id, result in _worker_fleet.iter_results(
+                method, *args, pv_system_ids=pv_system_ids, **kwargs
+            )
+        ]
+
+    return _worker_loop.run(run())
+
+
+def bulk_run(
+    method: str,
+    pv_system_ids: Iterable[str],
+    *args,
+    processes: int | None = None,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    fleet_kwargs: dict | None = None,
+    **kwargs,
+) -> Iterator[tuple[str, Any]]:
+    """
+    Call a Fronius_Solarweb getter for many PV systems across a pool of processes.
+
+    The PV systems are split into shards of shard_size, every worker process
+    keeps its own Fronius_Solarweb_Fleet (and connection pool) and polls its
+    shards concurrently, so decoding and validation scale past one core.
+    Yields (pv_system_id, result) tuples as shards complete, exceptions are
+    yielded as the result of their PV system.
+
+    :param method: name of the Fronius_Solarweb getter, e.g. "get_hist_data"
+    :param pv_system_ids: PV systems to poll
+    :param args: positional arguments passed to the getter
+    :param processes (optional): number of worker processes, defaults to the CPU count
+    :param shard_size: number of PV systems sent to a worker at once
+    :param fleet_kwargs (optional): credentials and options passed to
+        Fronius_Solarweb_Fleet in each worker
+    :param kwargs: keyword arguments passed to the getter
+    """
+    pv_system_ids = list(pv_system_ids)
+    shards = [
+        pv_system_ids[i : i + shard_size]
+        for i in range(0, len(pv_system_ids), shard_size)
+    ]
+    with ProcessPoolExecutor(
+        max_workers=processes,
+        initializer=_init_worker,
+        initargs=(fleet_kwargs or {},),
+    ) as executor:
+        futures = [
+            executor.submit(_run_shard, method, shard, args, kwargs) for shard in shards
+        ]
+        for future in as_completed(futures):
+            yield from future.result()
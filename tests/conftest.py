@@ -0,0 +1,13 @@
+import pytest
+from tenacity import wait_none
+
+from fronius_solarweb.api import Fronius_Solarweb
+
+
+@pytest.fixture
+def no_retry_wait(monkeypatch):
+    """Retry the getters immediately instead of backing off."""
+    for name in dir(Fronius_Solarweb):
+        retrying = getattr(getattr(Fronius_Solarweb, name), "retry", None)
+        if retrying is not None:
+            monkeypatch.setattr(retrying, "wait", wait_none())
@@ -0,0 +1,124 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from benchmarks.mock_server import MockSolarweb
+from fronius_solarweb.analytics import find_gaps, integrate, resample, rollup
+from fronius_solarweb.api import Fronius_Solarweb
+from fronius_solarweb.columnar import ColumnarSeries
+
+# numpy is an optional dependency
+np = pytest.importorskip("numpy")
+
+
+@pytest.fixture(scope="module")
+def series() -> ColumnarSeries:
+    client = Fronius_Solarweb("a", "b", "pv", httpx_client=MockSolarweb().client())
+    # PowerPV is i W at the i-th five minute point of the day
+    return asyncio.run(
+        client.get_hist_data_columns(datetime(2023, 1, 1), datetime(2023, 1, 2))
+    )
+
+
+def _series(points: list, unit: str = "W") -> ColumnarSeries:
+    return ColumnarSeries.from_json(
+        {
+            "pvSystemId": "pv",
+            "data": [
+                {
+                    "logDateTime": log_date_time,
+                    "logDuration": 300,
+                    "channels": [
+                        {
+                            "channelName": "Power",
+                            "unit": unit,
+                            "value": value,
+                            "isDamaged": damaged,
+                        }
+                    ],
+                }
+                for log_date_time, value, damaged in points
+            ],
+        }
+    )
+
+
+def test_resample_hours(series):
+    hours = resample(series, "hour")
+    assert len(hours) == 24
+    assert hours.timestamps[1] == np.datetime64("2023-01-01T01:00:00")
+    np.testing.assert_allclose(
+        hours.channels["PowerPV"].values, np.arange(24) * 12 + 5.5
+    )
+    assert hours.durations[0] == 3600
+    maxima = resample(series, "hour", how={"PowerPV": "max"})
+    assert maxima.channels["PowerPV"].values[0] == 11
+
+
+def test_resample_aligns_to_local_days(series):
+    days = resample(series, "day", utc_offset=timedelta(hours=12))
+    assert list(days.timestamps) == [
+        np.datetime64("2022-12-31T12:00:00"),
+        np.datetime64("2023-01-01T12:00:00"),
+    ]
+
+
+def test_damaged_points_are_skipped():
+    hourly = resample(
+        _series(
+            [
+                ("2023-01-01T00:00:00Z", 10.0, False),
+                ("2023-01-01T00:05:00Z", 1e6, True),
+                ("2023-01-01T01:00:00Z", 5.0, True),
+            ]
+        ),
+        "hour",
+    )
+    assert hourly.channels["Power"].values[0] == 10.0
+    # an hour without any valid value is NaN
+    assert np.isnan(hourly.channels["Power"].values[1])
+
+
+def test_integrate_power_to_energy(series):
+    energy = integrate(series, "PowerPV")
+    assert energy.unit == "Wh"
+    daily = resample(
+        ColumnarSeries(
+            "pv", None, series.timestamps, series.durations, {"Energy": energy}
+        ),
+        "day",
+    )
+    # sum of i W over 5 minutes each, in Wh
+    assert daily.channels["Energy"].values[0] == pytest.approx(287 * 288 / 2 / 12)
+    with pytest.raises(ValueError):
+        integrate(series, "BattSOC")
+
+
+def test_find_gaps():
+    gaps = find_gaps(
+        _series(
+            [
+                ("2023-01-01T00:00:00Z", 1.0, False),
+                ("2023-01-01T00:05:00Z", 1.0, False),
+                ("2023-01-01T00:30:00Z", 1.0, False),
+            ]
+        )
+    )
+    assert gaps == [
+        (np.datetime64("2023-01-01T00:10:00"), np.datetime64("2023-01-01T00:30:00"))
+    ]
+
+
+def test_rollup_converts_units_and_adds_sites():
+    watts = _series([("2023-01-01T00:00:00Z", 500.0, False)])
+    kilowatts = _series(
+        [
+            ("2023-01-01T00:00:00Z", 1.5, False),
+            ("2023-01-02T00:00:00Z", 2.0, False),
+        ],
+        unit="kW",
+    )
+    total = rollup([watts, kilowatts], "day")
+    assert total.channels["Power"].unit == "W"
+    np.testing.assert_allclose(total.channels["Power"].values, [2000.0, 2000.0])
@@ -0,0 +1,83 @@
+import asyncio
+import base64
+import json
+import time
+
+import pytest
+
+from benchmarks.mock_server import MockSolarweb
+from fronius_solarweb.api import Fronius_Solarweb
+from fronius_solarweb.auth import jwt_expiry
+from fronius_solarweb.errors import NotAuthorizedException
+
+
+def _client(mock) -> Fronius_Solarweb:
+    return Fronius_Solarweb(
+        "a",
+        "b",
+        "pv",
+        httpx_client=mock.client(),
+        login_name="user",
+        login_password="secret",
+    )
+
+
+def test_jwt_expiry():
+    payload = base64.urlsafe_b64encode(json.dumps({"exp": 1700000000}).encode())
+    assert jwt_expiry(f"e30.{payload.decode().rstrip('=')}.sig") == 1700000000
+    assert jwt_expiry("not a token") is None
+    assert jwt_expiry(None) is None
+
+
+def test_token_is_refreshed_ahead_of_expiry():
+    mock = MockSolarweb(token_lifetime=60)
+    client = _client(mock)
+
+    async def query():
+        await client.login()
+        # the token expires within the refresh margin
+        assert client.token_manager.needs_refresh()
+        await client.get_system_flow_data()
+
+    asyncio.run(query())
+    assert (mock.logins, mock.refreshes) == (1, 1)
+    assert client.token_manager.expires == pytest.approx(time.time() + 60, abs=5)
+
+
+def test_rejected_token_is_refreshed_and_request_replayed():
+    mock = MockSolarweb(latency=0.01)
+    client = _client(mock)
+
+    async def query():
+        await client.login()
+        mock.revoke_tokens()
+        return await asyncio.gather(*(client.get_system_flow_data() for _ in range(5)))
+
+    results = asyncio.run(query())
+    assert all(result.pvSystemId == "pv" for result in results)
+    # concurrent 401s share one refresh
+    assert (mock.logins, mock.refreshes) == (1, 1)
+
+
+def test_rejected_refresh_token_logs_in_again():
+    mock = MockSolarweb()
+    client = _client(mock)
+
+    async def query():
+        await client.login()
+        mock.revoke_tokens(refresh_tokens=True)
+        return await client.get_system_flow_data()
+
+    assert asyncio.run(query()).pvSystemId == "pv"
+    assert (mock.logins, mock.refreshes) == (2, 0)
+
+
+def test_token_that_cant_be_renewed_raises():
+    mock = MockSolarweb()
+    client = Fronius_Solarweb("a", "b", "pv", httpx_client=mock.client())
+    # a token obtained elsewhere, without a refresh token or login to renew it
+    client.set_jwt_data({"jwtToken": "revoked"})
+
+    with pytest.raises(NotAuthorizedException):
+        asyncio.run(client.get_system_flow_data())
+    assert mock.requests == 1
@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from benchmarks.mock_server import MockSolarweb
+from fronius_solarweb.api import Fronius_Solarweb
+from fronius_solarweb.cache import MemoryCache
+
+
+@pytest.fixture
+def mock():
+    return MockSolarweb(latency=0.05)
+
+
+def _client(mock, **kwargs) -> Fronius_Solarweb:
+    return Fronius_Solarweb(
+        "a", "b", "pv", httpx_client=mock.client(), cache=MemoryCache(), **kwargs
+    )
+
+
+def test_fresh_entries_are_served_from_cache(mock):
+    client = _client(mock)
+
+    async def query():
+        first = await client.get_pvsystem_meta_data()
+        return first, await client.get_pvsystem_meta_data()
+
+    first, second = asyncio.run(query())
+    assert second is first
+    assert mock.requests == 1
+
+
+def test_concurrent_misses_share_one_request(mock):
+    client = _client(mock)
+
+    async def query():
+        return await asyncio.gather(
+            *(client.get_pvsystem_meta_data() for _ in range(5))
+        )
+
+    results = asyncio.run(query())
+    assert all(result is results[0] for result in results)
+    assert mock.requests == 1
+
+
+def test_cancelled_caller_leaves_shared_request_running(mock):
+    client = _client(mock)
+
+    async def query():
+        first = asyncio.ensure_future(client.get_pvsystem_meta_data())
+        second = asyncio.ensure_future(client.get_pvsystem_meta_data())
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second, first.cancelled()
+
+    pv_system, cancelled = asyncio.run(query())
+    assert cancelled
+    assert pv_system.pvSystemId == "pv"
+    assert mock.requests == 1
+
+
+def test_request_is_cancelled_with_its_last_caller(mock):
+    client = _client(mock)
+
+    async def query():
+        caller = asyncio.ensure_future(client.get_pvsystem_meta_data())
+        await asyncio.sleep(0.01)
+        caller.cancel()
+        await asyncio.sleep(0)
+        assert client._in_flight == {}
+        # a later caller starts a new request
+        return await client.get_pvsystem_meta_data()
+
+    assert asyncio.run(query()).pvSystemId == "pv"
+    assert mock.requests == 2
+
+
+def test_stale_entries_are_revalidated_with_etag(mock):
+    client = _client(mock, cache_ttls={"get_pvsystem_meta_data": 0})
+
+    async def query():
+        return [await client.get_pvsystem_meta_data() for _ in range(2)]
+
+    first, second = asyncio.run(query())
+    assert second is first
+    assert mock.requests == 2
+    assert mock.not_modified == 1
+
+    mock.metadata_version += 1
+    third = asyncio.run(client.get_pvsystem_meta_data())
+    assert third is not first
+    assert mock.not_modified == 1
@@ -0,0 +1,72 @@
+import asyncio
+
+import httpx
+
+from benchmarks.mock_server import MockSolarweb
+from fronius_solarweb.api import Fronius_Solarweb
+
+
+class RecordingMock(MockSolarweb):
+    def __init__(self, **kwargs):
+        super().__init__(latency=0.05, **kwargs)
+        self.params = []
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.params.append(dict(request.url.params))
+        return await super().handle(request)
+
+
+def _client(mock, **kwargs) -> Fronius_Solarweb:
+    return Fronius_Solarweb(
+        "a", "b", "pv", httpx_client=mock.client(), coalesce_requests=True, **kwargs
+    )
+
+
+def test_identical_requests_share_one_response():
+    mock = RecordingMock()
+    client = _client(mock)
+
+    async def query():
+        return await asyncio.gather(
+            *(client.get_system_flow_data() for _ in range(5)),
+            client.get_system_flow_data(tz="local"),
+        )
+
+    *shared, local = asyncio.run(query())
+    assert all(result is shared[0] for result in shared)
+    assert local is not shared[0]
+    assert mock.requests == 2
+
+
+def test_aggr_channels_are_batched():
+    mock = RecordingMock()
+    client = _client(mock, aggr_batch_window=0.01)
+
+    async def query():
+        return await asyncio.gather(
+            client.get_system_aggr_data_v2("months", ["PowerPV"]),
+            client.get_system_aggr_data_v2("months", ["BattSOC", "PowerLoad"]),
+        )
+
+    pv, others = asyncio.run(query())
+    assert mock.requests == 1
+    assert mock.params[0]["channel"] == "BattSOC,PowerLoad,PowerPV"
+    assert {c.channelName for c in pv.data[0].channels} == {"PowerPV"}
+    assert {c.channelName for c in others.data[0].channels} == {
+        "BattSOC",
+        "PowerLoad",
+    }
+
+
+def test_aggr_periods_are_not_batched_together():
+    mock = RecordingMock()
+    client = _client(mock, aggr_batch_window=0.01)
+
+    async def query():
+        await asyncio.gather(
+            client.get_system_aggr_data_v2("months", ["PowerPV"]),
+            client.get_system_aggr_data_v2("years", ["PowerPV"]),
+        )
+
+    asyncio.run(query())
+    assert sorted(params["period"] for params in mock.params) == ["months", "years"]
@@ -0,0 +1,53 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from benchmarks.mock_server import CHANNELS, MockSolarweb
+from fronius_solarweb.api import Fronius_Solarweb
+from fronius_solarweb.schema import CompactSeries
+
+
+@pytest.fixture
+def client():
+    return Fronius_Solarweb("a", "b", "pv", httpx_client=MockSolarweb().client())
+
+
+def test_hist_values_round_trip(client):
+    hist_data = asyncio.run(
+        client.get_hist_data(datetime(2023, 1, 1), datetime(2023, 1, 2))
+    )
+    series = CompactSeries.from_hist_values(hist_data)
+    assert len(series.data) == 288
+    first, second = series.data[:2]
+    # points of a channel share one interned descriptor
+    assert first.channels[0].descriptor is second.channels[0].descriptor
+    assert first.channels[0].channelName == CHANNELS[0]
+    assert series.to_hist_values().data == hist_data.data
+
+
+def test_device_id_is_kept(client):
+    hist_data = asyncio.run(
+        client.get_devices_hist_data(
+            datetime(2023, 1, 1), datetime(2023, 1, 2), device_ids=["d-1", "d-2"]
+        )
+    )
+    series = CompactSeries.from_hist_values(hist_data)
+    assert {channel.deviceId for channel in series.data[0].channels} == {
+        "d-1",
+        "d-2",
+    }
+    assert series.to_hist_values().data == hist_data.data
+
+
+def test_aggr_data_round_trip(client):
+    aggr_data = asyncio.run(client.get_system_aggr_data_v2("months"))
+    series = CompactSeries.from_aggr_data(aggr_data)
+    assert series.to_aggr_data() == aggr_data
+
+
+def test_aggr_data_requires_pv_system_id():
+    series = CompactSeries(data=[])
+    with pytest.raises(ValueError):
+        series.to_aggr_data()
+    assert series.to_aggr_data("pv").pvSystemId == "pv"
@@ -0,0 +1,121 @@
+import asyncio
+
+import pytest
+
+from benchmarks.mock_server import MockSolarweb
+from fronius_solarweb.api import Fronius_Solarweb
+from fronius_solarweb.coordination import Coordinator, HashRing, SQLiteBackend
+
+PV_SYSTEM_IDS = [f"pv-{i}" for i in range(200)]
+
+
+@pytest.fixture
+def backends(tmp_path):
+    backends = [SQLiteBackend(str(tmp_path / "coordination.db")) for _ in range(2)]
+    yield backends
+    for backend in backends:
+        backend.close()
+
+
+def _client(mock, **kwargs) -> Fronius_Solarweb:
+    return Fronius_Solarweb(
+        "a",
+        "b",
+        "pv",
+        httpx_client=mock.client(),
+        login_name="user",
+        login_password="secret",
+        **kwargs,
+    )
+
+
+def test_sqlite_backend_keys(backends):
+    backend = backends[0]
+    backend.set("a", b"1")
+    backend.set("expired", b"2", ttl=-1)
+    assert backends[1].get("a") == b"1"
+    assert backend.get("expired") is None
+    assert backend.add("lock", b"x", ttl=30)
+    assert not backends[1].add("lock", b"y", ttl=30)
+    assert backend.add("expired", b"3", ttl=30)
+    backend.delete_prefix("a")
+    assert backend.get("a") is None
+    assert backend.get("lock") == b"x"
+
+
+def test_hash_ring_only_moves_keys_of_joining_node():
+    before = HashRing(["r1", "r2"])
+    after = HashRing(["r1", "r2", "r3"])
+    moved = [key for key in PV_SYSTEM_IDS if before.owner(key) != after.owner(key)]
+    assert moved
+    assert all(after.owner(key) == "r3" for key in moved)
+
+
+def test_replicas_share_pv_systems(backends):
+    first, second = (
+        Coordinator(backend, replica_id=f"replica-{i}")
+        for i, backend in enumerate(backends)
+    )
+
+    async def run():
+        await first.renew()
+        await second.renew()
+        await first.renew()
+        assigned = first.assigned(PV_SYSTEM_IDS), second.assigned(PV_SYSTEM_IDS)
+        await second.stop()
+        await first.renew()
+        return assigned
+
+    first_share, second_share = asyncio.run(run())
+    assert first_share and second_share
+    assert sorted(first_share + second_share) == sorted(PV_SYSTEM_IDS)
+    # the share of a replica that left is taken over
+    assert first.assigned(PV_SYSTEM_IDS) == PV_SYSTEM_IDS
+
+
+def test_replicas_share_one_token(backends):
+    mock = MockSolarweb(latency=0.01)
+    coordinators = [
+        Coordinator(backend, replica_id=f"replica-{i}")
+        for i, backend in enumerate(backends)
+    ]
+    clients = [_client(mock) for _ in coordinators]
+
+    async def run():
+        await asyncio.gather(
+            *(
+                coordinator.login(client)
+                for coordinator, client in zip(coordinators, clients)
+            )
+        )
+        assert mock.logins == 1
+        mock.revoke_tokens()
+        # the first replica refreshes, the second adopts its token
+        await clients[0].get_system_flow_data()
+        await clients[1].get_system_flow_data()
+
+    asyncio.run(run())
+    assert (mock.logins, mock.refreshes) == (1, 1)
+    assert clients[0].jwt_data == clients[1].jwt_data
+
+
+def test_replicas_share_cached_responses(backends):
+    mock = MockSolarweb()
+    coordinators = [Coordinator(backend) for backend in backends]
+    clients = [
+        Fronius_Solarweb(
+            "a",
+            "b",
+            "pv",
+            httpx_client=mock.client(),
+            cache=coordinator.shared_cache(),
+        )
+        for coordinator in coordinators
+    ]
+
+    async def run():
+        return [await client.get_pvsystem_meta_data() for client in clients]
+
+    first, second = asyncio.run(run())
+    assert first == second
+    assert mock.requests == 1
@@ -0,0 +1,52 @@
+import asyncio
+from collections import Counter
+from datetime import datetime
+
+import httpx
+
+from benchmarks.mock_server import CHANNELS, MockSolarweb
+from fronius_solarweb.api import Fronius_Solarweb
+
+START, END = datetime(2023, 1, 1), datetime(2023, 1, 2)
+
+
+class RecordingMock(MockSolarweb):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.paths = []
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.paths.append(request.url.path)
+        return await super().handle(request)
+
+
+def test_devices_are_merged_by_log_time():
+    mock = RecordingMock(hist_page_size=100)
+    client = Fronius_Solarweb("a", "b", "pv", httpx_client=mock.client())
+
+    hist_data = asyncio.run(client.get_devices_hist_data(START, END))
+    assert len(hist_data.data) == 288
+    assert hist_data.totalDataCount == 288
+    times = [record.logDateTime for record in hist_data.data]
+    assert times == sorted(times)
+    channels = hist_data.data[0].channels
+    assert Counter(channel.deviceId for channel in channels) == {
+        f"device-{i}": len(CHANNELS) for i in range(3)
+    }
+    # the device list, then every page of each device
+    assert mock.requests == 1 + 3 * 3
+
+
+def test_only_given_devices_are_requested():
+    mock = RecordingMock()
+    client = Fronius_Solarweb("a", "b", "pv", httpx_client=mock.client())
+
+    hist_data = asyncio.run(
+        client.get_devices_hist_data(
+            START, END, channels=["PowerPV"], device_ids=["device-1"]
+        )
+    )
+    assert mock.paths == ["/swqapi/pvsystems/pv/devices/device-1/histdata"]
+    assert {
+        channel.deviceId for record in hist_data.data for channel in record.channels
+    } == {"device-1"}
@@ -0,0 +1,172 @@
+import asyncio
+import csv
+from datetime import datetime, time, timedelta, timezone
+import json
+
+import httpx
+import pytest
+
+from benchmarks.mock_server import CHANNELS, MockSolarweb
+from fronius_solarweb.api import Fronius_Solarweb
+from fronius_solarweb.errors import ExportError, NotFoundException
+from fronius_solarweb.export import Exporter
+
+
+@pytest.fixture
+def mock():
+    return MockSolarweb()
+
+
+@pytest.fixture
+def client(mock):
+    return Fronius_Solarweb("a", "b", "pv", httpx_client=mock.client())
+
+
+def _rows(path) -> list:
+    with open(path, encoding="utf-8") as file:
+        return [json.loads(line) for line in file]
+
+
+def _yesterday() -> datetime:
+    today = datetime.now(timezone.utc).date()
+    return datetime.combine(today - timedelta(days=1), time())
+
+
+def test_whole_days_are_finalised_and_skipped(client, mock, tmp_path):
+    exporter = Exporter(client, tmp_path)
+    start, end = datetime(2023, 1, 1), datetime(2023, 1, 3)
+
+    written = asyncio.run(exporter.export_hist_data(["pv-0"], start, end))
+    assert written == 2 * 288 * len(CHANNELS)
+    rows = _rows(exporter.partition_path("pv-0", "2023-01-01"))
+    assert len(rows) == 288 * len(CHANNELS)
+    assert rows[0]["pvSystemId"] == "pv-0"
+
+    requests = mock.requests
+    assert asyncio.run(exporter.export_hist_data(["pv-0"], start, end)) == 0
+    assert mock.requests == requests
+
+
+def test_partial_days_are_rewritten(client, tmp_path):
+    exporter = Exporter(client, tmp_path)
+
+    asyncio.run(
+        exporter.export_hist_data(
+            ["pv-0"], datetime(2023, 1, 1, 12), datetime(2023, 1, 2)
+        )
+    )
+    partial = exporter.partition_path("pv-0", "2023-01-01", partial=True)
+    assert len(_rows(partial)) == 144 * len(CHANNELS)
+    assert not exporter.partition_path("pv-0", "2023-01-01").exists()
+
+    # a run covering the whole day replaces the partial partition
+    asyncio.run(
+        exporter.export_hist_data(["pv-0"], datetime(2023, 1, 1), datetime(2023, 1, 2))
+    )
+    assert not partial.exists()
+    assert len(_rows(exporter.partition_path("pv-0", "2023-01-01"))) == 288 * len(
+        CHANNELS
+    )
+
+
+def test_days_are_finalised_after_settle_lag(client, tmp_path):
+    yesterday = _yesterday()
+    day = yesterday.date().isoformat()
+
+    exporter = Exporter(client, tmp_path, settle_lag=timedelta(days=2))
+    asyncio.run(
+        exporter.export_hist_data(["pv-0"], yesterday, yesterday + timedelta(days=1))
+    )
+    assert exporter.partition_path("pv-0", day, partial=True).exists()
+    assert not exporter.partition_path("pv-0", day).exists()
+
+    exporter = Exporter(client, tmp_path, settle_lag=timedelta(0))
+    asyncio.run(
+        exporter.export_hist_data(["pv-0"], yesterday, yesterday + timedelta(days=1))
+    )
+    assert exporter.partition_path("pv-0", day).exists()
+    assert not exporter.partition_path("pv-0", day, partial=True).exists()
+
+
+def test_aggr_data_is_partitioned_by_period(client, tmp_path):
+    exporter = Exporter(client, tmp_path)
+
+    written = asyncio.run(exporter.export_aggr_data_v2(["pv-0"], "months"))
+    assert written == 12 * len(CHANNELS)
+    rows = _rows(exporter.partition_path("pv-0", "2023-05"))
+    assert {row["logDateTime"] for row in rows} == {"2023-05"}
+    assert len(rows) == len(CHANNELS)
+
+    # ended months are finalised and skipped
+    assert asyncio.run(exporter.export_aggr_data_v2(["pv-0"], "months")) == 0
+
+
+def test_aggr_periods_in_progress_are_rewritten(client, tmp_path):
+    exporter = Exporter(client, tmp_path, settle_lag=timedelta(days=100 * 365))
+
+    assert asyncio.run(exporter.export_aggr_data_v2(["pv-0"], "months")) > 0
+    assert exporter.partition_path("pv-0", "2023-12", partial=True).exists()
+    assert not exporter.partition_path("pv-0", "2023-12").exists()
+    assert asyncio.run(exporter.export_aggr_data_v2(["pv-0"], "months")) > 0
+
+
+def test_aggr_total_is_always_rewritten(client, tmp_path):
+    exporter = Exporter(client, tmp_path)
+
+    first = asyncio.run(exporter.export_aggr_data_v2(["pv-0"], "total"))
+    assert exporter.partition_path("pv-0", "total", partial=True).exists()
+    assert not exporter.partition_path("pv-0", "total").exists()
+    assert asyncio.run(exporter.export_aggr_data_v2(["pv-0"], "total")) == first
+
+
+def test_csv_export(client, tmp_path):
+    exporter = Exporter(client, tmp_path, format="csv", batch_size=100)
+
+    asyncio.run(
+        exporter.export_hist_data(["pv-0"], datetime(2023, 1, 1), datetime(2023, 1, 2))
+    )
+    path = exporter.partition_path("pv-0", "2023-01-01")
+    with open(path, encoding="utf-8", newline="") as file:
+        rows = list(csv.DictReader(file))
+    assert len(rows) == 288 * len(CHANNELS)
+    assert rows[-1]["logDateTime"] == "2023-01-01T23:55:00Z"
+
+
+def test_parquet_export(client, tmp_path):
+    parquet = pytest.importorskip("pyarrow.parquet")
+    exporter = Exporter(client, tmp_path, format="parquet", batch_size=500)
+
+    asyncio.run(
+        exporter.export_hist_data(["pv-0"], datetime(2023, 1, 1), datetime(2023, 1, 2))
+    )
+    table = parquet.read_table(exporter.partition_path("pv-0", "2023-01-01"))
+    assert table.num_rows == 288 * len(CHANNELS)
+    assert str(table.schema.field("value").type) == "double"
+
+
+def test_failed_pv_systems_are_reported(tmp_path):
+    mock = MockSolarweb()
+
+    async def handle(request: httpx.Request) -> httpx.Response:
+        if "/pvsystems/missing/" in request.url.path:
+            return httpx.Response(404)
+        return await mock.handle(request)
+
+    client = Fronius_Solarweb(
+        "a",
+        "b",
+        "pv",
+        httpx_client=httpx.AsyncClient(transport=httpx.MockTransport(handle)),
+    )
+    exporter = Exporter(client, tmp_path)
+
+    with pytest.raises(ExportError) as error:
+        asyncio.run(
+            exporter.export_hist_data(
+                ["pv-0", "missing"], datetime(2023, 1, 1), datetime(2023, 1, 2)
+            )
+        )
+    assert list(error.value.errors) == ["missing"]
+    assert isinstance(error.value.errors["missing"], NotFoundException)
+    # the partitions of the other PV systems are kept
+    assert exporter.partition_path("pv-0", "2023-01-01").exists()
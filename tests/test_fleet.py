@@ -0,0 +1,13 @@
+import asyncio
+
+from benchmarks.mock_server import MockSolarweb
+from fronius_solarweb.fleet import Fronius_Solarweb_Fleet
+
+
+def test_discover_reads_every_page():
+    mock = MockSolarweb(pv_systems=25, pv_system_page_size=10)
+    fleet = Fronius_Solarweb_Fleet("a", "b", httpx_client=mock.client())
+
+    pv_system_ids = asyncio.run(fleet.discover())
+    assert pv_system_ids == [f"pv-{i}" for i in range(25)]
+    assert mock.requests == 3
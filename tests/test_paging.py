@@ -0,0 +1,40 @@
+import asyncio
+from contextlib import aclosing
+from datetime import datetime
+
+from benchmarks.mock_server import MockSolarweb
+from fronius_solarweb.api import Fronius_Solarweb
+
+START, END = datetime(2023, 1, 1), datetime(2023, 1, 2)
+
+
+def test_iter_hist_data_follows_every_page():
+    mock = MockSolarweb(hist_page_size=100)
+    client = Fronius_Solarweb("a", "b", "pv", httpx_client=mock.client())
+
+    async def query():
+        return [record async for record in client.iter_hist_data(START, END)]
+
+    records = asyncio.run(query())
+    assert len(records) == 288
+    assert records[0].logDateTime == "2023-01-01T00:00:00Z"
+    assert records[-1].logDateTime == "2023-01-01T23:55:00Z"
+    # no page is requested past the last one
+    assert mock.requests == 3
+
+
+def test_next_page_is_prefetched_and_cancelled_on_early_stop():
+    mock = MockSolarweb(latency=0.05, hist_page_size=100)
+    client = Fronius_Solarweb("a", "b", "pv", httpx_client=mock.client())
+
+    async def query():
+        async with aclosing(client.iter_hist_data(START, END)) as records:
+            async for _ in records:
+                await asyncio.sleep(0.01)
+                # the second page is requested while the first is processed
+                assert mock.requests == 2
+                break
+        await asyncio.sleep(0.1)
+
+    asyncio.run(query())
+    assert mock.requests == 2
@@ -0,0 +1,172 @@
+import asyncio
+from datetime import date
+
+import httpx
+import pytest
+
+from fronius_solarweb.api import Fronius_Solarweb
+from fronius_solarweb.planner import AggrPlanner, _bounds, period_key, period_keys
+
+
+class AggrServer:
+    """Answers aggregated v2 requests with one Wh per day of each period."""
+
+    def __init__(self):
+        self.requests = []
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        params = request.url.params
+        period = params["period"]
+        self.requests.append((period, params.get("from"), params.get("to")))
+        if period == "total":
+            keys = [None]
+        else:
+            keys = period_keys(
+                period, _bounds(params["from"])[0], _bounds(params["to"])[1]
+            )
+        data = [
+            {
+                "logDateTime": key,
+                "channels": [
+                    {
+                        "channelName": name,
+                        "channelType": (
+                            "Energy" if name.startswith("Energy") else "Power"
+                        ),
+                        "unit": "Wh" if name.startswith("Energy") else "W",
+                        "value": self.value(key),
+                    }
+                    for name in params["channel"].split(",")
+                ],
+            }
+            for key in keys
+        ]
+        return httpx.Response(200, json={"pvSystemId": "pv", "data": data})
+
+    @staticmethod
+    def value(key: str | None) -> float:
+        if key is None:
+            return 9999.0
+        first, last = _bounds(key)
+        return float((last - first).days + 1)
+
+
+@pytest.fixture
+def server():
+    return AggrServer()
+
+
+@pytest.fixture
+def planner(server):
+    client = Fronius_Solarweb(
+        "a",
+        "b",
+        "pv",
+        httpx_client=httpx.AsyncClient(transport=httpx.MockTransport(server.handle)),
+    )
+    return AggrPlanner(client, since=date(2021, 6, 15))
+
+
+def _values(aggr_data, channel: str = "EnergyExported"):
+    return {
+        record.logDateTime: next(
+            c.value for c in record.channels if c.channelName == channel
+        )
+        for record in aggr_data.data
+    }
+
+
+def test_period_keys():
+    assert period_keys("years", date(2021, 6, 1), date(2023, 1, 1)) == [
+        "2021",
+        "2022",
+        "2023",
+    ]
+    assert period_keys("months", date(2022, 11, 30), date(2023, 2, 1)) == [
+        "2022-11",
+        "2022-12",
+        "2023-01",
+        "2023-02",
+    ]
+    assert len(period_keys("days", date(2024, 2, 1), date(2024, 3, 1))) == 30
+    assert period_key("2023-05-17T00:00:00Z", "months") == "2023-05"
+    with pytest.raises(ValueError):
+        period_keys("weeks", date(2023, 1, 1), date(2023, 1, 2))
+
+
+def test_months_derived_from_days(planner, server):
+    async def query():
+        await planner.get_system_aggr_data_v2(
+            "days", ["EnergyExported"], "2022-01-01", "2022-03-31"
+        )
+        return await planner.get_system_aggr_data_v2(
+            "months", ["EnergyExported"], "2022-01", "2022-03"
+        )
+
+    months = asyncio.run(query())
+    assert len(server.requests) == 1
+    assert _values(months) == {"2022-01": 31.0, "2022-02": 28.0, "2022-03": 31.0}
+
+
+def test_non_additive_channels_are_requested(planner, server):
+    async def query():
+        await planner.get_system_aggr_data_v2(
+            "days", ["PowerMax"], "2022-01-01", "2022-01-31"
+        )
+        return await planner.get_system_aggr_data_v2(
+            "months", ["PowerMax"], "2022-01", "2022-01"
+        )
+
+    months = asyncio.run(query())
+    assert server.requests[-1] == ("months", "2022-01", "2022-01")
+    assert _values(months, "PowerMax") == {"2022-01": 31.0}
+
+
+def test_only_gaps_are_requested(planner, server):
+    async def query():
+        for month in ("2022-01", "2022-02", "2022-04"):
+            await planner.get_system_aggr_data_v2(
+                "months", ["EnergyExported"], month, month
+            )
+        server.requests.clear()
+        return await planner.get_system_aggr_data_v2(
+            "months", ["EnergyExported"], "2022-01", "2022-06"
+        )
+
+    months = asyncio.run(query())
+    # one request per contiguous run of missing months
+    assert sorted(server.requests) == [
+        ("months", "2022-03", "2022-03"),
+        ("months", "2022-05", "2022-06"),
+    ]
+    assert list(_values(months)) == [f"2022-{m:02d}" for m in range(1, 7)]
+
+
+def test_years_derived_from_months_since_installation(planner, server):
+    async def query():
+        await planner.get_system_aggr_data_v2(
+            "months", ["EnergyExported"], "2021-06", "2022-12"
+        )
+        return await planner.get_system_aggr_data_v2(
+            "years", ["EnergyExported"], "2021", "2022"
+        )
+
+    years = asyncio.run(query())
+    assert len(server.requests) == 1
+    # 2021 only counts the months from the installation onwards
+    assert _values(years) == {"2021": 214.0, "2022": 365.0}
+
+
+def test_repeated_query_is_answered_locally(planner, server):
+    async def query():
+        first = await planner.get_system_aggr_data_v2(
+            "years", ["EnergyExported"], "2022", "2022"
+        )
+        second = await planner.get_system_aggr_data_v2(
+            "years", ["EnergyExported"], "2022", "2022"
+        )
+        return first, second
+
+    first, second = asyncio.run(query())
+    assert len(server.requests) == 1
+    assert _values(first) == _values(second)
@@ -0,0 +1,19 @@
+import asyncio
+
+from benchmarks.mock_server import MockSolarweb
+from fronius_solarweb.pool import Fronius_Solarweb_Pool
+
+
+def test_discover_routes_every_page():
+    first = MockSolarweb(pv_systems=25, pv_system_page_size=10)
+    second = MockSolarweb(pv_systems=30, pv_system_page_size=10)
+    pool = Fronius_Solarweb_Pool()
+    pool.add_account("first", "a", "b", httpx_client=first.client())
+    pool.add_account("second", "c", "d", httpx_client=second.client())
+
+    routes = asyncio.run(pool.discover())
+    assert len(routes) == 30
+    # systems only on the later pages of the second account are routed to it
+    assert {routes[f"pv-{i}"] for i in range(25, 30)} == {"second"}
+    assert first.requests == 3
+    assert second.requests == 3
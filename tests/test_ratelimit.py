@@ -0,0 +1,85 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+import time
+
+import pytest
+from tenacity import wait_fixed
+
+from benchmarks.mock_server import MockSolarweb
+from fronius_solarweb import ratelimit
+from fronius_solarweb.api import Fronius_Solarweb
+from fronius_solarweb.ratelimit import RateLimiter, parse_retry_after
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("2.5") == 2.5
+    assert parse_retry_after("-1") == 0.0
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert parse_retry_after(format_datetime(retry_at, usegmt=True)) == pytest.approx(
+        30, abs=1
+    )
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_burst_then_rate(clock):
+    limiter = RateLimiter(rate=10, burst=3)
+    delays = [limiter._reserve() for _ in range(5)]
+    assert delays == pytest.approx([0, 0, 0, 0.1, 0.2])
+    clock[0] += 1
+    assert limiter._reserve() == 0
+
+
+def test_429_blocks_for_retry_after(clock):
+    limiter = RateLimiter(rate=100)
+    limiter.update({"Retry-After": "5"}, 429)
+    assert limiter._reserve() == pytest.approx(5)
+    clock[0] += 5
+    assert limiter._reserve() == pytest.approx(0.01)
+
+
+def test_exhausted_quota_blocks_until_reset(clock):
+    limiter = RateLimiter(rate=100)
+    limiter.update({"X-RateLimit-Remaining": "1", "X-RateLimit-Reset": "60"}, 200)
+    assert limiter._reserve() == 0
+    limiter.update({"RateLimit-Remaining": "0", "RateLimit-Reset": "60"}, 200)
+    assert limiter._reserve() == pytest.approx(60)
+
+
+def test_client_requests_are_paced():
+    mock = MockSolarweb()
+    limiter = RateLimiter(rate=20)
+    client = Fronius_Solarweb(
+        "a", "b", "pv", httpx_client=mock.client(), rate_limiter=limiter
+    )
+
+    async def query():
+        await asyncio.gather(*(client.get_system_flow_data() for _ in range(5)))
+
+    started = time.monotonic()
+    asyncio.run(query())
+    assert time.monotonic() - started >= 0.2
+    assert mock.requests == 5
+
+
+def test_retry_waits_for_retry_after(monkeypatch):
+    # the exponential back off would wait 10s, the 429 asks for 0s
+    monkeypatch.setattr(
+        Fronius_Solarweb.get_system_flow_data.retry.wait, "fallback", wait_fixed(10)
+    )
+    mock = MockSolarweb(rate_limit_rate=0.5)
+    client = Fronius_Solarweb("a", "b", "pv", httpx_client=mock.client())
+
+    started = time.monotonic()
+    flow_data = asyncio.run(client.get_system_flow_data())
+    assert time.monotonic() - started < 1
+    assert flow_data.pvSystemId == "pv"
+    assert mock.requests == 2
@@ -0,0 +1,138 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from tenacity import wait_fixed
+
+from benchmarks.mock_server import MockSolarweb
+from fronius_solarweb import api, resilience
+from fronius_solarweb.api import Fronius_Solarweb
+from fronius_solarweb.errors import CircuitOpenException, DeadlineExceededException
+from fronius_solarweb.resilience import (
+    CircuitBreaker,
+    ResiliencePolicy,
+    deadline,
+    remaining_time,
+)
+
+FLOWDATA = "GET /pvsystems/{id}/flowdata"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_breaker_opens_after_threshold(clock):
+    breaker = CircuitBreaker(failure_threshold=3, recovery_time=30)
+    for _ in range(2):
+        breaker.before_request()
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    clock[0] += 10
+    with pytest.raises(CircuitOpenException) as error:
+        breaker.before_request()
+    assert error.value.retry_after == pytest.approx(20)
+
+
+def test_breaker_success_resets_failures():
+    breaker = CircuitBreaker(failure_threshold=2)
+    breaker.record_status(503)
+    breaker.record_status(200)
+    breaker.record_status(503)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.failures == 1
+
+
+def test_breaker_lets_one_probe_through(clock):
+    breaker = CircuitBreaker(failure_threshold=1, recovery_time=30)
+    breaker.record_failure()
+    clock[0] += 30
+    breaker.before_request()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenException):
+        breaker.before_request()
+    # a failed probe opens the circuit for another recovery_time
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    clock[0] += 30
+    breaker.before_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.failures == 0
+
+
+def test_open_circuit_fails_fast(no_retry_wait):
+    mock = MockSolarweb(error_rate=1.0)
+    policy = ResiliencePolicy(failure_threshold=2, max_attempts=5, retry_budget=None)
+    client = Fronius_Solarweb(
+        "a", "b", "pv", httpx_client=mock.client(), resilience=policy
+    )
+
+    async def call():
+        with pytest.raises(CircuitOpenException):
+            await client.get_system_flow_data()
+        with pytest.raises(CircuitOpenException):
+            await client.get_system_flow_data()
+
+    asyncio.run(call())
+    assert mock.requests == 2
+    assert policy.breaker(FLOWDATA).state == CircuitBreaker.OPEN
+
+
+def test_nested_deadlines_only_shorten():
+    assert remaining_time() is None
+    with deadline(10):
+        with deadline(1):
+            assert remaining_time() <= 1
+        with deadline(100):
+            assert 1 < remaining_time() <= 10
+    assert remaining_time() is None
+
+
+def test_deadline_stops_retries(monkeypatch):
+    monkeypatch.setattr(
+        Fronius_Solarweb.get_system_flow_data.retry, "wait", wait_fixed(0.2)
+    )
+    mock = MockSolarweb(error_rate=1.0)
+    client = Fronius_Solarweb("a", "b", "pv", httpx_client=mock.client())
+
+    async def call():
+        with deadline(0.5):
+            await client.get_system_flow_data()
+
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceededException):
+        asyncio.run(call())
+    # no retry is started that can't complete before the deadline
+    assert time.monotonic() - started < 0.5
+    assert mock.requests == 3
+
+
+def test_deadline_bounds_slow_request(monkeypatch):
+    async def call():
+        async def never_answer(reader, writer):
+            await asyncio.sleep(5)
+            writer.close()
+
+        # httpx.MockTransport doesn't apply timeouts, so use a real socket
+        server = await asyncio.start_server(never_answer, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        monkeypatch.setattr(api, "SW_BASE_URL", f"http://127.0.0.1:{port}")
+        client = Fronius_Solarweb("a", "b", "pv", httpx_client=httpx.AsyncClient())
+        try:
+            with deadline(0.2):
+                await client.get_system_flow_data()
+        finally:
+            server.close()
+            await client.httpx_client.aclose()
+
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceededException):
+        asyncio.run(call())
+    assert time.monotonic() - started < 1
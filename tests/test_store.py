@@ -0,0 +1,149 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+
+from benchmarks.mock_server import CHANNELS, MockSolarweb
+from fronius_solarweb.api import Fronius_Solarweb
+from fronius_solarweb.store import HistoryStore
+
+
+class RecordingMock(MockSolarweb):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.windows = []
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/histdata"):
+            self.windows.append((request.url.params["from"], request.url.params["to"]))
+        return await super().handle(request)
+
+
+class LaggingMock(MockSolarweb):
+    """Serves only the records uploaded up to uploaded_until."""
+
+    def __init__(self, uploaded_until: datetime, **kwargs):
+        super().__init__(**kwargs)
+        self.uploaded_until = uploaded_until
+
+    def _hist_page(self, request: httpx.Request) -> dict:
+        page = super()._hist_page(request)
+        page["data"] = [
+            record
+            for record in page["data"]
+            if datetime.fromisoformat(record["logDateTime"].rstrip("Z"))
+            <= self.uploaded_until
+        ]
+        return page
+
+
+@pytest.fixture
+def store():
+    store = HistoryStore()
+    yield store
+    store.close()
+
+
+def test_sync_resumes_from_high_water_mark(store):
+    mock = RecordingMock()
+    client = Fronius_Solarweb("a", "b", "pv", httpx_client=mock.client())
+
+    written = asyncio.run(
+        store.sync(client, datetime(2023, 1, 1), datetime(2023, 1, 2))
+    )
+    assert written == 288 * len(CHANNELS)
+    assert store.high_water_mark("pv") == datetime(2023, 1, 2)
+
+    mock.windows.clear()
+    written = asyncio.run(
+        store.sync(client, datetime(2023, 1, 1), datetime(2023, 1, 2, 6))
+    )
+    # only the period after the mark is requested
+    assert mock.windows[0][0] == "2023-01-02T00:00:01Z"
+    assert written == 71 * len(CHANNELS)
+    assert store.high_water_mark("pv") == datetime(2023, 1, 2, 6)
+
+    mock.windows.clear()
+    written = asyncio.run(
+        store.sync(client, datetime(2023, 1, 1), datetime(2023, 1, 2, 6))
+    )
+    assert written == 0
+    assert mock.windows == []
+    records = store.query_hist("pv", datetime(2023, 1, 1), datetime(2023, 1, 3))
+    assert len(records) == 288 + 71
+
+
+def test_sync_fetches_records_uploaded_late(store):
+    # off the five minute grid of the records, so six hours hold 72 of them
+    now = datetime.now(timezone.utc).replace(
+        tzinfo=None, second=0, microsecond=0
+    ) - timedelta(seconds=30)
+    mock = LaggingMock(uploaded_until=now - timedelta(hours=1))
+    client = Fronius_Solarweb("a", "b", "pv", httpx_client=mock.client())
+    start = now - timedelta(hours=6)
+
+    written = asyncio.run(store.sync(client, start))
+    assert 0 < written < 72 * len(CHANNELS)
+    # the unsettled window doesn't move the mark past the last record
+    assert store.high_water_mark("pv") <= now - timedelta(hours=1)
+
+    mock.uploaded_until = now
+    assert asyncio.run(store.sync(client, start)) > 0
+    records = store.query_hist("pv", start, now)
+    assert len(records) == 72
+
+
+def test_empty_windows_advance_high_water_mark(store):
+    windows = []
+
+    def empty(request: httpx.Request) -> httpx.Response:
+        windows.append(request.url.params["from"])
+        return httpx.Response(
+            200, json={"pvSystemId": "pv", "data": [], "links": {"totalItemsCount": 0}}
+        )
+
+    client = Fronius_Solarweb(
+        "a",
+        "b",
+        "pv",
+        httpx_client=httpx.AsyncClient(transport=httpx.MockTransport(empty)),
+    )
+    written = asyncio.run(
+        store.sync(client, datetime(2023, 1, 1), datetime(2023, 1, 3))
+    )
+    assert written == 0
+    assert windows
+    assert store.high_water_mark("pv") == datetime(2023, 1, 3)
+
+    windows.clear()
+    asyncio.run(store.sync(client, datetime(2023, 1, 1), datetime(2023, 1, 3)))
+    assert windows == []
+
+
+def test_aware_datetimes_are_stored_as_utc(store):
+    mock = RecordingMock()
+    client = Fronius_Solarweb("a", "b", "pv", httpx_client=mock.client())
+    plus_12 = timezone(timedelta(hours=12))
+
+    asyncio.run(
+        store.sync(
+            client,
+            datetime(2023, 1, 2, 12, tzinfo=plus_12),
+            datetime(2023, 1, 3, tzinfo=plus_12),
+        )
+    )
+    assert mock.windows[0] == ("2023-01-02T00:00:00Z", "2023-01-02T12:00:00Z")
+    assert store.high_water_mark("pv") == datetime(2023, 1, 2, 12)
+    records = store.query_hist(
+        "pv",
+        datetime(2023, 1, 2, 12, tzinfo=plus_12),
+        datetime(2023, 1, 2, 13, tzinfo=plus_12),
+    )
+    assert records[0].logDateTime == "2023-01-02T00:00:00Z"
+
+
+def test_high_water_mark_never_moves_back(store):
+    store._set_high_water_mark("pv", None, None, "2023-01-02T00:00:00")
+    store._set_high_water_mark("pv", None, None, "2023-01-01T00:00:00")
+    assert store.high_water_mark("pv") == datetime(2023, 1, 2)
@@ -0,0 +1,90 @@
+import asyncio
+import json
+
+import pytest
+
+from fronius_solarweb.streaming import StreamedObject
+
+DOCUMENT = json.dumps(
+    {
+        "pvSystemId": "pv",
+        "totalDataCount": 12345,
+        "data": [
+            {
+                "logDateTime": "2023-01-01T00:00:00Z",
+                "logDuration": 300,
+                "channels": [
+                    {"channelName": "PowerPV", "value": -1.5e3},
+                    {"channelName": 'a "quoted" ]}, name', "value": None},
+                ],
+            },
+            {"logDateTime": "2023-01-01T00:05:00Z", "channels": []},
+            {"unicode": "é☀", "nested": {"empty": {}, "list": [[], [0]]}},
+        ],
+        "links": {"next": None, "totalItemsCount": 3},
+        "ratio": 0.25,
+    }
+)
+
+
+async def _chunks(chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+def _parse(chunks, array_key: str = "data"):
+    async def parse():
+        page = StreamedObject(_chunks(chunks), array_key)
+        return [item async for item in page], page.fields
+
+    return asyncio.run(parse())
+
+
+def _split(text: str, size: int):
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, len(DOCUMENT)])
+def test_chunk_sizes(size):
+    expected = json.loads(DOCUMENT)
+    items, fields = _parse(_split(DOCUMENT, size))
+    assert items == expected.pop("data")
+    assert fields == {**expected, "data": None}
+
+
+def test_numbers_split_across_chunks():
+    document = '{"total": 12345.678e2, "data": [1, -20, 3.5e-3, 40000], "n": 7}'
+    for position in range(1, len(document)):
+        items, fields = _parse([document[:position], document[position:]])
+        assert items == [1, -20, 3.5e-3, 40000], position
+        assert fields == {"total": 12345.678e2, "data": None, "n": 7}, position
+
+
+def test_number_at_end_of_chunk_before_whitespace():
+    items, fields = _parse(['{"data": [12', "", "3 , 4", "5]", ', "n": 6', "}"])
+    assert items == [123, 45]
+    assert fields == {"data": None, "n": 6}
+
+
+@pytest.mark.parametrize(
+    "document, items, fields",
+    [
+        ("{}", [], {}),
+        ('{"data": []}', [], {"data": None}),
+        ('{ "data" : [ ] , "links" : { } }', [], {"data": None, "links": {}}),
+        ('{"data": [{}, [], {"a": []}]}', [{}, [], {"a": []}], {"data": None}),
+        ('{"links": {"next": null}}', [], {"links": {"next": None}}),
+        ('{"data": null}', [], {"data": None}),
+    ],
+)
+def test_empty_containers(document, items, fields):
+    for size in (1, len(document)):
+        assert _parse(_split(document, size)) == (items, fields)
+
+
+@pytest.mark.parametrize(
+    "document", ['{"data": [1, 2', '{"data": [{"a": 1}', '{"data": [] ', "[]"]
+)
+def test_invalid_document_raises(document):
+    with pytest.raises(ValueError):
+        _parse(_split(document, 1))
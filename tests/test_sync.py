@@ -0,0 +1,40 @@
+from datetime import datetime
+
+from benchmarks.mock_server import MockSolarweb
+from fronius_solarweb.sync import Fronius_Solarweb_Sync, _LoopThread
+
+
+def test_stream_methods_return_iterators():
+    mock = MockSolarweb()
+    with Fronius_Solarweb_Sync(
+        access_key_id="a",
+        access_key_value="b",
+        pv_system_id="pv",
+        httpx_client=mock.client(),
+    ) as client:
+        records = list(
+            client.stream_hist_data(datetime(2023, 1, 1), datetime(2023, 1, 2))
+        )
+        assert len(records) == 288
+        assert client.get_system_flow_data().pvSystemId == "pv"
+
+
+def test_early_stop_closes_async_iterator():
+    loop_thread = _LoopThread()
+    closed = []
+
+    async def numbers():
+        try:
+            for number in range(10):
+                yield number
+        finally:
+            closed.append(True)
+
+    try:
+        async_iterator = numbers()
+        iterator = loop_thread.iterate(async_iterator)
+        assert next(iterator) == 0
+        iterator.close()
+        assert closed == [True]
+    finally:
+        loop_thread.stop()